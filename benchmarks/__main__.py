@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Runs the client, parsing, JSON, memory and import benchmarks,
+and writes the results as JSON
+
+Run from the root of the repository:
+
+    python -m benchmarks [--output FILE] [--quick]
+
+Keeping the results of each release makes it possible
+to compare them and find regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+
+import pyud
+
+from . import (
+    bench_clients,
+    bench_import,
+    bench_json,
+    bench_memory,
+    bench_parse,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--output", default="benchmark-{}.json".format(pyud.__version__)
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="send fewer requests"
+    )
+    args = parser.parse_args(argv)
+
+    client_args = ["--requests", "100", "--concurrency", "1", "8"]
+    parse_args = ["--number", "200"]
+    json_args = ["--number", "200"]
+    memory_args = ["--count", "1000"]
+    import_args = ["--number", "3"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            "clients": bench_clients.main(client_args if args.quick else []),
+            "parse": bench_parse.main(parse_args if args.quick else []),
+            "json": bench_json.main(json_args if args.quick else []),
+            "memory": bench_memory.main(memory_args if args.quick else []),
+            "import": bench_import.main(import_args if args.quick else []),
+        }
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
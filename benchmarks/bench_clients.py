@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the throughput and latency of Client and AsyncClient
+
+Requests are sent to a local stand-in for the API, so that no requests
+are sent to the real API. Run from the root of the repository:
+
+    python -m benchmarks.bench_clients [--requests N] [--concurrency N ...]
+        [--latency SECONDS] [--jitter SECONDS] [--payloads DIR]
+        [--output FILE]
+
+The results are printed as JSON, with latencies in milliseconds.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyud
+
+from .server import StandInServer
+
+
+def percentile(latencies, fraction):
+    """
+    Returns the latency below which the fraction given of latencies fall
+    """
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+
+def summarise(latencies, elapsed):
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+    }
+
+
+def bench_client(base_url, requests, concurrency):
+    """
+    Looks up distinct terms using Client from the number of threads given
+    """
+
+    def define(term):
+        started = time.perf_counter()
+        ud.define(term)
+        return time.perf_counter() - started
+
+    with pyud.Client(
+        base_url=base_url, concurrency=concurrency, pool_size=concurrency
+    ) as ud:
+        # Opens the connections before timing
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(define, map(str, range(concurrency))))
+
+            started = time.perf_counter()
+            terms = ("term {}".format(i) for i in range(requests))
+            latencies = list(executor.map(define, terms))
+            elapsed = time.perf_counter() - started
+
+    return summarise(latencies, elapsed)
+
+
+async def bench_async_client(base_url, requests, concurrency):
+    """
+    Looks up distinct terms using AsyncClient from the number of tasks given
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def define(term):
+        async with semaphore:
+            started = time.perf_counter()
+            await ud.define(term)
+            return time.perf_counter() - started
+
+    async with pyud.AsyncClient(
+        base_url=base_url, concurrency=concurrency
+    ) as ud:
+        await asyncio.gather(*map(define, map(str, range(concurrency))))
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(
+            *(define("term {}".format(i)) for i in range(requests))
+        )
+        elapsed = time.perf_counter() - started
+
+    return summarise(latencies, elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 16, 64]
+    )
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--payloads")
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": sys.version.split()[0],
+        "pyud": pyud.__version__,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "Client": {},
+        "AsyncClient": {},
+    }
+    loop = asyncio.get_event_loop()
+    with StandInServer(
+        latency=args.latency, jitter=args.jitter, payloads=args.payloads
+    ) as server:
+        for concurrency in args.concurrency:
+            results["Client"][concurrency] = bench_client(
+                server.base_url, args.requests, concurrency
+            )
+            results["AsyncClient"][concurrency] = loop.run_until_complete(
+                bench_async_client(server.base_url, args.requests, concurrency)
+            )
+
+    write_results(results, args.output)
+    return results
+
+
+def write_results(results, path=None):
+    """
+    Prints the results as JSON, and writes them to the path given
+    """
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    if path is not None:
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
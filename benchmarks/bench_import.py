@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the time taken to import pyud
+
+Each import is run in a new interpreter using ``-X importtime``,
+so that no modules have already been imported. Run from the root
+of the repository:
+
+    python -m benchmarks.bench_import [--number N] [--top N] [--output FILE]
+
+The results are printed as JSON, in milliseconds. The modules that take
+longest to import, including the modules they import, are listed,
+along with whether optional dependencies such as aiohttp were imported.
+"""
+
+import argparse
+import statistics
+import subprocess  # nosec
+import sys
+
+import pyud
+
+from .bench_clients import write_results
+
+OPTIONAL = ("asyncio", "aiohttp", "orjson", "ujson", "sqlite3")
+
+
+def import_times():
+    """
+    Imports pyud in a new interpreter, and returns the cumulative time
+    taken by each module in microseconds, and the modules imported
+    """
+    check = "import pyud, sys; print(','.join(sorted(sys.modules)))"
+    process = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", "-c", check],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    times = {}
+    for line in process.stderr.splitlines():
+        # Lines are "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        name = module.strip()
+        times[name] = max(times.get(name, 0), int(cumulative))
+    return times, set(process.stdout.strip().split(","))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    totals = []
+    for _ in range(args.number):
+        times, modules = import_times()
+        totals.append(times["pyud"] / 1e3)
+
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)
+    results = {
+        "python": sys.version.split()[0],
+        "pyud": pyud.__version__,
+        "import_ms": statistics.median(totals),
+        "min_import_ms": min(totals),
+        "slowest_ms": {
+            name: time / 1e3 for name, time in slowest[: args.top]
+        },
+        "imported": {name: name in modules for name in OPTIONAL},
+    }
+
+    write_results(results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
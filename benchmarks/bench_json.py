@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the time taken to parse API responses with each JSON backend
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_json [--number N] [--definitions N]
+
+The results are printed as JSON, in microseconds per response.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+
+import pyud
+from pyud import json_backend
+
+TEXT = (
+    "A [word] used to describe something that is [really] quite long, "
+    "so that the payload is a realistic size.\r\n"
+)
+
+
+def make_payload(count):
+    """
+    Returns a response body similar in size to one from the API
+    """
+    return json.dumps(
+        {
+            "list": [
+                {
+                    "defid": defid,
+                    "word": "hello",
+                    "definition": TEXT * 8,
+                    "author": "someone",
+                    "thumbs_up": 13423,
+                    "thumbs_down": 43,
+                    "example": TEXT * 3,
+                    "permalink": "http://hello.urbanup.com/{}".format(defid),
+                    "sound_urls": ["http://example.com/sound.mp3"],
+                    "written_on": "2020-06-29T00:00:00.000Z",
+                    "current_vote": "",
+                }
+                for defid in range(count)
+            ]
+        }
+    ).encode('utf-8')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--definitions", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    payload = make_payload(args.definitions)
+    results = {
+        "python": sys.version.split()[0],
+        "payload_bytes": len(payload),
+        "decode": {},
+        "parse_definitions": {},
+    }
+
+    for backend in json_backend.BACKENDS:
+        try:
+            loads = json_backend.get_loads(backend)
+        except ImportError:
+            continue
+
+        client = pyud.Client(json_backend=backend)
+        results["decode"][backend] = (
+            timeit.timeit(lambda: loads(payload), number=args.number)
+            / args.number
+            * 1e6
+        )
+        results["parse_definitions"][backend] = (
+            timeit.timeit(
+                lambda: client._parse_definitions_from_json(payload),
+                number=args.number,
+            )
+            / args.number
+            * 1e6
+        )
+        client.close()
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the memory used per instance of Definition and Reference
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_memory [--count N]
+
+The results are printed as JSON.
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+
+import pyud
+
+DATA = {
+    "defid": 1,
+    "word": "hello",
+    "definition": "a [greeting] used when meeting [someone]",
+    "author": "me",
+    "thumbs_up": 13423,
+    "thumbs_down": 43,
+    "example": "[hello] there",
+    "permalink": "http://hello.urbanup.com/1",
+    "sound_urls": [],
+    "written_on": "2020-06-29T00:00:00.000Z",
+    "current_vote": "",
+}
+
+
+def measure(factory, count):
+    """
+    Returns the average number of bytes allocated
+    per object created by the factory
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(
+        stat.size_diff for stat in after.compare_to(before, 'filename')
+    )
+    del objects
+    return total / count
+
+
+def shallow_size(obj):
+    """
+    Returns the size of an object itself, including its instance dictionary
+    if it has one, but not the objects it refers to
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    client = pyud.Client()
+    results = {
+        "python": sys.version.split()[0],
+        "count": args.count,
+        "bytes_per_definition": measure(
+            lambda i: pyud.Definition(client, **dict(DATA, defid=i)),
+            args.count,
+        ),
+        "bytes_per_reference": measure(
+            lambda i: pyud.Reference(client, "hello"), args.count
+        ),
+        "shallow_bytes_per_definition": shallow_size(
+            pyud.Definition(client, **DATA)
+        ),
+        "shallow_bytes_per_reference": shallow_size(
+            pyud.Reference(client, "hello")
+        ),
+    }
+    client.close()
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the time taken to parse responses and create definitions
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_parse [--number N] [--definitions N]
+        [--output FILE]
+
+The results are printed as JSON, in microseconds per call.
+"""
+
+import argparse
+import sys
+import timeit
+
+import pyud
+
+from .bench_clients import write_results
+from .bench_json import make_payload
+
+
+def per_call(func, number):
+    """
+    Returns the number of microseconds taken by each call of the function
+    """
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--definitions", type=int, default=10)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    payload = make_payload(args.definitions)
+    client = pyud.Client()
+    data = client._decode_definitions_json(payload)
+    definitions = client._build_definitions(data)
+
+    def find_references():
+        for definition in definitions:
+            definition._find_references()
+
+    results = {
+        "python": sys.version.split()[0],
+        "pyud": pyud.__version__,
+        "definitions": args.definitions,
+        "payload_bytes": len(payload),
+        "parse_definitions": per_call(
+            lambda: client._parse_definitions_from_json(payload), args.number
+        ),
+        "decode": per_call(
+            lambda: client._decode_definitions_json(payload), args.number
+        ),
+        "definition_init": per_call(
+            lambda: pyud.Definition(client, **data[0]), args.number
+        ),
+        "find_references": per_call(find_references, args.number)
+        / len(definitions),
+    }
+    client.close()
+
+    write_results(results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
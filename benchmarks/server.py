@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+A local stand-in for the API, which replays payloads with simulated latency
+
+Payloads recorded from the API can be replayed by saving them
+to a directory as ``define.json`` and ``random.json``, for example with:
+
+    curl -o define.json "https://api.urbandictionary.com/v0/define?term=hello"
+    curl -o random.json "https://api.urbandictionary.com/v0/random"
+
+Otherwise, payloads of a realistic size are generated. This is deliberate:
+no recorded responses are committed to the repository, as the definitions
+returned by the API are user-submitted content that changes over time,
+and generated payloads keep the benchmarks reproducible. Generated payloads
+have the same fields and roughly the same size as real ones, but their text
+is repetitive ASCII, so results for parsing in particular may differ
+from those measured with recorded payloads.
+"""
+
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+
+from .bench_json import make_payload
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The headers and body are written separately, which would otherwise
+    # be delayed until the client acknowledges the headers
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        server.delay()
+        if urlsplit(self.path).path.endswith("/random"):
+            body = server.random_payload
+        else:
+            body = server.define_payload
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """
+    Serves the same payload for every lookup, after waiting
+    for :paramref:`latency` seconds plus or minus up to
+    :paramref:`jitter` seconds
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, *, latency=0.0, jitter=0.0, payloads=None):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.define_payload = self._load(payloads, "define.json", 10)
+        self.random_payload = self._load(payloads, "random.json", 10)
+        self._thread = None
+
+    @staticmethod
+    def _load(directory, name, count):
+        if directory is not None:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as file:
+                    return file.read()
+        return make_payload(count)
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:{}/v0/".format(self.server_address[1])
+
+    def delay(self):
+        delay = self.latency
+        if self.jitter:
+            delay += random.uniform(-self.jitter, self.jitter)  # nosec
+        if delay > 0:
+            time.sleep(delay)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        self.server_close()
@@ -21,9 +21,26 @@ along with pyud.  If not, see <https://www.gnu.org/licenses/>.
 
 from collections import namedtuple
 
+from .cache import Cache, normalise_term
 from .definition import Definition
+from .batch import DefinitionBatch
 from .client import AsyncClient, Client
+from .index import DefinitionIndex
+from .metrics import Metrics
+from .prefetch import PrefetchPolicy
+from .ratelimit import AIMDController, TokenBucket
+from .retry import RetryPolicy
 from .reference import AsyncReference, Reference
+from .store import DefinitionStore
+from .transport import (
+    AsyncRecordingTransport,
+    AsyncReplayTransport,
+    AsyncTransport,
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+)
 
 __author__ = "William Lee"
 __version__ = "1.1.0a1"
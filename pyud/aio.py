@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.aio
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+from . import transport
+
+
+class AiohttpResponse:
+    """
+    A response to a request sent using an :class:`AiohttpTransport`
+
+    The attributes are the same as :class:`AsyncBufferedResponse`.
+    """
+
+    def __init__(
+        self,
+        response: aiohttp.ClientResponse,
+        connect_time: float,
+        wait_time: float,
+    ):
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.connect_time = connect_time
+        self.wait_time = wait_time
+        self._response = response
+
+    async def read(self, amt: Optional[int] = None) -> bytes:
+        """Reads the body of the response
+
+        :param amt: The maximum number of bytes to read,
+            defaults to :data:`None` (read the rest of the body)
+        :type amt: Optional[int]
+        :rtype: bytes
+        """
+        if amt is None:
+            return await self._response.read()
+        return await self._response.content.read(amt)
+
+    def raise_for_status(self):
+        """Raises an error if the status code is 400 or above
+
+        :raises aiohttp.ClientResponseError: The status code is 400 or above
+        """
+        self._response.raise_for_status()
+
+    def release(self):
+        """Releases the connection of the response"""
+        self._response.release()
+
+
+class AiohttpTransport(transport.AsyncTransport):
+    """
+    The transport used by :class:`AsyncClient` by default,
+    which sends requests using a single :class:`aiohttp.ClientSession`,
+    created lazily on first use
+
+    :param session: An existing session to use for requests.
+        If given, the session is not closed by :meth:`aclose`,
+        and the connector options are ignored.
+    :type session: Optional[aiohttp.ClientSession]
+    :param limit: The total number of simultaneous connections,
+        defaults to 100. ``0`` means no limit.
+    :type limit: int
+    :param limit_per_host: The number of simultaneous connections
+        to the same host, defaults to 0 (no limit)
+    :type limit_per_host: int
+    :param keepalive_timeout: The number of seconds an idle connection
+        is kept open for reuse, defaults to 15
+    :type keepalive_timeout: float
+    :param ttl_dns_cache: The number of seconds resolved DNS entries
+        are cached for, defaults to 10. :data:`None` caches entries forever.
+    :type ttl_dns_cache: Optional[int]
+    :param timeout: The number of seconds to wait for the whole request,
+        including reading the response, defaults to :data:`None`
+        (no timeout)
+    :type timeout: Optional[float]
+    :param trace: Whether the time taken to open new connections
+        is measured, defaults to :data:`False`
+    :type trace: bool
+
+    The session is bound to the event loop it was created in.
+    If the transport is then used from another event loop, for example
+    after calling :func:`asyncio.run` again, the session is replaced
+    with a new one, so the transport should only be used by one event loop
+    at a time. A session given to the transport is never replaced.
+    """
+
+    errors = (aiohttp.ClientError, asyncio.TimeoutError)
+
+    def __init__(
+        self,
+        *,
+        session: Optional[aiohttp.ClientSession] = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: Optional[int] = 10,
+        timeout: Optional[float] = None,
+        trace: bool = False
+    ):
+        self._session = session
+        self._owns_session = session is None
+        self._connector_options = {
+            'limit': limit,
+            'limit_per_host': limit_per_host,
+            'keepalive_timeout': keepalive_timeout,
+            'ttl_dns_cache': ttl_dns_cache,
+        }
+        # The timeout is always given, as the session would otherwise
+        # use its own default of 5 minutes when it is None
+        self._request_options = {
+            'timeout': aiohttp.ClientTimeout(total=timeout)
+        }  # type: Dict[str, Any]
+        self._trace = trace
+        self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        self._closed = False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the session used for requests, creating it if needed
+        """
+        if self._closed:
+            raise RuntimeError("Transport has been closed")
+        loop = asyncio.get_event_loop()
+        if (
+            self._session is not None
+            and self._owns_session
+            and self._loop is not loop
+        ):
+            self._discard_session()
+        if self._session is None:
+            self._loop = loop
+            trace_configs = []
+            if self._trace:
+                trace_config = aiohttp.TraceConfig()
+                trace_config.on_connection_create_start.append(
+                    _on_connection_create_start
+                )
+                trace_config.on_connection_create_end.append(
+                    _on_connection_create_end
+                )
+                trace_configs.append(trace_config)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self._connector_options),
+                trace_configs=trace_configs,
+            )
+        return self._session
+
+    def _discard_session(self):
+        """
+        Stops using the session, which was created in another event loop,
+        closing its connections unless that loop has been closed
+        """
+        session, self._session = self._session, None
+        loop = self._loop
+        if loop.is_closed():
+            # The connections cannot be closed without their event loop
+            session.detach()
+        elif loop.is_running():
+            # The loop is running in another thread
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # The loop is idle, but cannot be run by this thread
+            # while it is running another loop
+            thread = threading.Thread(
+                target=loop.run_until_complete, args=(session.close(),)
+            )
+            thread.start()
+            thread.join()
+
+    async def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> AiohttpResponse:
+        session = self._get_session()
+        trace = {} if self._trace else None
+        sent = time.perf_counter()
+        response = await session.request(  # nosec
+            method,
+            url,
+            headers=headers,
+            trace_request_ctx=trace,
+            **self._request_options
+        )
+        connect_time = trace.get('connect', 0.0) if trace else 0.0
+        return AiohttpResponse(
+            response, connect_time, time.perf_counter() - sent - connect_time
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def aclose(self):
+        """Closes the session, if it was created by the transport
+
+        Calling this more than once has no effect.
+        """
+        self._closed = True
+        session, self._session = self._session, None
+        if session is not None and self._owns_session:
+            await session.close()
+
+
+async def _on_connection_create_start(session, context, params):
+    if context.trace_request_ctx is not None:
+        context.trace_request_ctx['connect_started'] = time.perf_counter()
+
+
+async def _on_connection_create_end(session, context, params):
+    trace = context.trace_request_ctx
+    if trace is not None and 'connect_started' in trace:
+        trace['connect'] = time.perf_counter() - trace.pop('connect_started')
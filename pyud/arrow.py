@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.arrow
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import itertools
+import json
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from . import client, definition
+
+# PyArrow is imported when first needed, so that importing pyud stays fast
+pa = None
+pq = None
+
+#: The number of definitions in each record batch written by default
+CHUNK_SIZE = 10000
+
+
+def _require_pyarrow():
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError(
+                "pyarrow is required for exporting definitions, "
+                "install it using 'pip install pyud[arrow]'"
+            ) from None
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def schema() -> 'pa.Schema':
+    """Returns the Arrow schema used for definitions
+
+    The :attr:`~Definition.definition` and :attr:`~Definition.example`
+    columns hold the text as given by the API, with references enclosed
+    in square brackets. The :attr:`~Definition.references` column holds
+    the words of the references, and the :attr:`~Definition.extra`
+    column holds any additional attributes encoded as a JSON object.
+
+    :rtype: pyarrow.Schema
+    """
+    _require_pyarrow()
+    return pa.schema(
+        [
+            ('defid', pa.int64()),
+            ('word', pa.string()),
+            ('definition', pa.string()),
+            ('author', pa.string()),
+            ('thumbs_up', pa.int64()),
+            ('thumbs_down', pa.int64()),
+            ('example', pa.string()),
+            ('permalink', pa.string()),
+            ('sound_urls', pa.list_(pa.string())),
+            ('written_on', pa.timestamp('ms')),
+            ('references', pa.list_(pa.string())),
+            ('extra', pa.string()),
+        ]
+    )
+
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def to_record_batches(
+    definitions: Iterable['definition.Definition'],
+    *,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator['pa.RecordBatch']:
+    """Converts definitions to Arrow record batches
+
+    The definitions are consumed lazily, so they can be given as a stream,
+    such as from :meth:`Client.iter_define`, without being held
+    in memory all at once.
+
+    :param definitions: The definitions to convert
+    :type definitions: Iterable[Definition]
+    :param chunk_size: The maximum number of definitions
+        in each record batch, defaults to 10000
+    :type chunk_size: int
+    :return: An iterator of record batches, using the schema
+        returned by :func:`schema`
+    :rtype: Iterator[pyarrow.RecordBatch]
+    """
+    batch_schema = schema()
+    for chunk in _chunks(definitions, chunk_size):
+        columns = [
+            [d.defid for d in chunk],
+            [d.word for d in chunk],
+            [d.raw_definition for d in chunk],
+            [d.author for d in chunk],
+            [d.thumbs_up for d in chunk],
+            [d.thumbs_down for d in chunk],
+            [d.raw_example for d in chunk],
+            [d.permalink for d in chunk],
+            [d.sound_urls for d in chunk],
+            [d.written_on for d in chunk],
+            [[ref.word for ref in d.references] for d in chunk],
+            [json.dumps(d.extra) if d.extra else None for d in chunk],
+        ]
+        yield pa.RecordBatch.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(columns, batch_schema)
+            ],
+            schema=batch_schema,
+        )
+
+
+def from_record_batch(
+    batch: 'pa.RecordBatch',
+    client: Optional[Union['client.Client', 'client.AsyncClient']] = None,
+) -> Iterator['definition.Definition']:
+    """Creates definitions from an Arrow record batch
+    written by :func:`to_record_batches`
+
+    :param batch: The record batch
+    :type batch: pyarrow.RecordBatch
+    :param client: The client given to the definitions,
+        defaults to :data:`None`
+    :type client: Optional[Union[Client, AsyncClient]]
+    :return: An iterator of definitions, created as they are consumed
+    :rtype: Iterator[Definition]
+    """
+    _require_pyarrow()
+    columns = {
+        name: batch.column(i).to_pylist()
+        for i, name in enumerate(batch.schema.names)
+    }
+    for i in range(batch.num_rows):
+        written_on = columns['written_on'][i]
+        extra = columns['extra'][i]
+        yield definition.Definition(
+            client,
+            defid=columns['defid'][i],
+            word=columns['word'][i],
+            definition=columns['definition'][i],
+            author=columns['author'][i],
+            thumbs_up=columns['thumbs_up'][i],
+            thumbs_down=columns['thumbs_down'][i],
+            example=columns['example'][i],
+            permalink=columns['permalink'][i],
+            sound_urls=columns['sound_urls'][i],
+            written_on="{}.{:03}Z".format(
+                written_on.strftime("%Y-%m-%dT%H:%M:%S"),
+                written_on.microsecond // 1000,
+            ),
+            **(json.loads(extra) if extra else {})
+        )
+
+
+def write_parquet(
+    definitions: Iterable['definition.Definition'],
+    path: str,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    compression: str = 'snappy'
+) -> int:
+    """Writes definitions to a Parquet file, one chunk at a time
+
+    :param definitions: The definitions to write
+    :type definitions: Iterable[Definition]
+    :param path: The path of the file
+    :type path: str
+    :param chunk_size: The maximum number of definitions
+        in each row group, defaults to 10000
+    :type chunk_size: int
+    :param compression: The compression used, defaults to ``'snappy'``
+    :type compression: str
+    :return: The number of definitions written
+    :rtype: int
+    """
+    _require_pyarrow()
+    rows = 0
+    with pq.ParquetWriter(path, schema(), compression=compression) as writer:
+        for batch in to_record_batches(definitions, chunk_size=chunk_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def read_parquet(
+    path: str,
+    client: Optional[Union['client.Client', 'client.AsyncClient']] = None,
+    *,
+    batch_size: int = CHUNK_SIZE
+) -> Iterator['definition.Definition']:
+    """Reads definitions from a Parquet file written by :func:`write_parquet`
+
+    The file is read one batch at a time as the definitions are consumed.
+
+    :param path: The path of the file
+    :type path: str
+    :param client: The client given to the definitions,
+        defaults to :data:`None`
+    :type client: Optional[Union[Client, AsyncClient]]
+    :param batch_size: The number of rows read at a time,
+        defaults to 10000
+    :type batch_size: int
+    :return: An iterator of definitions
+    :rtype: Iterator[Definition]
+    """
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield from from_record_batch(batch, client)
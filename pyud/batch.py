@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.batch
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+from . import client, definition
+
+# NumPy is imported when first needed, so that importing pyud stays fast
+np = None
+
+FIELDS = (
+    ('defid', 'i8'),
+    ('word', 'O'),
+    ('definition', 'O'),
+    ('author', 'O'),
+    ('thumbs_up', 'i8'),
+    ('thumbs_down', 'i8'),
+    ('example', 'O'),
+    ('permalink', 'O'),
+    ('sound_urls', 'O'),
+    ('written_on', 'M8[ms]'),
+    ('extra', 'O'),
+)
+
+#: The keys that can be given to :meth:`DefinitionBatch.sort`
+#: and :meth:`DefinitionBatch.top_k` to sort by a score
+SCORES = ('score', 'ratio', 'wilson')
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError(
+                "numpy is required for DefinitionBatch, "
+                "install it using 'pip install pyud[numpy]'"
+            ) from None
+        np = numpy
+
+
+class DefinitionBatch:
+    """
+    A columnar collection of definitions, for scoring,
+    filtering and sorting many definitions at once
+
+    The definitions are held in a single NumPy structured array,
+    with a field for each attribute of :class:`Definition`.
+    Numeric attributes and :attr:`~Definition.written_on` are held
+    as NumPy numbers and dates, and the other attributes as objects.
+    The :attr:`~Definition.definition` and :attr:`~Definition.example`
+    fields hold the text as given by the API, with references
+    enclosed in square brackets.
+
+    This class requires `NumPy <https://numpy.org>`_ to be installed.
+
+    .. code-block:: py
+
+        batch = pyud.DefinitionBatch.from_definitions(ud.define("hello"))
+        best = batch.top_k(3, key='wilson').to_definitions()
+
+    Indexing a batch with an integer returns a :class:`Definition`,
+    and indexing with a slice, a boolean mask or an array of indices
+    returns another :class:`DefinitionBatch`.
+
+    :param array: The structured array holding the definitions,
+        in the format returned by :meth:`to_structured`
+    :type array: numpy.ndarray
+    :param client: The client used to create definitions
+        taken from the batch, defaults to :data:`None`
+    :type client: Optional[Union[Client, AsyncClient]]
+    """
+
+    def __init__(
+        self,
+        array: 'np.ndarray',
+        client: Optional[Union['client.Client', 'client.AsyncClient']] = None,
+    ):
+        _require_numpy()
+        if array.dtype != self.dtype():
+            raise TypeError(
+                "array must have dtype {!r}".format(self.dtype())
+            )
+        self._array = array
+        self.client = client
+
+    @staticmethod
+    def dtype() -> 'np.dtype':
+        """Returns the dtype of the structured arrays used by batches
+
+        :rtype: numpy.dtype
+        """
+        _require_numpy()
+        return np.dtype(list(FIELDS))
+
+    @classmethod
+    def from_definitions(
+        cls, definitions: Optional[Iterable['definition.Definition']]
+    ) -> 'DefinitionBatch':
+        """Creates a batch from definitions, such as those returned
+        by :meth:`Client.define` or :meth:`Client.random`
+
+        :param definitions: The definitions, or :data:`None`
+            for an empty batch
+        :type definitions: Optional[Iterable[Definition]]
+        :rtype: DefinitionBatch
+        """
+        _require_numpy()
+        definitions = list(definitions or ())
+        array = np.empty(len(definitions), dtype=cls.dtype())
+        for name, _ in FIELDS:
+            if name == 'definition':
+                values = [d.raw_definition for d in definitions]
+            elif name == 'example':
+                values = [d.raw_example for d in definitions]
+            elif name == 'written_on':
+                # The trailing 'Z' is not accepted by NumPy
+                values = [d.raw_written_on.rstrip('Z') for d in definitions]
+            else:
+                values = [getattr(d, name) for d in definitions]
+
+            if array.dtype[name].hasobject:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+                array[name] = column
+            else:
+                array[name] = values
+
+        return cls(array, definitions[0].client if definitions else None)
+
+    @classmethod
+    def from_structured(
+        cls,
+        array: 'np.ndarray',
+        client: Optional[Union['client.Client', 'client.AsyncClient']] = None,
+    ) -> 'DefinitionBatch':
+        """Creates a batch from a structured array, without copying it
+
+        :param array: The structured array, in the format returned
+            by :meth:`to_structured`
+        :type array: numpy.ndarray
+        :param client: The client used to create definitions
+            taken from the batch, defaults to :data:`None`
+        :type client: Optional[Union[Client, AsyncClient]]
+        :rtype: DefinitionBatch
+        """
+        return cls(array, client)
+
+    def to_structured(self) -> 'np.ndarray':
+        """Returns the structured array holding the definitions,
+        without copying it
+
+        :rtype: numpy.ndarray
+        """
+        return self._array
+
+    def column(self, name: str) -> 'np.ndarray':
+        """Returns the column for an attribute, without copying it
+
+        :param name: The name of the attribute
+        :type name: str
+        :rtype: numpy.ndarray
+        """
+        return self._array[name]
+
+    def score(self) -> 'np.ndarray':
+        """Returns the number of upvotes minus the number of downvotes
+        of each definition
+
+        :rtype: numpy.ndarray
+        """
+        return self._array['thumbs_up'] - self._array['thumbs_down']
+
+    def ratio(self) -> 'np.ndarray':
+        """Returns the proportion of votes that are upvotes
+        for each definition, or 0 for definitions with no votes
+
+        :rtype: numpy.ndarray
+        """
+        up = self._array['thumbs_up'].astype(float)
+        total = up + self._array['thumbs_down']
+        return np.divide(up, total, out=np.zeros_like(up), where=total > 0)
+
+    def wilson(self, z: float = 1.96) -> 'np.ndarray':
+        """Returns the lower bound of the Wilson score interval
+        for the proportion of upvotes of each definition
+
+        This ranks definitions with many votes above definitions
+        with few votes but a similar proportion of upvotes.
+
+        :param z: The quantile of the normal distribution for the confidence
+            wanted, defaults to 1.96 (95% confidence)
+        :type z: float
+        :rtype: numpy.ndarray
+        """
+        up = self._array['thumbs_up'].astype(float)
+        n = up + self._array['thumbs_down']
+        safe_n = np.where(n > 0, n, 1)
+        p = up / safe_n
+        z2 = z * z
+        bound = (
+            p
+            + z2 / (2 * safe_n)
+            - z * np.sqrt((p * (1 - p) + z2 / (4 * safe_n)) / safe_n)
+        ) / (1 + z2 / safe_n)
+        return np.where(n > 0, bound, 0.0)
+
+    def length(self, name: str = 'definition') -> 'np.ndarray':
+        """Returns the length of a text attribute of each definition
+
+        :param name: The name of the attribute, defaults to ``'definition'``
+        :type name: str
+        :rtype: numpy.ndarray
+        """
+        return np.fromiter(
+            map(len, self._array[name]), dtype=np.int64, count=len(self)
+        )
+
+    def _key(self, key: Union[str, 'np.ndarray']) -> 'np.ndarray':
+        """
+        Returns the values to sort by for a key
+        """
+        if isinstance(key, str):
+            if key in SCORES:
+                return getattr(self, key)()
+            return self._array[key]
+        return np.asarray(key)
+
+    def filter(self, mask: Any) -> 'DefinitionBatch':
+        """Returns the definitions where the mask is :data:`True`
+
+        .. code-block:: py
+
+            popular = batch.filter(batch.column('thumbs_up') > 100)
+
+        :param mask: A boolean array with an element for each definition
+        :type mask: numpy.ndarray
+        :rtype: DefinitionBatch
+        """
+        return DefinitionBatch(self._array[np.asarray(mask)], self.client)
+
+    def sort(
+        self, key: Union[str, 'np.ndarray'] = 'score', *, descending=True
+    ) -> 'DefinitionBatch':
+        """Returns the definitions sorted by a key
+
+        :param key: The name of a column, one of ``'score'``, ``'ratio'``
+            or ``'wilson'``, or an array of values to sort by,
+            defaults to ``'score'``
+        :type key: Union[str, numpy.ndarray]
+        :param descending: Whether to sort in descending order,
+            defaults to :data:`True`
+        :type descending: bool
+        :rtype: DefinitionBatch
+        """
+        order = np.argsort(self._key(key), kind='stable')
+        if descending:
+            order = order[::-1]
+        return DefinitionBatch(self._array[order], self.client)
+
+    def top_k(
+        self, k: int, key: Union[str, 'np.ndarray'] = 'score'
+    ) -> 'DefinitionBatch':
+        """Returns the :paramref:`k` definitions with the highest values
+        of a key, in descending order
+
+        :param k: The number of definitions to return
+        :type k: int
+        :param key: The key, as accepted by :meth:`sort`,
+            defaults to ``'score'``
+        :type key: Union[str, numpy.ndarray]
+        :rtype: DefinitionBatch
+        """
+        values = self._key(key)
+        if k <= 0:
+            return DefinitionBatch(self._array[:0], self.client)
+        if k < len(values):
+            top = np.argpartition(values, len(values) - k)[-k:]
+        else:
+            top = np.arange(len(values))
+        order = top[np.argsort(values[top], kind='stable')[::-1]]
+        return DefinitionBatch(self._array[order], self.client)
+
+    def _definition(self, row: Any) -> 'definition.Definition':
+        """
+        Returns a Definition from a row of the array
+        """
+        written_on = np.datetime_as_string(row['written_on'], unit='ms')
+        return definition.Definition(
+            self.client,
+            defid=int(row['defid']),
+            word=row['word'],
+            definition=row['definition'],
+            author=row['author'],
+            thumbs_up=int(row['thumbs_up']),
+            thumbs_down=int(row['thumbs_down']),
+            example=row['example'],
+            permalink=row['permalink'],
+            sound_urls=row['sound_urls'],
+            written_on=written_on + 'Z',
+            **(row['extra'] or {})
+        )
+
+    def to_definitions(self) -> List['definition.Definition']:
+        """Returns the definitions in the batch as :class:`Definition`
+        objects
+
+        :rtype: List[Definition]
+        """
+        return list(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self._definition(self._array[index])
+        return DefinitionBatch(self._array[index], self.client)
+
+    def __iter__(self) -> Iterator['definition.Definition']:
+        for row in self._array:
+            yield self._definition(row)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __repr__(self):
+        return "DefinitionBatch(<{} definitions>)".format(len(self))
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.cache
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+MISSING = object()
+
+
+def normalise_term(term: str) -> str:
+    """Returns a term normalised for use as a cache key
+
+    Leading and trailing whitespace is removed, runs of whitespace
+    are collapsed to a single space, and the term is case-folded.
+
+    :param term: The term to normalise
+    :type term: str
+    :return: The normalised term
+    :rtype: str
+    """
+    return " ".join(term.split()).casefold()
+
+
+class Cache:
+    """
+    A size-bounded least recently used cache,
+    where each entry expires after a time-to-live
+
+    The cache is safe to share between threads, and between coroutines
+    on the same event loop, as no lock is held while waiting on anything.
+    A cache is given to a client using the ``cache`` parameter:
+
+    .. code-block:: py
+
+        ud = pyud.Client(cache=pyud.Cache(maxsize=4096, ttl=600))
+
+    :param maxsize: The maximum number of entries kept, defaults to 1024
+    :type maxsize: int
+    :param ttl: The number of seconds an entry is kept for,
+        defaults to 300. :data:`None` keeps entries until they are evicted.
+    :type ttl: Optional[float]
+    :param key_func: The function used to normalise terms
+        before they are used as keys, defaults to :func:`normalise_term`
+    :type key_func: Callable[[str], Hashable]
+    :param negative_maxsize: The maximum number of lookups kept that found
+        no definitions, separately from other entries, defaults to 1024.
+        ``0`` means lookups that found no definitions are not cached.
+    :type negative_maxsize: int
+    :param negative_ttl: The number of seconds a lookup that found
+        no definitions is kept for, defaults to 60.
+        :data:`None` keeps them until they are evicted.
+    :type negative_ttl: Optional[float]
+
+    .. attribute:: hits
+
+        The number of lookups that found an entry
+
+        :type: int
+
+    .. attribute:: misses
+
+        The number of lookups that did not find an entry,
+        including those that found an expired entry
+
+        :type: int
+
+    .. attribute:: evictions
+
+        The number of entries removed to keep the cache within
+        :paramref:`maxsize`, or because they had expired
+
+        :type: int
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 300.0,
+        key_func: Callable[[str], Hashable] = normalise_term,
+        negative_maxsize: int = 1024,
+        negative_ttl: Optional[float] = 60.0
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if negative_maxsize < 0:
+            raise ValueError("negative_maxsize must not be negative")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.key_func = key_func
+        self.negative_maxsize = negative_maxsize
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._negatives = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def term_key(self, term: str) -> Hashable:
+        """Returns the key for definitions of a term
+
+        :param term: The term
+        :type term: str
+        :rtype: Hashable
+        """
+        return ('term', self.key_func(term))
+
+    @staticmethod
+    def defid_key(defid: int) -> Hashable:
+        """Returns the key for a definition ID
+
+        :param defid: The ID of the definition
+        :type defid: int
+        :rtype: Hashable
+        """
+        return ('defid', defid)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value for a key, or :paramref:`default` if the key
+        is not in the cache or has expired
+
+        :param key: The key to look up
+        :type key: Hashable
+        :param default: The value to return if there is no entry
+        :type default: Any
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._entries[key]
+                self.evictions += 1
+
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, *, ttl: Optional[float] = None):
+        """Adds an entry to the cache, evicting the least recently used
+        entries if the cache is full
+
+        :param key: The key of the entry
+        :type key: Hashable
+        :param value: The value of the entry
+        :type value: Any
+        :param ttl: The number of seconds the entry is kept for,
+            defaults to :attr:`ttl`
+        :type ttl: Optional[float]
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._negatives.pop(key, None)
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_negative(self, key: Hashable):
+        """Records that the lookup for a key found no definitions,
+        evicting the least recently recorded lookups if there are
+        more than :attr:`negative_maxsize`
+
+        :param key: The key of the lookup
+        :type key: Hashable
+        """
+        if not self.negative_maxsize:
+            return
+        ttl = self.negative_ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries.pop(key, None)
+            self._negatives[key] = expires
+            self._negatives.move_to_end(key)
+            while len(self._negatives) > self.negative_maxsize:
+                self._negatives.popitem(last=False)
+
+    def is_negative(self, key: Hashable) -> bool:
+        """Returns :data:`True` if the lookup for a key is known
+        to have found no definitions, and has not expired
+
+        The lock is only held to remove an expired lookup,
+        as looking up a key in a dictionary is atomic.
+
+        :param key: The key of the lookup
+        :type key: Hashable
+        :rtype: bool
+        """
+        expires = self._negatives.get(key, MISSING)
+        if expires is MISSING:
+            return False
+        if expires is None or expires > time.monotonic():
+            return True
+        with self._lock:
+            # The lookup may have been recorded again since
+            if self._negatives.get(key, MISSING) == expires:
+                del self._negatives[key]
+        return False
+
+    def clear(self):
+        """Removes all entries from the cache,
+        including lookups that found no definitions
+
+        The counters are not reset.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._negatives.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (
+                entry[0] is None or entry[0] > time.monotonic()
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            "Cache(maxsize={0.maxsize}, ttl={0.ttl}, hits={0.hits}, "
+            "misses={0.misses}, evictions={0.evictions})"
+        ).format(self)
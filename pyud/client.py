@@ -19,26 +19,519 @@ You should have received a copy of the GNU General Public License
 along with pyud.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-import json
-from typing import List, Optional, Union
-from urllib import request
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib import error
 from urllib.parse import quote as url_quote
 
-import aiohttp
-
+from . import cache as cache_
+from . import crawl as crawl_
 from . import definition
+from . import index as index_
+from . import feed
+from . import json_backend as json_backend_
+from . import metrics as metrics_
+from . import pool
+from . import prefetch as prefetch_
+from . import ratelimit
+from . import retry as retry_
+from . import stream as stream_
+from . import store as store_
+from . import transport as transport_
+
+if TYPE_CHECKING:
+    # asyncio is otherwise only imported by _asyncio
+    import asyncio  # noqa: F401
+
+    import aiohttp  # noqa: F401
 
 BASE_URL = "https://api.urbandictionary.com/v0/"
 DEFINE_BY_TERM_URL = BASE_URL + "define?term={}"
 DEFINE_BY_ID_URL = BASE_URL + "define?defid={}"
 RANDOM_URL = BASE_URL + "random"
 
+Lookup = Tuple[str, Any]
+DefineResult = Union[Optional[List['definition.Definition']], Exception]
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "pyud (https://github.com/WilliamWFLee/pyud)",
+}
+
+
+def _asyncio():
+    """
+    Returns the asyncio module, which is imported on first use so that
+    it is only imported by programs that use the asynchronous client
+    """
+    import asyncio
+
+    return asyncio
+
 
 class ClientBase:
     """
     Base class for the Client and AsyncClient
+
+    The options here are accepted as keyword arguments
+    by both :class:`Client` and :class:`AsyncClient`.
+
+    :param concurrency: The maximum number of requests a single call
+        sends to the API at the same time, defaults to 10
+    :type concurrency: int
+    :param cache: The cache used for definitions of terms
+        and definitions by ID, defaults to :data:`None` (no caching)
+    :type cache: Optional[Cache]
+    :param store: The persistent store used for definitions of terms
+        and definitions by ID, consulted after the cache,
+        defaults to :data:`None`
+    :type store: Optional[DefinitionStore]
+    :param lazy_timestamps: Whether :attr:`Definition.written_on`
+        is parsed when first accessed, rather than when definitions
+        are created, defaults to :data:`False`
+    :type lazy_timestamps: bool
+    :param json_backend: The library used to decode responses from the API,
+        one of ``'orjson'``, ``'ujson'`` or ``'json'``, or ``'auto'``
+        to use the fastest library installed, defaults to ``'auto'``
+    :type json_backend: str
+    :param rate_limiter: The token bucket limiting the rate at which
+        requests are sent, which can be shared between clients,
+        defaults to :data:`None` (no limit)
+    :type rate_limiter: Optional[TokenBucket]
+    :param concurrency_controller: The controller adapting the number
+        of requests in progress at the same time, which can be shared
+        between clients, defaults to :data:`None`
+    :type concurrency_controller: Optional[AIMDController]
+    :param timeout: The number of seconds to wait for a connection
+        or a response before giving up, defaults to 30.
+        :data:`None` means no timeout. For :class:`Client`, this applies
+        to each socket operation, such as connecting or receiving
+        part of the response, so a request can take longer
+        if data keeps arriving. For :class:`AsyncClient`, this applies
+        to the whole request, including reading the response.
+    :type timeout: Optional[float]
+    :param retry: How requests that fail are retried,
+        defaults to :data:`None` (no retries)
+    :type retry: Optional[RetryPolicy]
+    :param hedge: Whether a second request is sent if the first has not
+        completed after the 95th percentile of recent latencies,
+        using whichever response arrives first, defaults to :data:`False`.
+        :class:`Client` sends the first request from the calling thread
+        and cannot abandon it, so it only uses the second response
+        if the first request fails, for example by timing out.
+    :type hedge: bool
+    :param hedge_delay: The number of seconds after which a second request
+        is sent until enough latencies have been recorded, defaults to 1
+    :type hedge_delay: float
+    :param base_url: The URL the paths of the API are relative to,
+        defaults to :data:`BASE_URL`
+    :type base_url: Optional[str]
+    :param metrics: The metrics the time taken by each stage of lookups,
+        requests, errors and cache hits are recorded in, which can be
+        shared between clients, defaults to :data:`None` (not recorded)
+    :type metrics: Optional[Metrics]
+    :param prefetch: How the terms referenced by definitions found by
+        ``define`` are prefetched into the cache in the background,
+        defaults to :data:`None` (no prefetching). A cache must be given.
+    :type prefetch: Optional[PrefetchPolicy]
+    :param index: The index that every definition obtained by the client
+        is added to, defaults to :data:`None`
+    :type index: Optional[DefinitionIndex]
+
+    .. attribute:: retries
+
+        The number of requests that have been retried
+
+        :type: int
+
+    .. attribute:: hedges
+
+        The number of hedged requests that have been sent
+
+        :type: int
+
+    .. attribute:: prefetches
+
+        The number of referenced terms prefetched into the cache
+
+        :type: int
+
+    .. attribute:: prefetch_hits
+
+        The number of lookups that found an entry in the cache
+        that had been prefetched, the first time it was found
+
+        :type: int
+
+    .. attribute:: prefetch_cancels
+
+        The number of prefetches cancelled before they completed,
+        because a newer lookup no longer referenced their term
+
+        :type: int
     """
 
+    def __init__(
+        self,
+        *,
+        concurrency: int = 10,
+        cache: Optional['cache_.Cache'] = None,
+        store: Optional['store_.DefinitionStore'] = None,
+        lazy_timestamps: bool = False,
+        json_backend: str = 'auto',
+        rate_limiter: Optional['ratelimit.TokenBucket'] = None,
+        concurrency_controller: Optional['ratelimit.AIMDController'] = None,
+        timeout: Optional[float] = 30.0,
+        retry: Optional['retry_.RetryPolicy'] = None,
+        hedge: bool = False,
+        hedge_delay: float = 1.0,
+        base_url: Optional[str] = None,
+        metrics: Optional['metrics_.Metrics'] = None,
+        prefetch: Optional['prefetch_.PrefetchPolicy'] = None,
+        index: Optional['index_.DefinitionIndex'] = None
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if prefetch is not None and cache is None:
+            raise ValueError("prefetch requires a cache")
+        self.concurrency = concurrency
+        self.cache = cache
+        self.store = store
+        self.lazy_timestamps = lazy_timestamps
+        self._json_loads = json_backend_.get_loads(json_backend)
+        self.rate_limiter = rate_limiter
+        self.concurrency_controller = concurrency_controller
+        self.timeout = timeout
+        self.retry = retry
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.base_url = BASE_URL if base_url is None else base_url
+        self.metrics = metrics
+        self.prefetch = prefetch
+        self._prefetcher = (
+            None if prefetch is None else prefetch_.Prefetcher(prefetch)
+        )
+        self.index = index
+        if index is not None and index.client is None:
+            index.client = self
+        self._define_by_term_url = self.base_url + "define?term={}"
+        self._define_by_id_url = self.base_url + "define?defid={}"
+        self._random_url = self.base_url + "random"
+        self.retries = 0
+        self.hedges = 0
+        self.prefetches = 0
+        self.prefetch_hits = 0
+        self.prefetch_cancels = 0
+        self._counter_lock = threading.Lock()
+        self._latencies = retry_.LatencyTracker()
+
+    def _request_started(self):
+        """
+        Waits until a request is allowed to be sent by the rate limiter
+        and the concurrency controller, blocking while waiting
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.concurrency_controller is not None:
+            self.concurrency_controller.acquire()
+
+    async def _request_started_async(self):
+        """
+        Waits until a request is allowed to be sent by the rate limiter
+        and the concurrency controller, without blocking the event loop
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+        if self.concurrency_controller is not None:
+            await self.concurrency_controller.acquire_async()
+
+    def _request_finished(
+        self,
+        started: float,
+        status: Optional[int] = None,
+        error: bool = False,
+    ):
+        """
+        Reports the outcome of a request started at the time given
+        to the concurrency controller, and records its latency
+        """
+        latency = time.monotonic() - started
+        if status == 200:
+            self._latencies.add(latency)
+        if self.concurrency_controller is not None:
+            self.concurrency_controller.release(
+                latency=latency, status=status, error=error
+            )
+
+    def _count(self, name: str):
+        """
+        Increments the counter with the name given
+        """
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+        if self.metrics is not None:
+            self.metrics.inc(name + '_total')
+
+    def _record_error(self, exc: BaseException):
+        """
+        Counts an error raised by a request in the metrics
+        """
+        if self.metrics is not None:
+            self.metrics.inc('errors_total', type(exc).__name__)
+
+    def _record_request(
+        self,
+        url: str,
+        status: int,
+        size: Optional[int],
+        timings: Iterable[Tuple[str, float]],
+    ):
+        """
+        Records a request and the time taken by each of its stages
+        in the metrics, which must not be :data:`None`
+        """
+        metrics = self.metrics
+        metrics.inc('requests_total', str(status))
+        if size is not None:
+            metrics.inc('response_bytes_total', amount=size)
+        for stage, seconds in timings:
+            metrics.observe(stage, seconds, url)
+
+    def _should_retry(self, exc: Exception, retry: int) -> bool:
+        """
+        Returns :data:`True` if a request that raised the exception given
+        after the number of retries given should be retried
+        """
+        return (
+            self.retry is not None
+            and retry + 1 < self.retry.attempts
+            and self._is_retryable(exc)
+        )
+
+    def _is_retryable(self, exc: Exception) -> bool:
+        """
+        Returns :data:`True` if the exception given is a connection error,
+        a timeout, or an error response with a status code that is retried
+        """
+        if isinstance(exc, error.HTTPError):
+            return self.retry.retries_status(exc.code)
+        # Such as aiohttp.ClientResponseError
+        status = getattr(exc, 'status', None)
+        if isinstance(status, int):
+            return self.retry.retries_status(status)
+        return isinstance(exc, self._transport.errors)
+
+    def _hedge_delay(self) -> float:
+        """
+        Returns the number of seconds after which a hedged request is sent
+        """
+        if len(self._latencies) >= retry_.HEDGE_MIN_SAMPLES:
+            return self._latencies.percentile(0.95)
+        return self.hedge_delay
+
+    def _cache_key(self, lookup: Lookup) -> Hashable:
+        """
+        Returns the cache key for a lookup
+        """
+        kind, value = lookup
+        if kind == 'term':
+            return self.cache.term_key(value)
+        return self.cache.defid_key(value)
+
+    def _cache_lookup(self, lookup: Optional[Lookup]) -> Any:
+        """
+        Returns the list of definition objects cached for the lookup,
+        :data:`None` if the lookup is known to find no definitions,
+        or :data:`cache.MISSING` if there is none
+        """
+        if self.cache is None or lookup is None:
+            return cache_.MISSING
+        key = self._cache_key(lookup)
+        if self.cache.is_negative(key):
+            if self.metrics is not None:
+                self.metrics.inc('negative_cache_hits_total')
+            return None
+        data = self.cache.get(key, cache_.MISSING)
+        if (
+            self._prefetcher is not None
+            and data is not cache_.MISSING
+            and self._prefetcher.use(key)
+        ):
+            self._count('prefetch_hits')
+        if self.metrics is not None:
+            self.metrics.inc(
+                'cache_misses_total'
+                if data is cache_.MISSING
+                else 'cache_hits_total'
+            )
+        return data
+
+    def _cache_store(
+        self, lookup: Optional[Lookup], data: Optional[List[Dict[str, Any]]]
+    ):
+        """
+        Caches the list of definition objects for the lookup,
+        or that it found no definitions if the list is empty
+        """
+        if self.cache is None or lookup is None:
+            return
+        if data:
+            self.cache.set(self._cache_key(lookup), data)
+        else:
+            self.cache.set_negative(self._cache_key(lookup))
+
+    def _store_lookup(self, lookup: Optional[Lookup]) -> Any:
+        """
+        Returns the list of definition objects in the store for the lookup,
+        or :data:`cache.MISSING` if there is none
+
+        This blocks while the store is read.
+        """
+        if self.store is None or lookup is None:
+            return cache_.MISSING
+        kind, value = lookup
+        if kind == 'term':
+            data = self.store.get_term(value)
+        else:
+            data = self.store.get_defid(value)
+        if self.metrics is not None:
+            self.metrics.inc(
+                'store_misses_total'
+                if data is cache_.MISSING
+                else 'store_hits_total'
+            )
+        return data
+
+    def _store_entry(
+        self, lookup: Optional[Lookup], data: Optional[List[Dict[str, Any]]]
+    ) -> Optional['store_.Entry']:
+        """
+        Returns the entry to write to the store for the lookup,
+        or :data:`None` if there is nothing to write
+        """
+        if self.store is None or lookup is None or not data:
+            return
+        kind, value = lookup
+        return (value if kind == 'term' else None, data)
+
+    def _schedule_prefetch(
+        self, term: str, definitions: List['definition.Definition']
+    ):
+        """
+        Prefetches the terms referenced most often by the definitions found
+        for a term, cancelling prefetches for earlier lookups
+        """
+        selected = self._prefetcher.select(term, definitions, self.cache)
+        dropped, stale = self._prefetcher.replace(selected)
+        cancelled = dropped + sum(future.cancel() for future in stale)
+        for _ in range(cancelled):
+            self._count('prefetch_cancels')
+        self._start_prefetches()
+
+    def _start_prefetches(self):
+        """
+        Starts queued prefetches while the prefetch policy allows
+        """
+        while not self.closed:
+            item = self._prefetcher.next_to_start(self.cache)
+            if item is None:
+                return
+            key, word = item
+            future = self._submit_prefetch(word)
+            if future is None:
+                self._prefetcher.finished(key, None)
+                return
+            self._prefetcher.started(key, future)
+            future.add_done_callback(
+                functools.partial(self._prefetch_done, key)
+            )
+
+    def _submit_prefetch(self, word: str) -> Any:
+        """
+        Starts prefetching a term, returning a future or task,
+        or :data:`None` if the client has been closed
+        """
+        raise NotImplementedError
+
+    def _prefetch_done(self, key: Hashable, future: Any):
+        """
+        Forgets a completed prefetch, and starts the next queued prefetch
+        """
+        self._prefetcher.finished(key, future)
+        if not future.cancelled():
+            # Errors have already been recorded in the metrics
+            future.exception()
+        self._start_prefetches()
+
+    def _prefetched(self, lookup: Lookup, data: Any):
+        """
+        Records the definition objects prefetched for a lookup
+        """
+        if data:
+            self._prefetcher.add_unused(self._cache_key(lookup), data)
+            self._count('prefetches')
+
+    @staticmethod
+    def _unique_terms(terms: Iterable[str]) -> List[str]:
+        """
+        Returns the terms given with duplicates removed,
+        keeping the first occurrence of each term
+        """
+        seen = set()  # type: Set[str]
+        unique = []
+        for term in terms:
+            if term not in seen:
+                seen.add(term)
+                unique.append(term)
+        return unique
+
+    @staticmethod
+    def _random_pages_needed(count: int) -> int:
+        """
+        Returns the number of pages of random definitions
+        needed to obtain the number of definitions given
+        """
+        return max(0, -(-count // 10))
+
+    @staticmethod
+    def _merge_random_pages(
+        definitions: List['definition.Definition'],
+        pages: Iterable[Optional[List['definition.Definition']]],
+        seen: Optional[Set[int]],
+    ):
+        """
+        Extends the list of definitions with the pages given,
+        skipping definitions whose ID is in :paramref:`seen`
+        if it is not :data:`None`
+        """
+        for page in pages:
+            for definition_ in page or ():
+                if seen is not None:
+                    if definition_.defid in seen:
+                        continue
+                    seen.add(definition_.defid)
+                definitions.append(definition_)
+
     def _parse_definitions_from_json(
         self, data: Union[str, bytes, bytearray]
     ) -> Optional[List['definition.Definition']]:
@@ -48,10 +541,18 @@ class ClientBase:
         The format of the JSON is a single array of definition objects
         under the key 'list' in the JSON document
         """
+        return self._build_definitions(self._decode_definitions_json(data))
 
+    def _decode_definitions_json(
+        self, data: Union[str, bytes, bytearray]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the list of definition objects from JSON,
+        or :data:`None` if there are none
+        """
         try:
-            parsed_data = json.loads(data, strict=False)
-        except json.JSONDecodeError:
+            parsed_data = self._json_loads(data)
+        except ValueError:
             raise Exception(
                 "JSON was not given in the correct format"
             ) from None
@@ -59,17 +560,46 @@ class ClientBase:
         if 'list' not in parsed_data or not parsed_data['list']:
             return
 
-        definitions_list = parsed_data['list']
+        return parsed_data['list']
+
+    def _build_definitions(
+        self, definitions_list: Optional[List[Dict[str, Any]]]
+    ) -> Optional[List['definition.Definition']]:
+        """
+        Returns a list of Definitions from a list of definition objects,
+        or :data:`None` if there are none
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter()
+
         definitions = []
 
-        for dictionary in definitions_list:
-            try:
-                definitions += [definition.Definition(self, **dictionary)]
-            except TypeError:
-                pass
+        for dictionary in definitions_list or ():
+            definition_ = self._build_definition(dictionary)
+            if definition_ is not None:
+                definitions += [definition_]
+
+        if metrics is not None:
+            metrics.observe('build', time.perf_counter() - started)
 
         return definitions if definitions else None
 
+    def _build_definition(
+        self, dictionary: Dict[str, Any]
+    ) -> Optional['definition.Definition']:
+        """
+        Returns a Definition from a definition object,
+        or :data:`None` if the object is missing attributes
+        """
+        try:
+            definition_ = definition.Definition(self, **dictionary)
+        except TypeError:
+            return None
+        if self.index is not None:
+            self.index.add_objects((dictionary,))
+        return definition_
+
     def __str__(self):
         return "Instance of {0.__name__}".format(type(self))
 
@@ -80,18 +610,305 @@ class ClientBase:
 class Client(ClientBase):
     """
     Synchronous client for the Urban Dictionary API
+
+    Requests are sent over a pool of persistent connections,
+    which is safe to share between threads. The client should be closed
+    once you are done with it, either by calling :meth:`close`,
+    or by using it as a context manager:
+
+    .. code-block:: py
+
+        with pyud.Client() as ud:
+            definitions = ud.define("hello")
+
+    :param pool_size: The maximum number of idle connections kept open
+        for reuse, defaults to 10
+    :type pool_size: int
+    :param idle_timeout: The number of seconds after which an idle
+        connection is closed, defaults to 30
+    :type idle_timeout: float
+    :param transport: The transport used to send requests.
+        If given, the transport is not closed by :meth:`close`,
+        and the pool options are ignored.
+    :type transport: Optional[Transport]
+
+    Other options are described in :class:`ClientBase`.
     """
 
-    def _fetch_definitions(
+    def __init__(
+        self,
+        *,
+        pool_size: int = 10,
+        idle_timeout: float = 30.0,
+        transport: Optional['transport_.Transport'] = None,
+        **options: Any
+    ):
+        super().__init__(**options)
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = pool.ConnectionPool(
+                maxsize=pool_size,
+                idle_timeout=idle_timeout,
+                timeout=self.timeout,
+            )
+        self._transport = transport
+        self._closed = False
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        self._hedge_executor = None  # type: Optional[ThreadPoolExecutor]
+        self._prefetch_executor = None  # type: Optional[ThreadPoolExecutor]
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool used for concurrent requests,
+        creating it if needed
+        """
+        with self._executor_lock:
+            if self._closed:
+                raise RuntimeError("Client has been closed")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency
+                )
+            return self._executor
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool the second request of a hedged request
+        is sent from, creating it if needed
+
+        This is separate from the thread pool used for concurrent requests,
+        since hedged requests are sent from its threads.
+        """
+        with self._executor_lock:
+            if self._closed:
+                raise RuntimeError("Client has been closed")
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency
+                )
+            return self._hedge_executor
+
+    def _submit_prefetch(self, word: str) -> Any:
+        with self._executor_lock:
+            if self._closed:
+                return None
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=self.prefetch.concurrency
+                )
+            return self._prefetch_executor.submit(self._prefetch_term, word)
+
+    def _prefetch_term(self, word: str):
+        """
+        Adds the definitions of a referenced term to the cache
+        """
+        lookup = ('term', word)
+        key = self._cache_key(lookup)
+        if key in self.cache or self.cache.is_negative(key):
+            return
+        data = self._fetch_uncached(
+            self._define_by_term_url.format(url_quote(word)), lookup
+        )
+        self._cache_store(lookup, data)
+        self._prefetched(lookup, data)
+
+    def _fetch_many(
+        self, urls: List[str]
+    ) -> List[Optional[List['definition.Definition']]]:
+        """
+        Fetch definitions from each of the API urls given concurrently,
+        returning the results in the same order
+        """
+        if len(urls) == 1:
+            return [self._fetch_definitions(urls[0])]
+        return list(self._get_executor().map(self._fetch_definitions, urls))
+
+    def _fetch_json(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects from the API url given,
+        retrying and hedging the request as configured
+        """
+        retry = 0
+        while True:
+            try:
+                if self.hedge:
+                    return self._request_json_hedged(url)
+                return self._request_json(url)
+            except Exception as exc:
+                self._record_error(exc)
+                if not self._should_retry(exc, retry):
+                    raise
+            time.sleep(self.retry.delay(retry))
+            retry += 1
+            self._count('retries')
+
+    def _request_json_hedged(
         self, url: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects from the API url given,
+        sending a second request if the first is slow
+
+        The first request is sent from the calling thread, so that hedging
+        does not limit the number of lookups in progress, and the second
+        from a thread pool. The first request cannot be abandoned,
+        so the response to the second is only used if the first fails.
+        """
+        hedges = []
+
+        def send_hedge():
+            try:
+                executor = self._get_hedge_executor()
+            except RuntimeError:
+                # The client was closed while the first request was sent
+                return
+            self._count('hedges')
+            hedges.append(executor.submit(self._request_json, url))
+
+        timer = threading.Timer(self._hedge_delay(), send_hedge)
+        timer.daemon = True
+        timer.start()
+        try:
+            return self._request_json(url)
+        except Exception as exc:
+            timer.cancel()
+            timer.join()
+            if not hedges:
+                raise
+            try:
+                return hedges[0].result()
+            except Exception:
+                raise exc
+        finally:
+            timer.cancel()
+
+    def _request_json(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects from the API url given,
+        sending a single request
+        """
+        if self._closed:
+            raise RuntimeError("Client has been closed")
+        self._request_started()
+        started = time.monotonic()
+        status = None
+        try:
+            response = self._transport.open('GET', url, headers=HEADERS)
+            status = response.status
+            with response:
+                if response.status != 200:
+                    if self.metrics is not None:
+                        self._record_request(url, response.status, None, ())
+                    raise error.HTTPError(
+                        url,
+                        response.status,
+                        response.reason,
+                        response.headers,
+                        None,
+                    )
+                body_started = time.perf_counter()
+                body = response.read()
+        except BaseException:
+            # Responses with an error status are reported by their status
+            self._request_finished(
+                started, status, error=status in (None, 200)
+            )
+            raise
+        # The request is only finished once its body has been read,
+        # so that it counts towards the requests in progress until then
+        self._request_finished(started, status)
+        decode_started = time.perf_counter()
+        data = self._decode_definitions_json(body)
+
+        if self.metrics is not None:
+            finished = time.perf_counter()
+            self._record_request(
+                url,
+                response.status,
+                len(body),
+                (
+                    ('connect', response.connect_time),
+                    ('ttfb', response.wait_time),
+                    ('body', decode_started - body_started),
+                    ('decode', finished - decode_started),
+                    (
+                        'request',
+                        response.connect_time
+                        + response.wait_time
+                        + finished
+                        - body_started,
+                    ),
+                ),
+            )
+        return data
+
+    def _fetch_definitions(
+        self, url: str, *, lookup: Optional[Lookup] = None
     ) -> Optional[List['definition.Definition']]:
         """
         Fetch definitions from the API url given
+
+        The cache and the store are used if :paramref:`lookup` is given.
+        """
+        data = self._cache_lookup(lookup)
+        if data is cache_.MISSING:
+            data = self._fetch_uncached(url, lookup)
+            self._cache_store(lookup, data)
+
+        return self._build_definitions(data)
+
+    def _fetch_uncached(
+        self, url: str, lookup: Optional[Lookup]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects for the lookup from the store,
+        or from the API url given, adding it to the store
+        """
+        data = self._store_lookup(lookup)
+        if data is cache_.MISSING:
+            data = self._fetch_json(url)
+            entry = self._store_entry(lookup, data)
+            if entry is not None:
+                self.store.put_many([entry])
+        return data
+
+    @property
+    def closed(self) -> bool:
+        """:data:`True` if the client has been closed
+
+        :type: bool
+        """
+        return self._closed
+
+    def close(self):
+        """Closes the client, and any idle connections it holds
+
+        Calling this more than once has no effect.
         """
-        with request.urlopen(url) as response:  # nosec
-            return self._parse_definitions_from_json(
-                response.read().decode('utf-8')
+        with self._executor_lock:
+            self._closed = True
+            if self._owns_transport:
+                self._transport.close()
+            executors = (
+                self._executor,
+                self._hedge_executor,
+                self._prefetch_executor,
             )
+            self._executor = self._hedge_executor = None
+            self._prefetch_executor = None
+        if self._prefetcher is not None:
+            for future in self._prefetcher.clear():
+                future.cancel()
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def define(self, term: str) -> Optional[List['definition.Definition']]:
         """Finds definitions for a given term
@@ -101,8 +918,202 @@ class Client(ClientBase):
         :return: A list of definitions or :data:`None` if not found
         :rtype: Optional[List[Definition]]
         """
-        return self._fetch_definitions(
-            DEFINE_BY_TERM_URL.format(url_quote(term))
+        url = self._define_by_term_url.format(url_quote(term))
+        lookup = ('term', term)
+        if self._prefetcher is None:
+            return self._fetch_definitions(url, lookup=lookup)
+
+        # Waits for the term to be prefetched, rather than requesting it again
+        future = self._prefetcher.adopt(self._cache_key(lookup))
+        if future is not None:
+            wait([future])
+        definitions = self._fetch_definitions(url, lookup=lookup)
+        if definitions:
+            self._schedule_prefetch(term, definitions)
+        return definitions
+
+    def iter_define(
+        self, term: str, *, chunk_size: int = 8192
+    ) -> Iterator['definition.Definition']:
+        """Finds definitions for a given term, yielding each definition
+        as soon as it has been received
+
+        The response is parsed as it is read, so that the first definitions
+        are available before the whole response has been received.
+        Closing the iterator early stops reading the response.
+        The cache and store are only updated if the iterator
+        is exhausted.
+
+        :param term: The term to find definitions for
+        :type term: str
+        :param chunk_size: The number of bytes read from the response
+            at a time, defaults to 8192
+        :type chunk_size: int
+        :return: An iterator of definitions, which is empty if none are found
+        :rtype: Iterator[Definition]
+        """
+        lookup = ('term', term)
+        data = self._cache_lookup(lookup)
+        if data is cache_.MISSING:
+            data = self._store_lookup(lookup)
+            if data is not cache_.MISSING:
+                self._cache_store(lookup, data)
+        if data is not cache_.MISSING:
+            yield from self._build_definitions(data) or ()
+            return
+
+        url = self._define_by_term_url.format(url_quote(term))
+        parser = stream_.DefinitionStreamParser(self._json_loads)
+        data = []
+        self._request_started()
+        started = time.monotonic()
+        try:
+            response = self._transport.open('GET', url, headers=HEADERS)
+        except BaseException:
+            self._request_finished(started, error=True)
+            raise
+        # Unlike other requests, this is finished once the headers arrive,
+        # as the body is read at the pace of the caller, which may send
+        # further requests while iterating
+        self._request_finished(started, response.status)
+        if self.metrics is not None:
+            self._record_request(
+                url,
+                response.status,
+                None,
+                (
+                    ('connect', response.connect_time),
+                    ('ttfb', response.wait_time),
+                ),
+            )
+        with response:
+            if response.status != 200:
+                raise error.HTTPError(
+                    url,
+                    response.status,
+                    response.reason,
+                    response.headers,
+                    None,
+                )
+
+            while not parser.done:
+                chunk = response.read(chunk_size)
+                if not chunk:
+                    break
+                for dictionary in parser.feed(chunk):
+                    data.append(dictionary)
+                    definition_ = self._build_definition(dictionary)
+                    if definition_ is not None:
+                        yield definition_
+
+            # Reads the rest of the response, so the connection can be reused
+            while response.read(chunk_size):
+                pass
+        parser.close()
+
+        entry = self._store_entry(lookup, data)
+        if entry is not None:
+            self.store.put_many([entry])
+        self._cache_store(lookup, data)
+
+    def define_many(
+        self, terms: Iterable[str], *, concurrency: Optional[int] = None
+    ) -> Dict[str, DefineResult]:
+        """Finds definitions for each of the terms given concurrently
+
+        Duplicate terms are only looked up once. An error raised while
+        looking up one term does not affect the other terms, and is instead
+        given as the result for that term.
+
+        :param terms: The terms to find definitions for
+        :type terms: Iterable[str]
+        :param concurrency: The maximum number of terms looked up
+            at the same time, defaults to :attr:`concurrency`
+        :type concurrency: Optional[int]
+        :return: A dictionary of each term to a list of definitions,
+            :data:`None` if not found, or the exception raised
+        :rtype: Dict[str, Union[Optional[List[Definition]], Exception]]
+        """
+        return dict(
+            self.define_many_as_completed(terms, concurrency=concurrency)
+        )
+
+    def define_many_as_completed(
+        self, terms: Iterable[str], *, concurrency: Optional[int] = None
+    ) -> Iterator[Tuple[str, DefineResult]]:
+        """Finds definitions for each of the terms given concurrently,
+        yielding results as they are completed
+
+        The parameters are the same as :meth:`define_many`. Lookups that
+        have not started are cancelled if the iterator is closed early.
+
+        :return: An iterator of pairs of each term and its result
+        :rtype: Iterator[Tuple[str, Union[Optional[List[Definition]], Exception]]]
+        """
+        if self.closed:
+            raise RuntimeError("Client has been closed")
+
+        def define(term):
+            try:
+                return term, self.define(term)
+            except Exception as exc:
+                return term, exc
+
+        terms = self._unique_terms(terms)
+        if not terms:
+            return
+        executor = ThreadPoolExecutor(
+            max_workers=min(concurrency or self.concurrency, len(terms))
+        )
+        futures = [executor.submit(define, term) for term in terms]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+
+    def crawl(
+        self,
+        seed_terms: Iterable[str],
+        *,
+        max_depth: int = 1,
+        max_terms: Optional[int] = 100,
+        concurrency: Optional[int] = None
+    ) -> Iterator['crawl_.CrawlResult']:
+        """Crawls the references between definitions, starting from
+        the seed terms, and yields the definitions of each term found
+
+        Terms are looked up in breadth-first order, with each term
+        only looked up once. Lookups run concurrently, and results
+        are yielded as they are completed. Closing the iterator early
+        cancels lookups that have not started.
+
+        :param seed_terms: The terms to start from
+        :type seed_terms: Iterable[str]
+        :param max_depth: The maximum number of references followed
+            from a seed term, defaults to 1
+        :type max_depth: int
+        :param max_terms: The maximum number of terms looked up,
+            defaults to 100. :data:`None` means no limit.
+        :type max_terms: Optional[int]
+        :param concurrency: The maximum number of terms looked up
+            at the same time, defaults to :attr:`concurrency`
+        :type concurrency: Optional[int]
+        :return: An iterator of the depth at which each term was found,
+            the term, and its definitions, :data:`None` if not found,
+            or the exception raised while looking it up
+        :rtype: Iterator[Tuple[int, str, Union[Optional[List[Definition]], Exception]]]
+        """
+        if self.closed:
+            raise RuntimeError("Client has been closed")
+        return crawl_.crawl(
+            self,
+            seed_terms,
+            max_depth=max_depth,
+            max_terms=max_terms,
+            concurrency=concurrency,
         )
 
     def from_id(self, defid: int) -> Optional['definition.Definition']:
@@ -113,39 +1124,449 @@ class Client(ClientBase):
         :return: The definition corresponding to the ID or :data:`None` if not found
         :rtype: Optional[Definition]
         """
-        definitions = self._fetch_definitions(DEFINE_BY_ID_URL.format(defid))
+        definitions = self._fetch_definitions(
+            self._define_by_id_url.format(defid),
+            lookup=('defid', defid),
+        )
 
         return definitions[0] if definitions else None
 
-    def random(self, *, limit: int = 10) -> List['definition.Definition']:
+    def random(
+        self, *, limit: int = 10, unique: bool = False
+    ) -> List['definition.Definition']:
         """Returns a random list of definitions
 
+        The pages of random definitions needed are fetched concurrently.
+
         :param limit: The number of definitions to return, defaults to 10
         :type limit: int
+        :param unique: Whether to leave out definitions
+            with an ID that has already been returned, defaults to :data:`False`
+        :type unique: bool
         :return: A list of definitions
         :rtype: List[Definition]
         """
-        definitions = []
-        for _ in range(limit // 10 + 1):
-            definitions += self._fetch_definitions(RANDOM_URL)
+        definitions = []  # type: List[definition.Definition]
+        seen = set() if unique else None
+        while len(definitions) < limit:
+            fetched = len(definitions)
+            pages = self._fetch_many(
+                [self._random_url]
+                * self._random_pages_needed(limit - len(definitions))
+            )
+            self._merge_random_pages(definitions, pages, seen)
+            if len(definitions) == fetched:
+                break
 
         return definitions[:limit]
 
+    def random_stream(
+        self, *, prefetch: int = 2, window: Optional[int] = 10000
+    ) -> Iterator['definition.Definition']:
+        """Yields random definitions without end,
+        fetching pages of definitions in the background
+
+        Up to :paramref:`prefetch` pages are fetched ahead of the
+        definitions being yielded, so that the next definition is
+        usually available without waiting for a response. A new page
+        is only requested once a fetched page has been taken,
+        so pages never pile up when definitions are consumed slowly.
+        Closing the iterator cancels pages that have not been requested.
+
+        :param prefetch: The number of pages fetched ahead, defaults to 2
+        :type prefetch: int
+        :param window: The number of most recent definition IDs remembered
+            to skip definitions already yielded, defaults to 10000.
+            :data:`None` remembers every ID, and ``0`` skips none.
+        :type window: Optional[int]
+        :return: An iterator of random definitions
+        :rtype: Iterator[Definition]
+        """
+        if self.closed:
+            raise RuntimeError("Client has been closed")
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        return feed.random_stream(self, prefetch=prefetch, window=window)
+
 
 class AsyncClient(ClientBase):
     """
     Asynchronous client for the Urban Dictionary API
+
+    By default, the client holds a single :class:`aiohttp.ClientSession`,
+    created lazily on first use, so that connections to the API are kept
+    alive and reused between requests. The client should be closed once you are
+    done with it, either by calling :meth:`aclose`, or by using
+    it as an asynchronous context manager:
+
+    .. code-block:: py
+
+        async with pyud.AsyncClient() as ud:
+            definitions = await ud.define("hello")
+
+    :param session: An existing session to use for requests.
+        If given, the session is not closed by :meth:`aclose`,
+        and the connector options are ignored.
+    :type session: Optional[aiohttp.ClientSession]
+    :param limit: The total number of simultaneous connections,
+        defaults to 100. ``0`` means no limit.
+    :type limit: int
+    :param limit_per_host: The number of simultaneous connections
+        to the same host, defaults to 0 (no limit)
+    :type limit_per_host: int
+    :param keepalive_timeout: The number of seconds an idle connection
+        is kept open for reuse, defaults to 15
+    :type keepalive_timeout: float
+    :param ttl_dns_cache: The number of seconds resolved DNS entries
+        are cached for, defaults to 10. :data:`None` caches entries forever.
+    :type ttl_dns_cache: Optional[int]
+    :param transport: The transport used to send requests.
+        If given, the transport is not closed by :meth:`aclose`,
+        and the session and connector options are ignored.
+    :type transport: Optional[AsyncTransport]
+
+    Other options are described in :class:`ClientBase`.
     """
 
-    async def _fetch_definitions(
+    def __init__(
+        self,
+        *,
+        session: Optional['aiohttp.ClientSession'] = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: Optional[int] = 10,
+        transport: Optional['transport_.AsyncTransport'] = None,
+        **options: Any
+    ):
+        super().__init__(**options)
+        self._owns_transport = transport is None
+        if transport is None:
+            # Imported here so that aiohttp is only imported
+            # by programs that use the asynchronous client
+            from . import aio
+
+            transport = aio.AiohttpTransport(
+                session=session,
+                limit=limit,
+                limit_per_host=limit_per_host,
+                keepalive_timeout=keepalive_timeout,
+                ttl_dns_cache=ttl_dns_cache,
+                timeout=self.timeout,
+                trace=self.metrics is not None,
+            )
+        self._transport = transport
+        self._pending = {}  # type: Dict[str, asyncio.Future]
+        self._store_writes = []  # type: List[store_.Entry]
+        self._store_flush = None  # type: Optional[asyncio.Future]
+        self._in_flight = 0
+        self._drained = None  # type: Optional[asyncio.Event]
+        self._closed = False
+
+    def _check_open(self):
+        """
+        Raises an error if the client has been closed
+        """
+        if self._closed:
+            raise RuntimeError("Client has been closed")
+
+    async def _fetch_json(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects from the API url given,
+        retrying and hedging the request as configured
+        """
+        retry = 0
+        while True:
+            try:
+                if self.hedge:
+                    return await self._request_json_hedged(url)
+                return await self._request_json(url)
+            except _asyncio().CancelledError:
+                raise
+            except Exception as exc:
+                self._record_error(exc)
+                if not self._should_retry(exc, retry):
+                    raise
+            await _asyncio().sleep(self.retry.delay(retry))
+            retry += 1
+            self._count('retries')
+
+    async def _request_json_hedged(
         self, url: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects from the API url given,
+        sending a second request if the first is slow
+        and returning the first successful response
+        """
+        futures = [_asyncio().ensure_future(self._request_json(url))]
+        try:
+            done, _ = await _asyncio().wait(
+                futures, timeout=self._hedge_delay()
+            )
+            if not done:
+                self._count('hedges')
+                futures.append(
+                    _asyncio().ensure_future(self._request_json(url))
+                )
+
+            first_error = None
+            for future in _asyncio().as_completed(futures):
+                try:
+                    return await future
+                except _asyncio().CancelledError:
+                    raise
+                except Exception as exc:
+                    first_error = first_error or exc
+            raise first_error
+        finally:
+            for future in futures:
+                future.cancel()
+                # Marks the exception of the slower request as retrieved
+                future.add_done_callback(
+                    lambda future: future.cancelled() or future.exception()
+                )
+
+    async def _request_json(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects from the API url given,
+        sending a single request
+        """
+        self._check_open()
+        self._in_flight += 1
+        try:
+            await self._request_started_async()
+            started = time.monotonic()
+            status = None
+            try:
+                response = await self._transport.open(
+                    'GET', url, headers=HEADERS
+                )
+                status = response.status
+                try:
+                    if response.status != 200:
+                        if self.metrics is not None:
+                            self._record_request(
+                                url, response.status, None, ()
+                            )
+                        response.raise_for_status()
+                    body_started = time.perf_counter()
+                    body = await response.read()
+                finally:
+                    response.release()
+            except BaseException:
+                # Responses with an error status are reported by their status
+                self._request_finished(
+                    started, status, error=status in (None, 200)
+                )
+                raise
+            # The request is only finished once its body has been read,
+            # so that it counts towards the requests in progress until then
+            self._request_finished(started, status)
+            decode_started = time.perf_counter()
+            data = self._decode_definitions_json(body)
+
+            if self.metrics is not None:
+                finished = time.perf_counter()
+                self._record_request(
+                    url,
+                    response.status,
+                    len(body),
+                    (
+                        ('connect', response.connect_time),
+                        ('ttfb', response.wait_time),
+                        ('body', decode_started - body_started),
+                        ('decode', finished - decode_started),
+                        (
+                            'request',
+                            response.connect_time
+                            + response.wait_time
+                            + finished
+                            - body_started,
+                        ),
+                    ),
+                )
+            return data
+        finally:
+            self._in_flight -= 1
+            if not self._in_flight and self._drained is not None:
+                self._drained.set()
+
+    async def _fetch_and_store(
+        self, url: str, lookup: Optional[Lookup]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the list of definition objects from the API url given,
+        and add it to the cache and the store for the lookup given
+        """
+        data = await self._fetch_json(url)
+        self._cache_store(lookup, data)
+
+        entry = self._store_entry(lookup, data)
+        if entry is not None:
+            self._store_writes.append(entry)
+            if self._store_flush is None:
+                self._store_flush = _asyncio().ensure_future(
+                    self._flush_store()
+                )
+
+        return data
+
+    async def _flush_store(self):
+        """
+        Writes queued entries to the store in a thread,
+        batching entries that are queued while a write is in progress
+        """
+        loop = _asyncio().get_event_loop()
+        try:
+            while self._store_writes:
+                entries, self._store_writes = self._store_writes, []
+                try:
+                    await loop.run_in_executor(
+                        None, self.store.put_many, entries
+                    )
+                except Exception:
+                    # Nothing waits on this task, so the error
+                    # would otherwise only be reported when it is collected
+                    logger.exception(
+                        "Failed to write %d entries to the store",
+                        len(entries),
+                    )
+        finally:
+            self._store_flush = None
+
+    async def _fetch_definitions(
+        self,
+        url: str,
+        *,
+        coalesce: bool = True,
+        lookup: Optional[Lookup] = None
     ) -> Optional[List['definition.Definition']]:
         """
         Fetch definitions from the API url given
+
+        The cache and the store are used if :paramref:`lookup` is given,
+        with the store being read in a thread.
+        Concurrent requests for the same url are coalesced into a single
+        request if :paramref:`coalesce` is :data:`True`. Each caller
+        still receives its own Definition objects.
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:  # nosec
-                return self._parse_definitions_from_json(await response.text())
+        data = self._cache_lookup(lookup)
+        if data is not cache_.MISSING:
+            return self._build_definitions(data)
+
+        if self.store is not None and lookup is not None:
+            data = await _asyncio().get_event_loop().run_in_executor(
+                None, self._store_lookup, lookup
+            )
+            if data is not cache_.MISSING:
+                self._cache_store(lookup, data)
+                return self._build_definitions(data)
+
+        if not coalesce:
+            return self._build_definitions(
+                await self._fetch_and_store(url, lookup)
+            )
+
+        future = self._pending.get(url)
+        if future is None:
+            future = _asyncio().ensure_future(
+                self._fetch_and_store(url, lookup)
+            )
+            self._pending[url] = future
+
+            def done(future):
+                if self._pending.get(url) is future:
+                    del self._pending[url]
+                if not future.cancelled():
+                    # Marks the exception as retrieved, in case
+                    # every caller was cancelled while waiting
+                    future.exception()
+
+            future.add_done_callback(done)
+
+        # Shielded so that a caller being cancelled
+        # does not cancel the request for other callers
+        return self._build_definitions(await _asyncio().shield(future))
+
+    def _submit_prefetch(self, word: str) -> Any:
+        if self._closed:
+            return None
+        return _asyncio().ensure_future(self._prefetch_term(word))
+
+    async def _prefetch_term(self, word: str):
+        """
+        Adds the definitions of a referenced term to the cache
+        """
+        lookup = ('term', word)
+        key = self._cache_key(lookup)
+        if key in self.cache or self.cache.is_negative(key):
+            return
+        data = cache_.MISSING
+        if self.store is not None:
+            data = await _asyncio().get_event_loop().run_in_executor(
+                None, self._store_lookup, lookup
+            )
+        if data is cache_.MISSING:
+            data = await self._fetch_and_store(
+                self._define_by_term_url.format(url_quote(word)), lookup
+            )
+        else:
+            self._cache_store(lookup, data)
+        self._prefetched(lookup, data)
+
+    async def _fetch_many(
+        self, urls: List[str], *, coalesce: bool = True
+    ) -> List[Optional[List['definition.Definition']]]:
+        """
+        Fetch definitions from each of the API urls given concurrently,
+        returning the results in the same order
+        """
+        semaphore = _asyncio().Semaphore(self.concurrency)
+
+        async def fetch(url):
+            async with semaphore:
+                return await self._fetch_definitions(url, coalesce=coalesce)
+
+        return await _asyncio().gather(*(fetch(url) for url in urls))
+
+    @property
+    def closed(self) -> bool:
+        """:data:`True` if the client has been closed
+
+        :type: bool
+        """
+        return self._closed
+
+    async def aclose(self):
+        """Closes the client
+
+        New requests are refused once this coroutine has been called,
+        while requests that are already in progress are allowed
+        to finish before the underlying transport is closed.
+        Calling this more than once has no effect.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._prefetcher is not None:
+            for task in self._prefetcher.clear():
+                task.cancel()
+        if self._in_flight:
+            self._drained = _asyncio().Event()
+            await self._drained.wait()
+        if self._store_flush is not None:
+            await self._store_flush
+
+        if self._owns_transport:
+            await self._transport.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
 
     async def define(
         self, term: str
@@ -157,8 +1578,177 @@ class AsyncClient(ClientBase):
         :return: A list of definitions or :data:`None` if not found
         :rtype: Optional[List[Definition]]
         """
-        return await self._fetch_definitions(
-            DEFINE_BY_TERM_URL.format(url_quote(term))
+        url = self._define_by_term_url.format(url_quote(term))
+        lookup = ('term', term)
+        if self._prefetcher is None:
+            return await self._fetch_definitions(url, lookup=lookup)
+
+        # Waits for the term to be prefetched, rather than requesting it again
+        task = self._prefetcher.adopt(self._cache_key(lookup))
+        if task is not None:
+            await _asyncio().wait([task])
+        definitions = await self._fetch_definitions(url, lookup=lookup)
+        if definitions:
+            self._schedule_prefetch(term, definitions)
+        return definitions
+
+    def aiter_define(
+        self, term: str, *, chunk_size: int = 8192
+    ) -> 'DefinitionStream':
+        """Finds definitions for a given term, yielding each definition
+        as soon as it has been received
+
+        The response is parsed as it is read, so that the first definitions
+        are available before the whole response has been received:
+
+        .. code-block:: py
+
+            async for definition in ud.aiter_define("hello"):
+                print(definition.word)
+
+        If the iteration is stopped early, :meth:`DefinitionStream.aclose`
+        should be awaited to stop reading the response. The cache and store
+        are only updated if the iterator is exhausted.
+
+        :param term: The term to find definitions for
+        :type term: str
+        :param chunk_size: The number of bytes read from the response
+            at a time, defaults to 8192
+        :type chunk_size: int
+        :return: An asynchronous iterator of definitions,
+            which is empty if none are found
+        :rtype: DefinitionStream
+        """
+        return DefinitionStream(self, term, chunk_size)
+
+    async def define_many(
+        self, terms: Iterable[str], *, concurrency: Optional[int] = None
+    ) -> Dict[str, DefineResult]:
+        """Finds definitions for each of the terms given concurrently
+
+        Duplicate terms are only looked up once. An error raised while
+        looking up one term does not affect the other terms, and is instead
+        given as the result for that term.
+
+        :param terms: The terms to find definitions for
+        :type terms: Iterable[str]
+        :param concurrency: The maximum number of terms looked up
+            at the same time, defaults to :attr:`concurrency`
+        :type concurrency: Optional[int]
+        :return: A dictionary of each term to a list of definitions,
+            :data:`None` if not found, or the exception raised
+        :rtype: Dict[str, Union[Optional[List[Definition]], Exception]]
+        """
+        results = {}
+        for future in self.define_many_as_completed(
+            terms, concurrency=concurrency
+        ):
+            term, result = await future
+            results[term] = result
+        return results
+
+    def define_many_as_completed(
+        self, terms: Iterable[str], *, concurrency: Optional[int] = None
+    ) -> Iterator[Awaitable[Tuple[str, DefineResult]]]:
+        """Finds definitions for each of the terms given concurrently,
+        returning an iterator of awaitables in the order they are completed
+
+        This works in the same way as :func:`asyncio.as_completed`,
+        and must be called while the event loop is running:
+
+        .. code-block:: py
+
+            for future in ud.define_many_as_completed(terms):
+                term, result = await future
+
+        The parameters are the same as :meth:`define_many`. Lookups that
+        have not completed are cancelled if the iterator is closed early,
+        for example by breaking out of the loop.
+
+        :return: An iterator of awaitables of pairs of each term
+            and its result
+        :rtype: Iterator[Awaitable[Tuple[str, Union[Optional[List[Definition]], Exception]]]]
+        """
+        if self._closed:
+            raise RuntimeError("Client has been closed")
+
+        semaphore = _asyncio().Semaphore(concurrency or self.concurrency)
+
+        async def define(term):
+            async with semaphore:
+                try:
+                    return term, await self.define(term)
+                except _asyncio().CancelledError:
+                    raise
+                except Exception as exc:
+                    return term, exc
+
+        terms = self._unique_terms(terms)
+        tasks = [_asyncio().ensure_future(define(term)) for term in terms]
+        return self._cancel_on_close(tasks, _asyncio().as_completed(tasks))
+
+    @staticmethod
+    def _cancel_on_close(
+        tasks: List['asyncio.Future'], iterator: Iterator[Awaitable[Any]]
+    ) -> Iterator[Awaitable[Any]]:
+        """
+        Yields from an iterator of awaitables for the tasks given,
+        cancelling the tasks if it is closed before it is exhausted
+        """
+        try:
+            yield from iterator
+        except GeneratorExit:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def crawl(
+        self,
+        seed_terms: Iterable[str],
+        *,
+        max_depth: int = 1,
+        max_terms: Optional[int] = 100,
+        concurrency: Optional[int] = None
+    ) -> 'crawl_.Crawl':
+        """Crawls the references between definitions, starting from
+        the seed terms, and yields the definitions of each term found
+
+        Terms are looked up in breadth-first order, with each term
+        only looked up once. Lookups run concurrently, and results
+        are yielded as they are completed:
+
+        .. code-block:: py
+
+            async for depth, term, definitions in ud.crawl(["hello"]):
+                print(depth, term)
+
+        If the iteration is stopped early, :meth:`Crawl.aclose`
+        should be awaited to cancel lookups in progress.
+
+        :param seed_terms: The terms to start from
+        :type seed_terms: Iterable[str]
+        :param max_depth: The maximum number of references followed
+            from a seed term, defaults to 1
+        :type max_depth: int
+        :param max_terms: The maximum number of terms looked up,
+            defaults to 100. :data:`None` means no limit.
+        :type max_terms: Optional[int]
+        :param concurrency: The maximum number of terms looked up
+            at the same time, defaults to :attr:`concurrency`
+        :type concurrency: Optional[int]
+        :return: An asynchronous iterator of the depth at which each term
+            was found, the term, and its definitions, :data:`None`
+            if not found, or the exception raised while looking it up
+        :rtype: Crawl
+        """
+        if self._closed:
+            raise RuntimeError("Client has been closed")
+        return crawl_.Crawl(
+            self,
+            seed_terms,
+            max_depth=max_depth,
+            max_terms=max_terms,
+            concurrency=concurrency,
         )
 
     async def from_id(self, defid: int) -> Optional['definition.Definition']:
@@ -170,23 +1760,195 @@ class AsyncClient(ClientBase):
         :rtype: Optional[Definition]
         """
         definitions = await self._fetch_definitions(
-            DEFINE_BY_ID_URL.format(defid)
+            self._define_by_id_url.format(defid),
+            lookup=('defid', defid),
         )
 
         return definitions[0] if definitions else None
 
     async def random(
-        self, *, limit: int = 10
+        self, *, limit: int = 10, unique: bool = False
     ) -> List['definition.Definition']:
         """Returns a random list of definitions
 
+        The pages of random definitions needed are fetched concurrently.
+
         :param limit: The number of definitions to return, defaults to 10
         :type limit: int
+        :param unique: Whether to leave out definitions
+            with an ID that has already been returned, defaults to :data:`False`
+        :type unique: bool
         :return: A list of definitions
         :rtype: List[Definition]
         """
-        definitions = []
-        for _ in range(limit // 10 + 1):
-            definitions += await self._fetch_definitions(RANDOM_URL)
+        definitions = []  # type: List[definition.Definition]
+        seen = set() if unique else None
+        while len(definitions) < limit:
+            fetched = len(definitions)
+            # Random pages are never coalesced,
+            # since each request gives different definitions
+            pages = await self._fetch_many(
+                [self._random_url]
+                * self._random_pages_needed(limit - len(definitions)),
+                coalesce=False,
+            )
+            self._merge_random_pages(definitions, pages, seen)
+            if len(definitions) == fetched:
+                break
 
         return definitions[:limit]
+
+    def arandom_stream(
+        self, *, prefetch: int = 2, window: Optional[int] = 10000
+    ) -> 'feed.RandomStream':
+        """Yields random definitions without end,
+        fetching pages of definitions in the background
+
+        Up to :paramref:`prefetch` pages are fetched ahead of the
+        definitions being yielded, so that the next definition is
+        usually available without waiting for a response. A new page
+        is only requested once a fetched page has been taken,
+        so pages never pile up when definitions are consumed slowly:
+
+        .. code-block:: py
+
+            stream = ud.arandom_stream(prefetch=4)
+            async for definition in stream:
+                if definition.thumbs_up > 1000:
+                    break
+            await stream.aclose()
+
+        :meth:`RandomStream.aclose` should be awaited once the stream
+        is no longer needed, to cancel pages being fetched.
+
+        :param prefetch: The number of pages fetched ahead, defaults to 2
+        :type prefetch: int
+        :param window: The number of most recent definition IDs remembered
+            to skip definitions already yielded, defaults to 10000.
+            :data:`None` remembers every ID, and ``0`` skips none.
+        :type window: Optional[int]
+        :return: An asynchronous iterator of random definitions
+        :rtype: RandomStream
+        """
+        self._check_open()
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        return feed.RandomStream(self, prefetch=prefetch, window=window)
+
+
+class DefinitionStream:
+    """
+    An asynchronous iterator of definitions for a term,
+    returned by :meth:`AsyncClient.aiter_define`
+
+    Instances of this class should not be created directly.
+    """
+
+    def __init__(self, client: AsyncClient, term: str, chunk_size: int):
+        self._client = client
+        self._lookup = ('term', term)
+        self._url = client._define_by_term_url.format(url_quote(term))
+        self._chunk_size = chunk_size
+        self._parser = stream_.DefinitionStreamParser(client._json_loads)
+        self._response = None  # type: Any
+        self._ready = deque()  # type: deque
+        self._data = []  # type: List[Dict[str, Any]]
+        self._started = False
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> 'definition.Definition':
+        while not self._ready:
+            if self._done:
+                raise StopAsyncIteration
+            if not self._started:
+                await self._start()
+            else:
+                await self._read()
+        return self._ready.popleft()
+
+    async def _start(self):
+        """
+        Looks up the term in the cache and store,
+        or sends the request if it is not found
+        """
+        self._started = True
+        client = self._client
+        data = client._cache_lookup(self._lookup)
+        if data is cache_.MISSING and client.store is not None:
+            data = await _asyncio().get_event_loop().run_in_executor(
+                None, client._store_lookup, self._lookup
+            )
+            if data is not cache_.MISSING:
+                client._cache_store(self._lookup, data)
+        if data is not cache_.MISSING:
+            self._ready.extend(client._build_definitions(data) or ())
+            self._done = True
+            return
+
+        client._check_open()
+        await client._request_started_async()
+        started = time.monotonic()
+        try:
+            self._response = await client._transport.open(
+                'GET', self._url, headers=HEADERS
+            )
+        except BaseException:
+            client._request_finished(started, error=True)
+            raise
+        # Unlike other requests, this is finished once the headers arrive,
+        # as the body is read at the pace of the caller, which may send
+        # further requests while iterating
+        client._request_finished(started, self._response.status)
+        if client.metrics is not None:
+            client._record_request(
+                self._url,
+                self._response.status,
+                None,
+                (
+                    ('connect', self._response.connect_time),
+                    ('ttfb', self._response.wait_time),
+                ),
+            )
+        if self._response.status != 200:
+            try:
+                self._response.raise_for_status()
+            finally:
+                await self.aclose()
+
+    async def _read(self):
+        """
+        Reads and parses the next chunk of the response
+        """
+        chunk = await self._response.read(self._chunk_size)
+        if chunk:
+            for dictionary in self._parser.feed(chunk):
+                self._data.append(dictionary)
+                definition_ = self._client._build_definition(dictionary)
+                if definition_ is not None:
+                    self._ready.append(definition_)
+            if not self._parser.done:
+                return
+
+        await self.aclose()
+        self._parser.close()
+        client = self._client
+        client._cache_store(self._lookup, self._data)
+        entry = client._store_entry(self._lookup, self._data)
+        if entry is not None:
+            await _asyncio().get_event_loop().run_in_executor(
+                None, client.store.put_many, [entry]
+            )
+
+    async def aclose(self):
+        """Stops reading the response
+
+        Definitions already received are still returned
+        by the iterator. Calling this more than once has no effect.
+        """
+        self._done = True
+        response, self._response = self._response, None
+        if response is not None:
+            response.release()
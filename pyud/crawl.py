@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.crawl
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from . import client, definition
+from .cache import normalise_term
+
+if TYPE_CHECKING:
+    import asyncio  # noqa: F401
+
+CrawlResult = Tuple[
+    int, str, Union[Optional[List['definition.Definition']], Exception]
+]
+
+
+class Frontier:
+    """
+    The terms waiting to be looked up by a crawl, in breadth-first order
+
+    Each term is only added once, compared after normalisation,
+    and no more than :paramref:`max_terms` terms are ever added.
+    """
+
+    def __init__(self, max_depth: int, max_terms: Optional[int]):
+        self.max_depth = max_depth
+        self.max_terms = max_terms
+        self._visited = set()  # type: Set[str]
+        self._queue = []  # type: List[Tuple[int, int, str]]
+        self._counter = itertools.count()
+
+    def __bool__(self):
+        return bool(self._queue)
+
+    def add(self, depth: int, term: str):
+        """
+        Adds a term found at the depth given,
+        if it has not been added already
+        """
+        key = normalise_term(term)
+        if key in self._visited or depth > self.max_depth:
+            return
+        if self.max_terms is not None and len(self._visited) >= self.max_terms:
+            return
+        self._visited.add(key)
+        heapq.heappush(self._queue, (depth, next(self._counter), term))
+
+    def add_references(self, result: CrawlResult):
+        """
+        Adds the terms referenced by the definitions in a result
+        """
+        depth, _, definitions = result
+        if depth >= self.max_depth or not isinstance(definitions, list):
+            return
+        for definition_ in definitions:
+            for reference in definition_.references:
+                self.add(depth + 1, reference.word)
+
+    def pop(self) -> Tuple[int, str]:
+        """
+        Returns the next term to look up, and its depth
+        """
+        depth, _, term = heapq.heappop(self._queue)
+        return depth, term
+
+
+def crawl(
+    client_: 'client.Client',
+    seed_terms: Iterable[str],
+    *,
+    max_depth: int = 1,
+    max_terms: Optional[int] = 100,
+    concurrency: Optional[int] = None
+) -> Iterator[CrawlResult]:
+    """
+    Crawls references from the seed terms using a thread pool,
+    see :meth:`Client.crawl`
+    """
+    frontier = Frontier(max_depth, max_terms)
+    for term in seed_terms:
+        frontier.add(0, term)
+
+    def define(depth, term):
+        try:
+            return depth, term, client_.define(term)
+        except Exception as exc:
+            return depth, term, exc
+
+    concurrency = concurrency or client_.concurrency
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    running = set()
+    try:
+        while frontier or running:
+            while frontier and len(running) < concurrency:
+                running.add(executor.submit(define, *frontier.pop()))
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                frontier.add_references(result)
+                yield result
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown()
+
+
+class Crawl:
+    """
+    An asynchronous iterator over a crawl of references,
+    returned by :meth:`AsyncClient.crawl`
+
+    Instances of this class should not be created directly.
+    """
+
+    def __init__(
+        self,
+        client_: 'client.AsyncClient',
+        seed_terms: Iterable[str],
+        *,
+        max_depth: int = 1,
+        max_terms: Optional[int] = 100,
+        concurrency: Optional[int] = None
+    ):
+        self._client = client_
+        self._concurrency = concurrency or client_.concurrency
+        self._frontier = Frontier(max_depth, max_terms)
+        self._running = set()  # type: Set[asyncio.Future]
+        self._done = []  # type: List[asyncio.Future]
+        for term in seed_terms:
+            self._frontier.add(0, term)
+
+    def __aiter__(self):
+        return self
+
+    async def _define(self, depth: int, term: str) -> CrawlResult:
+        try:
+            return depth, term, await self._client.define(term)
+        except client._asyncio().CancelledError:
+            raise
+        except Exception as exc:
+            return depth, term, exc
+
+    async def __anext__(self) -> CrawlResult:
+        while not self._done:
+            while self._frontier and len(self._running) < self._concurrency:
+                self._running.add(
+                    client._asyncio().ensure_future(
+                        self._define(*self._frontier.pop())
+                    )
+                )
+            if not self._running:
+                raise StopAsyncIteration
+
+            done, self._running = await client._asyncio().wait(
+                self._running, return_when=client._asyncio().FIRST_COMPLETED
+            )
+            # Results are returned shallowest first
+            self._done = sorted(done, key=lambda future: future.result()[0])
+
+        result = self._done.pop(0).result()
+        self._frontier.add_references(result)
+        return result
+
+    async def aclose(self):
+        """Stops the crawl, cancelling any lookups in progress
+
+        Calling this more than once has no effect.
+        """
+        running, self._running = self._running, set()
+        self._done = []
+        for future in running:
+            future.cancel()
+        if running:
+            await client._asyncio().wait(running)
+        self._frontier = Frontier(0, 0)
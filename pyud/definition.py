@@ -20,12 +20,48 @@ along with pyud.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import re
+import time
 from datetime import datetime as dt
 from typing import Any, List, Union
 
 from . import client, reference
 
 REFERENCE_REGEX = re.compile(r"\[(?P<ref>.+?)\]")
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+TIMESTAMP_REGEX = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})\.(\d{1,6})Z\Z",
+    re.ASCII,
+)
+
+
+def parse_timestamp(timestamp: str) -> dt:
+    """
+    Parses an RFC 3339 timestring as given by the API
+    to a naive datetime object
+
+    The fixed layout used by the API is parsed directly,
+    and any other string is parsed using :meth:`datetime.datetime.strptime`.
+    """
+    match = TIMESTAMP_REGEX.match(timestamp)
+    try:
+        if match is None:
+            return dt.strptime(timestamp, TIMESTAMP_FORMAT)
+
+        fields = match.groups()
+        # Fields out of range, such as a month of 13, raise ValueError
+        return dt(
+            int(fields[0]),
+            int(fields[1]),
+            int(fields[2]),
+            int(fields[3]),
+            int(fields[4]),
+            int(fields[5]),
+            int(fields[6].ljust(6, '0')),
+        )
+    except ValueError:
+        raise ValueError(
+            "written_on date was not given in the correct format"
+        ) from None
 
 
 class Definition:
@@ -41,8 +77,9 @@ class Definition:
     .. note::
 
         Any additional attributes that may be provided in the future by the API
-        are also added to the instance, but they are provided as is,
-        and are not processed in any way. Future versions may be support
+        are added to the :attr:`extra` dictionary, but they are provided as is,
+        and are not processed in any way. They can also be accessed
+        as attributes of the instance. Future versions may be support
         any added attributes.
 
     .. note::
@@ -73,6 +110,9 @@ class Definition:
         if you have used :class:`Client` to obtain definitions,
         and :class:`AsyncReference` if you have used :class:`AsyncClient`.
 
+        References are extracted when this attribute, :attr:`definition`
+        or :attr:`example` is first accessed.
+
         :type: Union[List[Reference], List[AsyncReference]]
 
     .. attribute:: defid
@@ -117,6 +157,20 @@ class Definition:
 
         :type: str
 
+    .. attribute:: raw_definition
+
+        The definition description as given by the API,
+        with references enclosed in square brackets
+
+        :type: str
+
+    .. attribute:: raw_example
+
+        The example usage as given by the API,
+        with references enclosed in square brackets
+
+        :type: str
+
     .. attribute:: permalink
 
         A permalink to the definition
@@ -127,9 +181,44 @@ class Definition:
 
         The date that the definition was written
 
+        If the client was created with ``lazy_timestamps=True``,
+        the date is only parsed when first accessed, and :exc:`ValueError`
+        is raised then if it is not in the correct format.
+
         :type: datetime.datetime
+
+    .. attribute:: raw_written_on
+
+        The date that the definition was written, as given by the API
+
+        :type: str
+
+    .. attribute:: extra
+
+        Any additional attributes provided by the API
+
+        :type: Dict[str, Any]
     """
 
+    __slots__ = (
+        'client',
+        'defid',
+        'word',
+        'raw_definition',
+        'author',
+        'thumbs_up',
+        'thumbs_down',
+        'raw_example',
+        'permalink',
+        'sound_urls',
+        'raw_written_on',
+        'extra',
+        '_written_on',
+        '_definition',
+        '_example',
+        '_references',
+    )
+
     def __init__(
         self,
         client: Union['client.AsyncClient', 'client.Client'],
@@ -152,55 +241,88 @@ class Definition:
         self.client = client
         self.defid = defid
         self.word = word
-        self.definition = definition
+        self.raw_definition = definition
         self.author = author
         self.thumbs_up = thumbs_up
         self.thumbs_down = thumbs_down
-        self.example = example
+        self.raw_example = example
         self.permalink = permalink
         self.sound_urls = sound_urls
 
-        try:
-            # Parses the RFC 3339 timestring to a naive datetime object
-            self.written_on = dt.strptime(written_on, "%Y-%m-%dT%H:%M:%S.%fZ")
-        except ValueError:
-            raise ValueError(
-                "written_on date was not given in the correct format"
-            ) from None
+        self.raw_written_on = written_on
+        self._written_on = (
+            None
+            if getattr(client, 'lazy_timestamps', False)
+            else parse_timestamp(written_on)
+        )
 
-        # Excess attributes are added
-        for name, value in attrs.items():
-            setattr(self, name, value)
+        # Excess attributes are kept separately
+        self.extra = attrs
 
-        self._find_references()
+        # References are extracted lazily
+        self._references = None
 
     def _find_references(self):
+        metrics = getattr(self.client, 'metrics', None)
+        if metrics is not None:
+            started = time.perf_counter()
+
         ref_type = (
             reference.Reference
             if isinstance(self.client, client.Client)
             else reference.AsyncReference
         )
-        self.references = []
-        for attr in ('definition', 'example'):
-            text = getattr(self, attr)
-
-            matches = REFERENCE_REGEX.finditer(text)
-            if not matches:
-                continue
-
-            offset = 0
-            for match in matches:
-                term = match.group('ref')
-                self.references += [ref_type(self.client, term)]
-                text = (
-                    text[: match.start() - offset]
-                    + term
-                    + text[match.end() - offset :]
+        terms = []
+
+        def replace(match):
+            term = match.group('ref')
+            terms.append(term)
+            return term
+
+        self._definition = REFERENCE_REGEX.sub(replace, self.raw_definition)
+        self._example = REFERENCE_REGEX.sub(replace, self.raw_example)
+        self._references = [ref_type(self.client, term) for term in terms]
+
+        if metrics is not None:
+            metrics.observe('references', time.perf_counter() - started)
+
+    @property
+    def written_on(self) -> dt:
+        if self._written_on is None:
+            self._written_on = parse_timestamp(self.raw_written_on)
+        return self._written_on
+
+    @property
+    def definition(self) -> str:
+        if self._references is None:
+            self._find_references()
+        return self._definition
+
+    @property
+    def example(self) -> str:
+        if self._references is None:
+            self._find_references()
+        return self._example
+
+    @property
+    def references(
+        self,
+    ) -> Union[List['reference.Reference'], List['reference.AsyncReference']]:
+        if self._references is None:
+            self._find_references()
+        return self._references
+
+    def __getattr__(self, name):
+        # Only called if the attribute is not found, so excess attributes
+        # can still be accessed as attributes of the instance
+        try:
+            return object.__getattribute__(self, 'extra')[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(
+                "{0.__name__!r} object has no attribute {1!r}".format(
+                    type(self), name
                 )
-
-                offset += 2
-
-            setattr(self, attr, text)
+            ) from None
 
     def __str__(self):
         return (
@@ -217,7 +339,7 @@ class Definition:
             "thumbs_down={0.thumbs_down}, example={0.example!r}, "
             "permalink={0.permalink!r}, sound_urls={0.sound_urls}, "
             "written_on={1})"
-        ).format(self, self.written_on.strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+        ).format(self, self.written_on.strftime(TIMESTAMP_FORMAT))
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
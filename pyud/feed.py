@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.feed
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Iterator, List, Optional, Set
+
+from . import client, definition
+
+if TYPE_CHECKING:
+    import asyncio  # noqa: F401
+
+
+class SeenWindow:
+    """
+    The IDs of the definitions most recently returned by a random stream
+
+    Once :paramref:`size` IDs have been added, the oldest ID is forgotten
+    each time a new ID is added, so that the memory used stays bounded
+    however long the stream runs.
+    """
+
+    def __init__(self, size: Optional[int]):
+        self.size = size
+        self._seen = set()  # type: Set[int]
+        self._order = deque()  # type: deque
+
+    def __contains__(self, defid: int) -> bool:
+        return defid in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def add(self, defid: int) -> bool:
+        """
+        Adds an ID, returning :data:`False` if it is already in the window
+        """
+        if defid in self._seen:
+            return False
+        if self.size == 0:
+            return True
+        self._seen.add(defid)
+        self._order.append(defid)
+        if self.size is not None and len(self._order) > self.size:
+            self._seen.discard(self._order.popleft())
+        return True
+
+
+def _take_page(
+    client_: 'client.ClientBase',
+    seen: SeenWindow,
+    page: Optional[List['definition.Definition']],
+) -> List['definition.Definition']:
+    """
+    Returns the definitions in a page whose ID is not in the window,
+    adding their IDs to it and counting the rest in the client's metrics
+    """
+    definitions = [
+        definition_
+        for definition_ in page or ()
+        if seen.add(definition_.defid)
+    ]
+    duplicates = len(page or ()) - len(definitions)
+    if duplicates and client_.metrics is not None:
+        client_.metrics.inc('random_duplicates_total', amount=duplicates)
+    return definitions
+
+
+def random_stream(
+    client_: 'client.Client',
+    *,
+    prefetch: int = 2,
+    window: Optional[int] = 10000
+) -> Iterator['definition.Definition']:
+    """
+    Yields random definitions, fetching pages in a thread pool,
+    see :meth:`Client.random_stream`
+    """
+    seen = SeenWindow(window)
+    executor = ThreadPoolExecutor(max_workers=prefetch)
+    running = set()
+
+    def fill():
+        # A page is only requested once one has been taken,
+        # so no more than prefetch pages are ever held ahead
+        while len(running) < prefetch:
+            running.add(
+                executor.submit(
+                    client_._fetch_definitions, client_._random_url
+                )
+            )
+
+    try:
+        fill()
+        while True:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            # Only one page is taken at a time, with the others
+            # left in place so that they count towards prefetch
+            future = done.pop()
+            running |= done
+            # The request for the next page is sent
+            # before the definitions in this page are yielded
+            fill()
+            yield from _take_page(client_, seen, future.result())
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class RandomStream:
+    """
+    An asynchronous iterator over random definitions,
+    returned by :meth:`AsyncClient.arandom_stream`
+
+    Instances of this class should not be created directly.
+    """
+
+    def __init__(
+        self,
+        client_: 'client.AsyncClient',
+        *,
+        prefetch: int = 2,
+        window: Optional[int] = 10000
+    ):
+        self._client = client_
+        self._prefetch = prefetch
+        self._seen = SeenWindow(window)
+        self._running = set()  # type: Set[asyncio.Future]
+        self._buffer = deque()  # type: deque
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    def _fill(self):
+        """
+        Starts fetching pages until :paramref:`prefetch` pages are
+        being fetched or are waiting to be read
+        """
+        while len(self._running) < self._prefetch:
+            self._running.add(
+                client._asyncio().ensure_future(
+                    self._client._fetch_definitions(
+                        self._client._random_url, coalesce=False
+                    )
+                )
+            )
+
+    async def __anext__(self) -> 'definition.Definition':
+        if self._closed:
+            raise StopAsyncIteration
+
+        self._fill()
+        while not self._buffer:
+            done, self._running = await client._asyncio().wait(
+                self._running, return_when=client._asyncio().FIRST_COMPLETED
+            )
+            # Only one page is taken at a time, with the others
+            # left in place so that they count towards prefetch
+            future = done.pop()
+            self._running |= done
+            # The request for the next page is sent
+            # before the definitions in this page are returned
+            self._fill()
+            self._buffer.extend(
+                _take_page(self._client, self._seen, future.result())
+            )
+
+        return self._buffer.popleft()
+
+    async def aclose(self):
+        """Stops the stream, cancelling any pages being fetched
+
+        Calling this more than once has no effect.
+        """
+        self._closed = True
+        running, self._running = self._running, set()
+        self._buffer.clear()
+        for future in running:
+            future.cancel()
+        if running:
+            await client._asyncio().wait(running)
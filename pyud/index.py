@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.index
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import heapq
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from . import client, definition
+
+#: The fields of definitions that are indexed, which queries can be
+#: restricted to using ``field:token``
+FIELDS = ('word', 'definition', 'example', 'author', 'references')
+
+#: The version of the format written by :meth:`DefinitionIndex.save`
+FORMAT_VERSION = 1
+
+TOKEN_REGEX = re.compile(r"\w+")
+
+Clause = Tuple[bool, Optional[str], List[str], bool]
+
+
+def tokenize(text: str) -> List[str]:
+    """Returns the tokens in a text, as indexed by :class:`DefinitionIndex`
+
+    Tokens are runs of letters, digits and underscores, and are case-folded.
+
+    :param text: The text
+    :type text: str
+    :rtype: List[str]
+    """
+    return TOKEN_REGEX.findall(text.casefold())
+
+
+def _field_tokens(object_: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """
+    Returns the tokens of each indexed field of a definition object
+    """
+    references = " ".join(
+        match.group('ref')
+        for text in (object_['definition'], object_['example'])
+        for match in definition.REFERENCE_REGEX.finditer(text)
+    )
+    return {
+        'word': set(tokenize(object_['word'])),
+        'definition': set(tokenize(object_['definition'])),
+        'example': set(tokenize(object_['example'])),
+        'author': set(tokenize(object_['author'])),
+        'references': set(tokenize(references)),
+    }
+
+
+def _to_object(definition_: 'definition.Definition') -> Dict[str, Any]:
+    """
+    Returns the definition object, as given by the API, of a Definition
+    """
+    return dict(
+        definition_.extra,
+        defid=definition_.defid,
+        word=definition_.word,
+        definition=definition_.raw_definition,
+        author=definition_.author,
+        thumbs_up=definition_.thumbs_up,
+        thumbs_down=definition_.thumbs_down,
+        example=definition_.raw_example,
+        permalink=definition_.permalink,
+        sound_urls=definition_.sound_urls,
+        written_on=definition_.raw_written_on,
+    )
+
+
+class DefinitionIndex:
+    """
+    A full-text index over definitions that have been fetched,
+    for searching them without going through them one by one
+
+    Tokens of :attr:`~Definition.word`, :attr:`~Definition.definition`,
+    :attr:`~Definition.example`, :attr:`~Definition.author`
+    and the words of :attr:`~Definition.references` are indexed
+    separately, see :func:`tokenize`. Definitions are added using
+    :meth:`add`, or automatically as a client obtains them,
+    if the index is given to the client using the ``index`` parameter:
+
+    .. code-block:: py
+
+        index = pyud.DefinitionIndex()
+        ud = pyud.Client(index=index)
+        ud.define("hello")
+        ud.random(limit=50)
+        index.search("author:bob greeting*")
+
+    Definitions are identified by their ID, and adding a definition
+    that is already indexed replaces it. The index is safe to share
+    between threads.
+
+    **Queries** are made up of clauses separated by spaces,
+    all of which must match a definition:
+
+    - ``token`` matches definitions with the token in any field
+    - ``field:token`` matches definitions with the token in the field,
+      which is one of :data:`FIELDS`
+    - ``token*`` matches definitions with a token starting with ``token``
+    - ``-token`` or ``NOT token`` matches definitions without the token
+
+    ``OR`` between clauses matches definitions that match the clauses
+    before it or the clauses after it. A clause with more than one token,
+    such as ``"don't"``, matches definitions with all of the tokens.
+
+    :param client: The client given to definitions returned by searches,
+        defaults to :data:`None`. If the index is given to a client,
+        that client is used if none is given here.
+    :type client: Optional[Union[Client, AsyncClient]]
+    """
+
+    def __init__(
+        self,
+        client: Optional[Union['client.Client', 'client.AsyncClient']] = None,
+    ):
+        self.client = client
+        self._objects = {}  # type: Dict[int, Dict[str, Any]]
+        self._postings = {
+            field: {} for field in FIELDS
+        }  # type: Dict[str, Dict[str, Set[int]]]
+        self._vocabulary = {}  # type: Dict[str, List[str]]
+        self._lock = threading.RLock()
+
+    def add(self, definitions: Iterable['definition.Definition']):
+        """Adds definitions to the index, replacing any with the same ID
+
+        :param definitions: The definitions to add
+        :type definitions: Iterable[Definition]
+        """
+        self.add_objects(map(_to_object, definitions))
+
+    def add_objects(self, objects: Iterable[Dict[str, Any]]):
+        """Adds definition objects, as given by the API, to the index,
+        replacing any with the same ID
+
+        :param objects: The definition objects to add
+        :type objects: Iterable[Dict[str, Any]]
+        """
+        with self._lock:
+            for object_ in objects:
+                defid = object_['defid']
+                existing = self._objects.get(defid)
+                # Lookups found in the cache give the same objects again
+                if existing is object_ or existing == object_:
+                    continue
+                if existing is not None:
+                    self._remove(defid)
+                self._objects[defid] = object_
+                for field, tokens in _field_tokens(object_).items():
+                    postings = self._postings[field]
+                    for token in tokens:
+                        ids = postings.get(token)
+                        if ids is None:
+                            postings[token] = ids = set()
+                            self._vocabulary.pop(field, None)
+                        ids.add(defid)
+
+    def remove(self, defid: int):
+        """Removes a definition from the index
+
+        :param defid: The ID of the definition
+        :type defid: int
+        :raises KeyError: The definition is not in the index
+        """
+        with self._lock:
+            if defid not in self._objects:
+                raise KeyError(defid)
+            self._remove(defid)
+
+    def _remove(self, defid: int):
+        """
+        Removes a definition from the index. The lock must be held.
+        """
+        object_ = self._objects.pop(defid)
+        for field, tokens in _field_tokens(object_).items():
+            postings = self._postings[field]
+            for token in tokens:
+                ids = postings[token]
+                ids.discard(defid)
+                if not ids:
+                    del postings[token]
+                    self._vocabulary.pop(field, None)
+
+    def clear(self):
+        """Removes all definitions from the index"""
+        with self._lock:
+            self._objects.clear()
+            for postings in self._postings.values():
+                postings.clear()
+            self._vocabulary.clear()
+
+    @staticmethod
+    def _parse(query: str) -> List[List[Clause]]:
+        """
+        Parses a query into groups of clauses, any of which must match,
+        with each clause being whether it is negated, its field,
+        its tokens, and whether its last token is a prefix
+        """
+        groups = [[]]  # type: List[List[Clause]]
+        negate = False
+        for part in query.split():
+            if part == 'OR':
+                groups.append([])
+                continue
+            if part == 'NOT':
+                negate = True
+                continue
+            if part.startswith('-') and len(part) > 1:
+                negate, part = True, part[1:]
+
+            field = None
+            name, sep, rest = part.partition(':')
+            if sep and name:
+                if name not in FIELDS:
+                    raise ValueError("Unknown field {!r}".format(name))
+                field, part = name, rest
+
+            tokens = tokenize(part)
+            if tokens:
+                groups[-1].append(
+                    (negate, field, tokens, part.endswith('*'))
+                )
+            negate = False
+        return [group for group in groups if group]
+
+    def _lookup(self, field: str, token: str, prefix: bool) -> Set[int]:
+        """
+        Returns the IDs of definitions with the token in the field,
+        or with a token starting with it. The lock must be held.
+        """
+        postings = self._postings[field]
+        if not prefix:
+            return postings.get(token, set())
+
+        vocabulary = self._vocabulary.get(field)
+        if vocabulary is None:
+            vocabulary = self._vocabulary[field] = sorted(postings)
+        ids = set()  # type: Set[int]
+        start = bisect.bisect_left(vocabulary, token)
+        for candidate in vocabulary[start:]:
+            if not candidate.startswith(token):
+                break
+            ids |= postings[candidate]
+        return ids
+
+    def _match_clause(self, clause: Clause) -> Set[int]:
+        """
+        Returns the IDs of definitions matching a clause,
+        ignoring whether it is negated. The lock must be held.
+        """
+        _, field, tokens, prefix = clause
+        fields = FIELDS if field is None else (field,)
+        matched = None  # type: Optional[Set[int]]
+        for i, token in enumerate(tokens):
+            is_prefix = prefix and i == len(tokens) - 1
+            ids = set()  # type: Set[int]
+            for name in fields:
+                ids |= self._lookup(name, token, is_prefix)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                break
+        return matched or set()
+
+    def match(self, query: str) -> Set[int]:
+        """Returns the IDs of the definitions matching a query
+
+        :param query: The query, see :class:`DefinitionIndex`
+        :type query: str
+        :rtype: Set[int]
+        :raises ValueError: The query uses a field that is not indexed
+        """
+        groups = self._parse(query)
+        with self._lock:
+            matched = set()  # type: Set[int]
+            for group in groups:
+                required = [
+                    self._match_clause(clause)
+                    for clause in group
+                    if not clause[0]
+                ]
+                if required:
+                    # Intersecting the smallest sets first is fastest
+                    required.sort(key=len)
+                    ids = set(required[0])
+                    for other in required[1:]:
+                        ids &= other
+                else:
+                    ids = set(self._objects)
+                for clause in group:
+                    if clause[0] and ids:
+                        ids -= self._match_clause(clause)
+                matched |= ids
+            return matched
+
+    def search_ids(
+        self, query: str, *, limit: Optional[int] = None
+    ) -> List[int]:
+        """Returns the IDs of the definitions matching a query,
+        with the highest :attr:`~Definition.thumbs_up` minus
+        :attr:`~Definition.thumbs_down` first
+
+        :param query: The query, see :class:`DefinitionIndex`
+        :type query: str
+        :param limit: The maximum number of IDs returned,
+            defaults to :data:`None` (no limit)
+        :type limit: Optional[int]
+        :rtype: List[int]
+        :raises ValueError: The query uses a field that is not indexed
+        """
+        matched = self.match(query)
+        with self._lock:
+            objects = self._objects
+
+            def key(defid):
+                object_ = objects[defid]
+                return (object_['thumbs_down'] - object_['thumbs_up'], defid)
+
+            if limit is not None and limit < len(matched):
+                return heapq.nsmallest(limit, matched, key=key)
+            return sorted(matched, key=key)
+
+    def search(
+        self, query: str, *, limit: Optional[int] = None
+    ) -> List['definition.Definition']:
+        """Returns the definitions matching a query,
+        with the highest :attr:`~Definition.thumbs_up` minus
+        :attr:`~Definition.thumbs_down` first
+
+        :param query: The query, see :class:`DefinitionIndex`
+        :type query: str
+        :param limit: The maximum number of definitions returned,
+            defaults to :data:`None` (no limit)
+        :type limit: Optional[int]
+        :rtype: List[Definition]
+        :raises ValueError: The query uses a field that is not indexed
+        """
+        with self._lock:
+            return [
+                definition.Definition(self.client, **self._objects[defid])
+                for defid in self.search_ids(query, limit=limit)
+            ]
+
+    def get(self, defid: int) -> Optional['definition.Definition']:
+        """Returns an indexed definition by ID
+
+        :param defid: The ID of the definition
+        :type defid: int
+        :return: The definition, or :data:`None` if it is not indexed
+        :rtype: Optional[Definition]
+        """
+        object_ = self._objects.get(defid)
+        if object_ is None:
+            return None
+        return definition.Definition(self.client, **object_)
+
+    def save(self, path: str):
+        """Writes the index to a JSON file
+
+        The file is replaced atomically, so that an index
+        being loaded from it is never partly written.
+
+        :param path: The path of the file
+        :type path: str
+        """
+        with self._lock:
+            document = {
+                'version': FORMAT_VERSION,
+                'definitions': list(self._objects.values()),
+                'postings': {
+                    field: {
+                        token: sorted(ids) for token, ids in postings.items()
+                    }
+                    for field, postings in self._postings.items()
+                },
+            }
+        partial = path + '.partial'
+        with open(partial, 'w') as file:
+            json.dump(document, file)
+        os.replace(partial, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        client: Optional[Union['client.Client', 'client.AsyncClient']] = None,
+    ) -> 'DefinitionIndex':
+        """Reads an index from a JSON file written by :meth:`save`
+
+        :param path: The path of the file
+        :type path: str
+        :param client: The client given to definitions returned
+            by searches, defaults to :data:`None`
+        :type client: Optional[Union[Client, AsyncClient]]
+        :rtype: DefinitionIndex
+        :raises ValueError: The file was written by an incompatible version
+        """
+        with open(path) as file:
+            document = json.load(file)
+        if document.get('version') != FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported index format version {!r}".format(
+                    document.get('version')
+                )
+            )
+
+        index = cls(client)
+        index._objects = {
+            object_['defid']: object_ for object_ in document['definitions']
+        }
+        for field, postings in document['postings'].items():
+            index._postings[field] = {
+                token: set(ids) for token, ids in postings.items()
+            }
+        return index
+
+    def __contains__(self, defid: int) -> bool:
+        return defid in self._objects
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __repr__(self):
+        return "DefinitionIndex(definitions={})".format(len(self))
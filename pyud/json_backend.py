@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.json_backend
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import importlib
+import json
+from typing import Any, Callable, Union
+
+JSONData = Union[str, bytes, bytearray]
+
+BACKENDS = ('orjson', 'ujson', 'json')
+
+
+def stdlib_loads(data: JSONData) -> Any:
+    """
+    Decodes JSON using the standard library,
+    allowing control characters inside strings
+    """
+    # json.loads only accepts bytes from Python 3.6
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return json.loads(data, strict=False)
+
+
+def _with_fallback(
+    loads: Callable[[JSONData], Any]
+) -> Callable[[JSONData], Any]:
+    """
+    Wraps a third-party decoder so that documents it rejects are decoded
+    again using the standard library
+
+    The API sometimes includes raw control characters inside strings,
+    which are rejected by stricter decoders.
+    """
+
+    def decode(data: JSONData) -> Any:
+        try:
+            return loads(data)
+        except ValueError:
+            return stdlib_loads(data)
+
+    return decode
+
+
+def get_loads(backend: str = 'auto') -> Callable[[JSONData], Any]:
+    """Returns the function used to decode JSON for a backend
+
+    :param backend: The name of the backend, one of ``'orjson'``,
+        ``'ujson'`` or ``'json'``, or ``'auto'`` to use the fastest
+        backend that is installed, defaults to ``'auto'``
+    :type backend: str
+    :raises ValueError: The backend is not known
+    :raises ImportError: The backend is not installed
+    :return: A function that decodes JSON from :class:`bytes` or :class:`str`
+    :rtype: Callable[[Union[str, bytes, bytearray]], Any]
+    """
+    if backend == 'auto':
+        for name in BACKENDS[:-1]:
+            try:
+                return get_loads(name)
+            except ImportError:
+                pass
+        return stdlib_loads
+
+    if backend not in BACKENDS:
+        raise ValueError(
+            "Unknown JSON backend {!r}, expected one of {}".format(
+                backend, ", ".join(('auto',) + BACKENDS)
+            )
+        )
+    if backend == 'json':
+        return stdlib_loads
+    return _with_fallback(importlib.import_module(backend).loads)
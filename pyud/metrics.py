@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.metrics
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import threading
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+#: The upper bounds in seconds of the buckets of each histogram by default
+BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+#: The stages of a lookup that are timed. ``connect``, ``ttfb`` (time to
+#: first byte), ``body`` and ``decode`` are the stages of a single request,
+#: and ``request`` is the whole request. ``build`` is the creation
+#: of :class:`Definition` objects from a response, and ``references``
+#: is the extraction of references from a definition.
+STAGES = (
+    'connect',
+    'ttfb',
+    'body',
+    'decode',
+    'request',
+    'build',
+    'references',
+)
+
+#: The name, label and description of each counter
+COUNTERS = (
+    ('requests_total', 'status', "Requests sent to the API, by status code"),
+    ('response_bytes_total', None, "Bytes received in response bodies"),
+    ('errors_total', 'type', "Errors raised by requests, by exception type"),
+    ('retries_total', None, "Requests that were retried"),
+    ('hedges_total', None, "Hedged requests that were sent"),
+    ('cache_hits_total', None, "Lookups found in the cache"),
+    ('cache_misses_total', None, "Lookups not found in the cache"),
+    (
+        'negative_cache_hits_total',
+        None,
+        "Lookups found in the cache to have no definitions",
+    ),
+    ('store_hits_total', None, "Lookups found in the store"),
+    ('store_misses_total', None, "Lookups not found in the store"),
+    ('prefetches_total', None, "Referenced terms prefetched into the cache"),
+    (
+        'prefetch_hits_total',
+        None,
+        "Lookups found in the cache that had been prefetched",
+    ),
+    ('prefetch_cancels_total', None, "Prefetches cancelled as stale"),
+    (
+        'random_duplicates_total',
+        None,
+        "Random definitions skipped by a stream as already seen",
+    ),
+)
+
+Event = namedtuple('Event', 'stage seconds url')
+Event.__doc__ = """\
+The time taken by a stage, passed to each hook of :class:`Metrics`
+
+``url`` is the url of the request, or :data:`None` for the ``build``
+and ``references`` stages.
+"""
+
+CounterKey = Tuple[str, Optional[str]]
+
+
+class Histogram:
+    """
+    The distribution of the times taken by a stage
+
+    .. attribute:: buckets
+
+        The upper bounds of the buckets
+
+        :type: Tuple[float, ...]
+
+    .. attribute:: counts
+
+        The number of times in each bucket, with the last element
+        counting the times above the largest bound
+
+        :type: List[int]
+
+    .. attribute:: count
+
+        The number of times observed
+
+        :type: int
+
+    .. attribute:: sum
+
+        The sum of the times observed
+
+        :type: float
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Adds a time to the histogram
+
+        :param value: The time in seconds
+        :type value: float
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    """
+    Counters and histograms of the time taken by each stage of lookups,
+    which can be given to one or more clients with the ``metrics``
+    client option
+
+    When no metrics are given to a client, nothing is measured.
+    Hooks added with :meth:`add_hook` are called with an :class:`Event`
+    every time a stage is timed, in the thread or task that timed it.
+    The data can be exported in the Prometheus text format:
+
+    .. code-block:: py
+
+        metrics = pyud.Metrics()
+        ud = pyud.Client(metrics=metrics)
+        ud.define("hello")
+        print(metrics.to_prometheus())
+
+    :param buckets: The upper bounds in seconds of the buckets
+        of each histogram, defaults to :data:`BUCKETS`
+    :type buckets: Sequence[float]
+    :param namespace: The prefix of the name of each metric exported,
+        defaults to ``'pyud'``
+    :type namespace: str
+    """
+
+    def __init__(
+        self, *, buckets: Sequence[float] = BUCKETS, namespace: str = 'pyud'
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._counters = {}  # type: Dict[CounterKey, int]
+        self._histograms = {}  # type: Dict[str, Histogram]
+        self._hooks = []  # type: List[Callable[[Event], None]]
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[Event], None]):
+        """Adds a function called with an :class:`Event`
+        every time a stage is timed
+
+        :param hook: The function
+        :type hook: Callable[[Event], None]
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook: Callable[[Event], None]):
+        """Removes a function added with :meth:`add_hook`
+
+        :param hook: The function
+        :type hook: Callable[[Event], None]
+        :raises ValueError: The function had not been added
+        """
+        with self._lock:
+            hooks = list(self._hooks)
+            hooks.remove(hook)
+            self._hooks = hooks
+
+    def inc(self, name: str, label: Optional[str] = None, amount: int = 1):
+        """Increments a counter
+
+        :param name: The name of the counter, from :data:`COUNTERS`
+        :type name: str
+        :param label: The value of the label of the counter,
+            defaults to :data:`None`
+        :type label: Optional[str]
+        :param amount: The amount to add, defaults to 1
+        :type amount: int
+        """
+        key = (name, label)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, stage: str, seconds: float, url: Optional[str] = None):
+        """Records the time taken by a stage, and calls each hook
+
+        :param stage: The stage, from :data:`STAGES`
+        :type stage: str
+        :param seconds: The time taken in seconds
+        :type seconds: float
+        :param url: The url of the request, defaults to :data:`None`
+        :type url: Optional[str]
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            hooks = self._hooks
+
+        if hooks:
+            event = Event(stage, seconds, url)
+            for hook in hooks:
+                hook(event)
+
+    def counter(self, name: str, label: Optional[str] = None) -> int:
+        """Returns the value of a counter
+
+        :param name: The name of the counter
+        :type name: str
+        :param label: The value of the label of the counter,
+            defaults to :data:`None`
+        :type label: Optional[str]
+        :rtype: int
+        """
+        with self._lock:
+            return self._counters.get((name, label), 0)
+
+    def histogram(self, stage: str) -> Optional[Histogram]:
+        """Returns the histogram of the times taken by a stage
+
+        :param stage: The stage
+        :type stage: str
+        :return: The histogram, or :data:`None` if the stage
+            has not been timed
+        :rtype: Optional[Histogram]
+        """
+        return self._histograms.get(stage)
+
+    def reset(self):
+        """Sets all counters and histograms back to zero"""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    def to_prometheus(self) -> str:
+        """Returns the counters and histograms
+        in the Prometheus text exposition format
+
+        :rtype: str
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                stage: (list(h.counts), h.count, h.sum)
+                for stage, h in self._histograms.items()
+            }
+
+        lines = []
+        for name, label, description in COUNTERS:
+            full_name = '{}_{}'.format(self.namespace, name)
+            lines.append('# HELP {} {}'.format(full_name, description))
+            lines.append('# TYPE {} counter'.format(full_name))
+            if label is None:
+                lines.append(
+                    '{} {}'.format(full_name, counters.get((name, None), 0))
+                )
+                continue
+            values = sorted(
+                (key[1], value)
+                for key, value in counters.items()
+                if key[0] == name
+            )
+            for label_value, value in values:
+                lines.append(
+                    '{}{{{}="{}"}} {}'.format(
+                        full_name, label, _escape(label_value), value
+                    )
+                )
+
+        full_name = '{}_stage_seconds'.format(self.namespace)
+        lines.append(
+            '# HELP {} Time taken by each stage of lookups'.format(full_name)
+        )
+        lines.append('# TYPE {} histogram'.format(full_name))
+        for stage in sorted(histograms, key=_stage_order):
+            counts, count, total = histograms[stage]
+            cumulative = 0
+            bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(
+                    '{}_bucket{{stage="{}",le="{}"}} {}'.format(
+                        full_name, _escape(stage), bound, cumulative
+                    )
+                )
+            lines.append(
+                '{}_sum{{stage="{}"}} {!r}'.format(
+                    full_name, _escape(stage), total
+                )
+            )
+            lines.append(
+                '{}_count{{stage="{}"}} {}'.format(
+                    full_name, _escape(stage), count
+                )
+            )
+
+        return '\n'.join(lines) + '\n'
+
+    def __repr__(self):
+        return "Metrics(namespace={!r})".format(self.namespace)
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+    )
+
+
+def _stage_order(stage: str) -> Tuple[int, str]:
+    try:
+        return STAGES.index(stage), stage
+    except ValueError:
+        return len(STAGES), stage
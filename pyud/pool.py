@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.pool
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import http.client
+import threading
+import time
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import transport
+
+# The errors raised when a reused connection has been closed by the server,
+# after which the request can safely be sent again on a new connection
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+PoolKey = Tuple[str, str, Optional[int]]
+IdleConnection = Tuple[http.client.HTTPConnection, float]
+
+PoolResponse = NamedTuple(
+    'PoolResponse',
+    [
+        ('status', int),
+        ('reason', str),
+        ('headers', http.client.HTTPMessage),
+        ('body', bytes),
+    ],
+)
+
+
+class ConnectionPool(transport.Transport):
+    """
+    A thread-safe pool of persistent HTTP/1.1 connections,
+    which is the transport used by :class:`Client` by default
+
+    Idle connections are kept per host, and reused in last-in first-out order
+    so that the most recently used, and therefore least likely to have been
+    closed by the server, connection is tried first.
+    Connections that have been idle for longer than
+    :paramref:`idle_timeout` are closed instead of being reused.
+
+    The pool never blocks: if all pooled connections are in use,
+    a new connection is opened, and it is discarded afterwards
+    if the pool is already full.
+
+    :param maxsize: The maximum number of idle connections
+        kept per host, defaults to 10
+    :type maxsize: int
+    :param idle_timeout: The number of seconds after which an idle
+        connection is closed, defaults to 30
+    :type idle_timeout: float
+    :param timeout: The socket timeout for connections in seconds,
+        which applies to each socket operation rather than to the whole
+        request, defaults to :data:`None` (no timeout)
+    :type timeout: Optional[float]
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 10,
+        idle_timeout: float = 30.0,
+        timeout: Optional[float] = None
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = {}  # type: Dict[PoolKey, List[IdleConnection]]
+        self._closed = False
+
+    def _new_connection(self, key: PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(
+                host, port, timeout=self.timeout
+            )
+        if scheme == 'http':
+            return http.client.HTTPConnection(host, port, timeout=self.timeout)
+        raise ValueError("Unsupported URL scheme {!r}".format(scheme))
+
+    def _acquire(
+        self, key: PoolKey
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Returns a connection for the key, and whether it was reused
+        """
+        stale = []
+        conn = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool has been closed")
+
+            idle = self._idle.get(key, [])
+            now = time.monotonic()
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used < self.idle_timeout:
+                    conn = candidate
+                    break
+                stale.append(candidate)
+
+        for candidate in stale:
+            candidate.close()
+
+        if conn is not None:
+            return conn, True
+        return self._new_connection(key), False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection):
+        """
+        Returns a connection to the pool, closing it if the pool is full
+        """
+        evicted = [conn]
+        with self._lock:
+            if not self._closed:
+                idle = self._idle.setdefault(key, [])
+                now = time.monotonic()
+                # The oldest connections are at the start of the list
+                expired = 0
+                for _, last_used in idle:
+                    if now - last_used < self.idle_timeout:
+                        break
+                    expired += 1
+                evicted = [candidate for candidate, _ in idle[:expired]]
+                del idle[:expired]
+
+                if len(idle) < self.maxsize:
+                    idle.append((conn, now))
+                else:
+                    evicted.append(conn)
+
+        for candidate in evicted:
+            candidate.close()
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> 'PooledResponse':
+        """Sends a request using a pooled connection, without reading
+        the body of the response
+
+        If a reused connection turns out to have been closed by the server,
+        the request is sent again on a new connection. Other errors,
+        including timeouts, are raised without sending the request again.
+        The response must be closed once it is no longer needed.
+
+        :param method: The HTTP method
+        :type method: str
+        :param url: The absolute URL to request
+        :type url: str
+        :param headers: Additional headers to send
+        :type headers: Optional[Mapping[str, str]]
+        :return: The response, whose body can be read incrementally
+        :rtype: PooledResponse
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                started = time.perf_counter()
+                if not reused:
+                    conn.connect()
+                sent = time.perf_counter()
+                conn.request(method, path, headers=dict(headers or {}))
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                # Other errors, such as timeouts, are not caused
+                # by the connection having been reused
+                conn.close()
+                raise
+
+            pooled = PooledResponse(self, key, conn, response)
+            pooled.connect_time = sent - started
+            pooled.wait_time = time.perf_counter() - sent
+            return pooled
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> PoolResponse:
+        """Sends a request using a pooled connection
+
+        The whole body of the response is read before the connection
+        is returned to the pool. The parameters are the same
+        as :meth:`open`.
+
+        :return: The status, reason, headers and body of the response
+        :rtype: PoolResponse
+        """
+        with self.open(method, url, headers) as response:
+            body = response.read()
+            return PoolResponse(
+                response.status, response.reason, response.headers, body
+            )
+
+    @property
+    def closed(self) -> bool:
+        """:data:`True` if the pool has been closed
+
+        :type: bool
+        """
+        return self._closed
+
+    def close(self):
+        """Closes all idle connections, and refuses any further requests
+
+        Connections in use at the time are closed when they are released.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, {}
+
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+
+class PooledResponse:
+    """
+    A response to a request sent using a :class:`ConnectionPool`
+
+    Once closed, the connection is returned to the pool if the whole body
+    has been read, and closed otherwise.
+
+    .. attribute:: status
+
+        The status code of the response
+
+        :type: int
+
+    .. attribute:: reason
+
+        The reason phrase of the response
+
+        :type: str
+
+    .. attribute:: headers
+
+        The headers of the response
+
+        :type: http.client.HTTPMessage
+
+    .. attribute:: connect_time
+
+        The number of seconds taken to open a new connection,
+        or 0 if a connection was reused
+
+        :type: float
+
+    .. attribute:: wait_time
+
+        The number of seconds between sending the request
+        and receiving the headers of the response
+
+        :type: float
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        key: PoolKey,
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ):
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.connect_time = 0.0
+        self.wait_time = 0.0
+        self._pool = pool
+        self._key = key
+        self._conn = conn  # type: Optional[http.client.HTTPConnection]
+        self._response = response
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        """Reads the body of the response
+
+        :param amt: The maximum number of bytes to read,
+            defaults to :data:`None` (read the rest of the body)
+        :type amt: Optional[int]
+        :return: The bytes read, which are empty once the body
+            has been read completely
+        :rtype: bytes
+        """
+        try:
+            return self._response.read(amt)
+        except (http.client.HTTPException, OSError):
+            self.close()
+            raise
+
+    def close(self):
+        """Closes the response, releasing its connection
+
+        Calling this more than once has no effect.
+        """
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._response.isclosed() and not self._response.will_close:
+            self._pool._release(self._key, conn)
+        else:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.prefetch
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+from collections import Counter, OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from . import cache as cache_
+from . import definition
+
+Item = Tuple[Hashable, str]
+
+
+class PrefetchPolicy:
+    """
+    How the terms referenced by definitions are prefetched into the cache
+
+    After :meth:`Client.define` or :meth:`AsyncClient.define` returns,
+    the terms referenced most often by the definitions found are looked up
+    in the background and added to the cache, so that following one of
+    the references does not have to wait for the API. Prefetches for
+    an earlier lookup that have not completed are cancelled once a newer
+    lookup schedules its own, as they are less likely to be needed.
+    A cache must be given to the client:
+
+    .. code-block:: py
+
+        ud = pyud.Client(cache=pyud.Cache(), prefetch=pyud.PrefetchPolicy())
+
+    :param top: The number of referenced terms prefetched
+        after each lookup, defaults to 3
+    :type top: int
+    :param concurrency: The maximum number of prefetches
+        in progress at the same time, defaults to 2
+    :type concurrency: int
+    :param max_bytes: The approximate number of bytes of text in prefetched
+        entries that can be held in the cache without having been used,
+        defaults to 1 MiB. No prefetches are started while this is exceeded.
+        :data:`None` means no limit.
+    :type max_bytes: Optional[int]
+    """
+
+    def __init__(
+        self,
+        *,
+        top: int = 3,
+        concurrency: int = 2,
+        max_bytes: Optional[int] = 1 << 20
+    ):
+        if top < 1:
+            raise ValueError("top must be at least 1")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.top = top
+        self.concurrency = concurrency
+        self.max_bytes = max_bytes
+
+    def __repr__(self):
+        return (
+            "PrefetchPolicy(top={0.top}, concurrency={0.concurrency}, "
+            "max_bytes={0.max_bytes})"
+        ).format(self)
+
+
+def entry_size(data: List[Dict[str, Any]]) -> int:
+    """
+    Returns the approximate size of a list of definition objects,
+    as the number of characters in their strings
+    """
+    return sum(
+        len(value)
+        for object_ in data
+        for value in object_.values()
+        if isinstance(value, str)
+    )
+
+
+class Prefetcher:
+    """
+    The prefetches of a client that are queued or in progress,
+    and the prefetched entries in its cache that have not been used
+
+    Prefetches are identified by the cache key of the term,
+    and each is represented by a future or task once started.
+    """
+
+    def __init__(self, policy: PrefetchPolicy):
+        self.policy = policy
+        self._queue = deque()  # type: deque
+        self._running = {}  # type: Dict[Hashable, Any]
+        self._adopted = set()  # type: Set[Hashable]
+        self._unused = OrderedDict()  # type: OrderedDict
+        self._unused_bytes = 0
+        self._lock = threading.Lock()
+
+    def select(
+        self,
+        term: str,
+        definitions: List['definition.Definition'],
+        cache: 'cache_.Cache',
+    ) -> List[Item]:
+        """
+        Returns the cache keys and words of the terms to prefetch
+        for definitions of the term given, referenced most often first
+        """
+        own_key = cache.term_key(term)
+        counts = Counter()  # type: Counter
+        words = OrderedDict()  # type: OrderedDict
+        for definition_ in definitions:
+            for reference in definition_.references:
+                key = cache.term_key(reference.word)
+                if key != own_key:
+                    counts[key] += 1
+                    words.setdefault(key, reference.word)
+
+        # Sorting is stable, so ties keep the order they were found in
+        ranked = sorted(words, key=lambda key: -counts[key])
+        return [
+            (key, words[key])
+            for key in ranked[: self.policy.top]
+            if key not in cache and not cache.is_negative(key)
+        ]
+
+    def replace(self, selected: List[Item]) -> Tuple[int, List[Any]]:
+        """
+        Replaces the queued prefetches with those selected,
+        returning the number of queued prefetches dropped
+        and the prefetches in progress that should be cancelled
+        """
+        keys = {key for key, _ in selected}
+        with self._lock:
+            dropped = sum(key not in keys for key, _ in self._queue)
+            self._queue = deque(
+                item for item in selected if item[0] not in self._running
+            )
+            stale = [
+                future
+                for key, future in self._running.items()
+                if future is not None
+                and key not in keys
+                and key not in self._adopted
+            ]
+        return dropped, stale
+
+    def next_to_start(self, cache: 'cache_.Cache') -> Optional[Item]:
+        """
+        Returns the next queued prefetch, reserving a place for it,
+        or :data:`None` if no prefetch can be started
+        """
+        with self._lock:
+            if len(self._running) >= self.policy.concurrency:
+                return None
+            if not self._has_budget(cache):
+                return None
+            while self._queue:
+                key, word = self._queue.popleft()
+                if (
+                    key not in cache
+                    and not cache.is_negative(key)
+                    and key not in self._running
+                ):
+                    self._running[key] = None
+                    return key, word
+        return None
+
+    def _has_budget(self, cache: 'cache_.Cache') -> bool:
+        """
+        Returns :data:`True` if the unused prefetched entries are within
+        the byte budget, forgetting entries that have left the cache
+        """
+        max_bytes = self.policy.max_bytes
+        if max_bytes is None or self._unused_bytes < max_bytes:
+            return True
+        for key in list(self._unused):
+            if key not in cache:
+                self._unused_bytes -= self._unused.pop(key)
+        return self._unused_bytes < max_bytes
+
+    def started(self, key: Hashable, future: Any):
+        """
+        Records the future of a prefetch returned by :meth:`next_to_start`
+        """
+        with self._lock:
+            self._running[key] = future
+
+    def finished(self, key: Hashable, future: Any):
+        """
+        Forgets a prefetch that has completed or could not be started
+        """
+        with self._lock:
+            if self._running.get(key) is future:
+                del self._running[key]
+                self._adopted.discard(key)
+
+    def adopt(self, key: Hashable) -> Any:
+        """
+        Returns the future of the prefetch in progress for a key being
+        looked up, so that it can be waited on, and stops it being
+        cancelled as stale. A queued prefetch for the key is dropped.
+        """
+        with self._lock:
+            self._queue = deque(
+                item for item in self._queue if item[0] != key
+            )
+            future = self._running.get(key)
+            if future is not None:
+                self._adopted.add(key)
+            return future
+
+    def clear(self) -> List[Any]:
+        """
+        Drops all queued prefetches, returning those in progress
+        """
+        with self._lock:
+            self._queue.clear()
+            return [
+                future
+                for future in self._running.values()
+                if future is not None
+            ]
+
+    def add_unused(self, key: Hashable, data: List[Dict[str, Any]]):
+        """
+        Records an entry that has been prefetched into the cache
+        """
+        size = entry_size(data)
+        with self._lock:
+            self._unused_bytes += size - self._unused.pop(key, 0)
+            self._unused[key] = size
+
+    def use(self, key: Hashable) -> bool:
+        """
+        Returns :data:`True` if the cache entry found for a key
+        was prefetched and had not been used yet
+        """
+        with self._lock:
+            size = self._unused.pop(key, None)
+            if size is None:
+                return False
+            self._unused_bytes -= size
+            return True
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.ratelimit
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import asyncio  # noqa: F401
+
+
+def is_overloaded(status: Optional[int]) -> bool:
+    """Returns :data:`True` if a status code shows that the API
+    is overloaded, or is limiting the rate of requests
+
+    :param status: The status code, or :data:`None` if there is none
+    :type status: Optional[int]
+    :rtype: bool
+    """
+    return status is not None and (status == 429 or status >= 500)
+
+
+class TokenBucket:
+    """
+    A token bucket limiting the rate at which requests are sent
+
+    Tokens are added to the bucket at :paramref:`rate` tokens per second,
+    up to :paramref:`capacity` tokens, and each request takes a token.
+    Requests wait until there is a token for them, in the order
+    they arrive. The bucket can be shared between clients,
+    and between threads and event loops:
+
+    .. code-block:: py
+
+        limiter = pyud.TokenBucket(rate=20, capacity=40)
+        ud = pyud.Client(rate_limiter=limiter)
+        aud = pyud.AsyncClient(rate_limiter=limiter)
+
+    :param rate: The number of tokens added per second
+    :type rate: float
+    :param capacity: The maximum number of tokens in the bucket,
+        which is the largest burst of requests sent at once,
+        defaults to :paramref:`rate`
+    :type capacity: Optional[float]
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Takes a token, and returns the number of seconds
+        to wait until the token would have been added
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """Waits until a token is available, and takes it"""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Waits asynchronously until a token is available, and takes it"""
+        # Imported here so that asyncio is only imported
+        # by programs that use the asynchronous client
+        import asyncio
+
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def __repr__(self):
+        return "TokenBucket(rate={0.rate}, capacity={0.capacity})".format(
+            self
+        )
+
+
+class AIMDController:
+    """
+    Adapts the number of requests in progress at the same time
+    using additive increase and multiplicative decrease
+
+    While requests succeed, the limit grows by :paramref:`increase`
+    for each limit's worth of requests completed. When a request fails,
+    the API responds with a status code of 429 or 5xx, or a request takes
+    longer than :paramref:`latency_target`, the limit is multiplied
+    by :paramref:`decrease`, at most once per :paramref:`cooldown` seconds.
+    This keeps the number of requests in progress close to the most
+    the API can sustain. The controller can be shared between clients,
+    and between threads and event loops.
+
+    :param initial: The initial limit, defaults to 4
+    :type initial: int
+    :param minimum: The smallest limit, defaults to 1
+    :type minimum: int
+    :param maximum: The largest limit, defaults to 64
+    :type maximum: int
+    :param increase: The amount the limit grows by, defaults to 1
+    :type increase: float
+    :param decrease: The factor the limit shrinks by, defaults to 0.5
+    :type decrease: float
+    :param latency_target: The number of seconds above which a request
+        is considered too slow, defaults to :data:`None` (no target)
+    :type latency_target: Optional[float]
+    :param cooldown: The minimum number of seconds between decreases,
+        defaults to 1
+    :type cooldown: float
+
+    .. attribute:: limit
+
+        The current limit on the number of requests in progress
+
+        :type: float
+
+    .. attribute:: in_progress
+
+        The number of requests in progress
+
+        :type: int
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_target: Optional[float] = None,
+        cooldown: float = 1.0
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError(
+                "limits must satisfy 1 <= minimum <= initial <= maximum"
+            )
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.in_progress = 0
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+        self._async_waiters = deque()  # type: deque
+
+    def _try_acquire(self) -> bool:
+        """
+        Takes a place if one is free, returning whether one was taken
+
+        The condition's lock must be held.
+        """
+        if self.in_progress < int(self.limit):
+            self.in_progress += 1
+            return True
+        return False
+
+    def acquire(self):
+        """Waits until the number of requests in progress
+        is below the limit, and takes a place"""
+        with self._condition:
+            while not self._try_acquire():
+                self._condition.wait()
+
+    async def acquire_async(self):
+        """Waits asynchronously until the number of requests in progress
+        is below the limit, and takes a place"""
+        # Imported here so that asyncio is only imported
+        # by programs that use the asynchronous client
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        while True:
+            with self._condition:
+                if self._try_acquire():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                # A cancelled waiter must not be left for release to wake
+                with self._condition:
+                    try:
+                        self._async_waiters.remove((loop, waiter))
+                    except ValueError:
+                        pass
+
+    def release(
+        self,
+        *,
+        latency: Optional[float] = None,
+        status: Optional[int] = None,
+        error: bool = False
+    ):
+        """Gives up a place, adjusting the limit using the outcome
+        of the request
+
+        :param latency: The number of seconds the request took,
+            defaults to :data:`None`
+        :type latency: Optional[float]
+        :param status: The status code of the response,
+            defaults to :data:`None`
+        :type status: Optional[int]
+        :param error: Whether the request failed, defaults to :data:`False`
+        :type error: bool
+        """
+        with self._condition:
+            self.in_progress -= 1
+
+            too_slow = (
+                self.latency_target is not None
+                and latency is not None
+                and latency > self.latency_target
+            )
+            if error or too_slow or is_overloaded(status):
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.limit = max(
+                        float(self.minimum), self.limit * self.decrease
+                    )
+            else:
+                self.limit = min(
+                    float(self.maximum),
+                    self.limit + self.increase / self.limit,
+                )
+
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, deque()
+
+        for loop, waiter in waiters:
+            # Waiters that were cancelled, or whose event loop has been
+            # closed, are no longer waiting and cannot be woken
+            if waiter.done() or loop.is_closed():
+                continue
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The loop was closed after it was checked
+                pass
+
+    def __repr__(self):
+        return (
+            "AIMDController(limit={0.limit:.2f}, "
+            "in_progress={0.in_progress})"
+        ).format(self)
+
+
+def _wake(waiter: 'asyncio.Future'):
+    if not waiter.done():
+        waiter.set_result(None)
@@ -29,6 +29,8 @@ class ReferenceBase:
     Represents a reference in an Urban Dictionary definition.
     """
 
+    __slots__ = ('client', 'word')
+
     def __init__(
         self, client: Union['client.Client', 'client.AsyncClient'], word: str
     ):
@@ -60,6 +62,8 @@ class Reference(ReferenceBase):
         :type: str
     """
 
+    __slots__ = ()
+
     def define(self) -> Optional[List['definition.Definition']]:
         """Returns definitions for the reference
 
@@ -85,6 +89,8 @@ class AsyncReference(ReferenceBase):
         :type: str
     """
 
+    __slots__ = ()
+
     async def define(self) -> Optional[List['definition.Definition']]:
         """Returns definitions for the reference asynchronously
 
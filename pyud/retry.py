@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.retry
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import random
+import threading
+from collections import deque
+from typing import Iterable, Optional
+
+#: The status codes of responses that are retried by default
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+#: The number of latencies recorded before hedged requests are sent
+#: after the 95th percentile latency, rather than the fixed delay
+HEDGE_MIN_SAMPLES = 20
+
+
+class RetryPolicy:
+    """
+    How requests that fail are retried
+
+    Requests that fail with a connection error, a timeout,
+    or a status code in :paramref:`statuses` are sent again
+    up to :paramref:`attempts` times in total. Before each retry,
+    the client waits for a random time between 0 and
+    :paramref:`backoff` seconds doubled for each previous retry,
+    up to :paramref:`max_backoff` seconds, so that clients retrying
+    at the same time are spread out:
+
+    .. code-block:: py
+
+        ud = pyud.Client(retry=pyud.RetryPolicy(attempts=5))
+
+    :param attempts: The maximum number of times a request is sent,
+        including the first time, defaults to 3
+    :type attempts: int
+    :param backoff: The base number of seconds waited before a retry,
+        defaults to 0.1
+    :type backoff: float
+    :param max_backoff: The maximum number of seconds waited before a retry,
+        defaults to 5
+    :type max_backoff: float
+    :param jitter: Whether the time waited is randomised,
+        defaults to :data:`True`. If :data:`False`, the full time is waited.
+    :type jitter: bool
+    :param statuses: The status codes of responses that are retried,
+        defaults to 429, 500, 502, 503 and 504
+    :type statuses: Iterable[int]
+    """
+
+    def __init__(
+        self,
+        *,
+        attempts: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 5.0,
+        jitter: bool = True,
+        statuses: Iterable[int] = RETRY_STATUSES
+    ):
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+
+    def delay(self, retry: int) -> float:
+        """Returns the number of seconds to wait before a retry
+
+        :param retry: The number of retries already made
+        :type retry: int
+        :rtype: float
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** retry)
+        if self.jitter:
+            return random.uniform(0, delay)  # nosec
+        return delay
+
+    def retries_status(self, status: Optional[int]) -> bool:
+        """Returns :data:`True` if responses with the status code
+        given are retried
+
+        :param status: The status code
+        :type status: Optional[int]
+        :rtype: bool
+        """
+        return status in self.statuses
+
+    def __repr__(self):
+        return (
+            "RetryPolicy(attempts={0.attempts}, backoff={0.backoff}, "
+            "max_backoff={0.max_backoff})"
+        ).format(self)
+
+
+class LatencyTracker:
+    """
+    The latencies of the most recent successful requests,
+    used to decide when hedged requests are sent
+
+    :param window: The number of latencies kept, defaults to 200
+    :type window: int
+    """
+
+    def __init__(self, window: int = 200):
+        self._latencies = deque(maxlen=window)  # type: deque
+        self._lock = threading.Lock()
+
+    def add(self, latency: float):
+        """Records the latency of a request
+
+        :param latency: The number of seconds the request took
+        :type latency: float
+        """
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Returns the latency below which the fraction given
+        of recorded latencies fall
+
+        :param fraction: The fraction, between 0 and 1
+        :type fraction: float
+        :return: The latency, or :data:`None` if none have been recorded
+        :rtype: Optional[float]
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(fraction * len(latencies)))
+        return latencies[index]
+
+    def __len__(self):
+        return len(self._latencies)
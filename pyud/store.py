@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.store
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .cache import MISSING, normalise_term
+
+if TYPE_CHECKING:
+    import sqlite3  # noqa: F401
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS definitions (
+    defid INTEGER PRIMARY KEY,
+    word_key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS definitions_word_key ON definitions (word_key);
+CREATE TABLE IF NOT EXISTS terms (
+    term_key TEXT PRIMARY KEY,
+    defids TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+Entry = Tuple[Optional[str], List[Dict[str, Any]]]
+
+
+class DefinitionStore:
+    """
+    A persistent store of definitions, backed by an SQLite database
+
+    Definitions are indexed by ID, and by their normalised word.
+    Lookups of terms are recorded along with the IDs of the definitions
+    found, so that a term can be defined again without using the API.
+    The database is opened in write-ahead logging mode,
+    so that it can be read by many processes at the same time.
+
+    A store is given to a client using the ``store`` parameter,
+    and is consulted after the client's cache, if any:
+
+    .. code-block:: py
+
+        ud = pyud.Client(store=pyud.DefinitionStore("definitions.db"))
+
+    The store is safe to share between threads, with each thread
+    using its own connection to the database.
+
+    :param path: The path to the database file
+    :type path: str
+    :param ttl: The number of seconds after which stored entries expire,
+        defaults to 86400 (one day). :data:`None` never expires entries.
+    :type ttl: Optional[float]
+    :param key_func: The function used to normalise terms and words,
+        defaults to :func:`normalise_term`
+    :type key_func: Callable[[str], str]
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl: Optional[float] = 86400.0,
+        key_func: Callable[[str], str] = normalise_term
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.key_func = key_func
+        self._local = threading.local()
+        self._connections = []  # type: List['sqlite3.Connection']
+        self._lock = threading.Lock()
+        self._closed = False
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> 'sqlite3.Connection':
+        """
+        Returns the connection to the database for the current thread
+        """
+        if self._closed:
+            raise RuntimeError("Store has been closed")
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Store has been closed")
+                # Imported here so that importing pyud does not import
+                # sqlite3, which only the store uses
+                import sqlite3
+
+                conn = sqlite3.connect(
+                    self.path, timeout=10.0, check_same_thread=False
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def _oldest_fresh(self) -> float:
+        """
+        Returns the earliest fetch time of entries that have not expired
+        """
+        if self.ttl is None:
+            return float('-inf')
+        return time.time() - self.ttl
+
+    def get_term(self, term: str) -> Any:
+        """Returns the definition objects stored for a term
+
+        :param term: The term
+        :type term: str
+        :return: The list of definition objects, or :data:`cache.MISSING`
+            if the term is not stored or has expired
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT defids FROM terms WHERE term_key = ? AND fetched_at >= ?",
+            (self.key_func(term), self._oldest_fresh()),
+        ).fetchone()
+        if row is None:
+            return MISSING
+
+        defids = json.loads(row[0])
+        if not defids:
+            return MISSING
+        rows = conn.execute(
+            "SELECT defid, data FROM definitions WHERE defid IN ({})".format(
+                ", ".join("?" * len(defids))
+            ),
+            defids,
+        ).fetchall()
+        if len(rows) != len(defids):
+            # Some of the definitions have been removed since
+            return MISSING
+
+        data = dict(rows)
+        return [json.loads(data[defid]) for defid in defids]
+
+    def get_defid(self, defid: int) -> Any:
+        """Returns the definition object stored for an ID
+
+        :param defid: The ID of the definition
+        :type defid: int
+        :return: A list containing the definition object,
+            or :data:`cache.MISSING` if it is not stored or has expired
+        """
+        row = (
+            self._connect()
+            .execute(
+                "SELECT data FROM definitions "
+                "WHERE defid = ? AND fetched_at >= ?",
+                (defid, self._oldest_fresh()),
+            )
+            .fetchone()
+        )
+        return [json.loads(row[0])] if row is not None else MISSING
+
+    def find_word(self, word: str) -> List[Dict[str, Any]]:
+        """Returns all stored definition objects for a word,
+        whether or not they have expired
+
+        :param word: The word
+        :type word: str
+        :return: The list of definition objects
+        :rtype: List[Dict[str, Any]]
+        """
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT data FROM definitions WHERE word_key = ? "
+                "ORDER BY defid",
+                (self.key_func(word),),
+            )
+            .fetchall()
+        )
+        return [json.loads(data) for data, in rows]
+
+    def put_many(self, entries: Iterable[Entry]):
+        """Stores many lists of definition objects in a single transaction
+
+        :param entries: Pairs of the term the definitions were found for,
+            or :data:`None` if they were not found for a term,
+            and the list of definition objects
+        :type entries: Iterable[Tuple[Optional[str], List[Dict[str, Any]]]]
+
+        Definition objects without a ``defid`` or ``word`` are not stored.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            for term, data in entries:
+                # Objects without an ID or word cannot be stored, and are
+                # skipped, as the clients skip them when building definitions
+                data = [
+                    dictionary
+                    for dictionary in data
+                    if 'defid' in dictionary and 'word' in dictionary
+                ]
+                conn.executemany(
+                    "INSERT OR REPLACE INTO definitions "
+                    "(defid, word_key, data, fetched_at) VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            dictionary['defid'],
+                            self.key_func(dictionary['word']),
+                            json.dumps(dictionary),
+                            now,
+                        )
+                        for dictionary in data
+                    ],
+                )
+                if term is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO terms "
+                        "(term_key, defids, fetched_at) VALUES (?, ?, ?)",
+                        (
+                            self.key_func(term),
+                            json.dumps(
+                                [dictionary['defid'] for dictionary in data]
+                            ),
+                            now,
+                        ),
+                    )
+
+    def put(self, term: Optional[str], data: List[Dict[str, Any]]):
+        """Stores a list of definition objects
+
+        :param term: The term the definitions were found for,
+            or :data:`None` if they were not found for a term
+        :type term: Optional[str]
+        :param data: The list of definition objects
+        :type data: List[Dict[str, Any]]
+        """
+        self.put_many([(term, data)])
+
+    def purge(self):
+        """Removes all expired entries from the store"""
+        oldest = self._oldest_fresh()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM terms WHERE fetched_at < ?", (oldest,))
+            conn.execute(
+                "DELETE FROM definitions WHERE fetched_at < ?", (oldest,)
+            )
+
+    @property
+    def closed(self) -> bool:
+        """:data:`True` if the store has been closed
+
+        :type: bool
+        """
+        return self._closed
+
+    def close(self):
+        """Closes all connections to the database"""
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return "DefinitionStore({0.path!r}, ttl={0.ttl})".format(self)
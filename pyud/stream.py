@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.stream
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from . import json_backend
+
+# Characters that change the structure of the document outside of strings
+STRUCTURE_REGEX = re.compile(rb'[\[\]{}"]')
+# Characters that end or escape part of a string
+STRING_REGEX = re.compile(rb'[\\"]')
+
+SEEKING, IN_LIST, DONE = range(3)
+
+
+class DefinitionStreamParser:
+    """
+    Incrementally parses the array of definition objects under the key
+    'list' in a JSON document, as the document is received in chunks
+
+    Only the structure of the document is scanned, and each definition
+    object is decoded as soon as it is complete, so that the whole document
+    never has to be held in memory.
+
+    :param loads: The function used to decode each definition object,
+        defaults to the fastest JSON backend installed
+    :type loads: Optional[Callable[[bytes], Any]]
+    """
+
+    def __init__(self, loads: Optional[Callable[[bytes], Any]] = None):
+        self._loads = loads or json_backend.get_loads()
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._state = SEEKING
+        self._in_string = False
+        self._string_start = None  # type: Optional[int]
+        self._last_key = None  # type: Optional[bytes]
+        self._object_start = None  # type: Optional[int]
+
+    @property
+    def done(self) -> bool:
+        """:data:`True` if the end of the array has been reached
+
+        :type: bool
+        """
+        return self._state == DONE
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """Parses the next chunk of the document
+
+        :param chunk: The next chunk
+        :type chunk: bytes
+        :return: The definition objects completed by the chunk
+        :rtype: List[Dict[str, Any]]
+        """
+        if self._state == DONE:
+            return []
+
+        buffer = self._buffer
+        buffer += chunk
+        pos = self._pos
+        completed = []
+
+        while True:
+            if self._in_string:
+                match = STRING_REGEX.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == b'\\':
+                    if match.end() >= len(buffer):
+                        # The escaped character has not been received yet
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+
+                pos = match.end()
+                self._in_string = False
+                if self._string_start is not None:
+                    self._last_key = bytes(
+                        buffer[self._string_start : match.start()]
+                    )
+                    self._string_start = None
+                continue
+
+            match = STRUCTURE_REGEX.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+
+            char = match.group()
+            pos = match.end()
+            if char == b'"':
+                self._in_string = True
+                if self._state == SEEKING and self._depth == 1:
+                    self._string_start = pos
+            elif char in b'[{':
+                if (
+                    self._state == SEEKING
+                    and self._depth == 1
+                    and char == b'['
+                    and self._last_key == b'list'
+                ):
+                    self._state = IN_LIST
+                elif (
+                    self._state == IN_LIST
+                    and self._depth == 2
+                    and char == b'{'
+                ):
+                    self._object_start = match.start()
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._state == IN_LIST:
+                    if self._depth == 2 and self._object_start is not None:
+                        completed.append(
+                            self._loads(
+                                bytes(buffer[self._object_start : pos])
+                            )
+                        )
+                        self._object_start = None
+                    elif self._depth == 1:
+                        self._state = DONE
+                        break
+
+        # Discards everything that is no longer needed
+        keep = pos
+        if self._object_start is not None:
+            keep = self._object_start
+        elif self._string_start is not None:
+            keep = self._string_start
+        del buffer[:keep]
+        pos -= keep
+        if self._object_start is not None:
+            self._object_start -= keep
+        if self._string_start is not None:
+            self._string_start -= keep
+        self._pos = pos
+
+        return completed
+
+    def close(self):
+        """Checks that the document has ended where it was expected to
+
+        :raises Exception: The document ended before the array did
+        """
+        if self._state != DONE and (
+            self._state == IN_LIST or self._depth > 0 or self._in_string
+        ):
+            raise Exception("JSON was not given in the correct format")
@@ -0,0 +1,557 @@
+# -*- coding: utf-8 -*-
+"""
+pyud.transport
+Copyright (c) 2020 William Lee
+
+This file is part of pyud.
+
+pyud is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+pyud is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with pyud.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import base64
+import http.client
+import json
+import threading
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+from urllib import error
+
+Response = NamedTuple(
+    'Response',
+    [
+        ('status', int),
+        ('reason', str),
+        ('headers', Mapping[str, str]),
+        ('body', bytes),
+    ],
+)
+
+
+class Transport:
+    """
+    Base class for the transports used by :class:`Client`
+    to send requests to the API
+
+    Subclasses must implement :meth:`open`, and may implement
+    :meth:`close`. The response returned by :meth:`open` must have
+    ``status``, ``reason``, ``headers``, ``connect_time`` and ``wait_time``
+    attributes, like :class:`BufferedResponse`, and ``read(amt=None)``
+    and ``close()`` methods, and must be usable as a context manager.
+    Transports must be safe to use from several threads at once.
+
+    .. attribute:: errors
+
+        The exceptions raised by the transport for failed connections
+        and timeouts, which are retried by the client
+
+        :type: Tuple[Type[Exception], ...]
+    """
+
+    errors = (OSError, http.client.HTTPException)
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Any:
+        """Sends a request, without reading the body of the response
+
+        :param method: The HTTP method
+        :type method: str
+        :param url: The absolute URL to request
+        :type url: str
+        :param headers: Additional headers to send
+        :type headers: Optional[Mapping[str, str]]
+        :return: The response, whose body can be read incrementally
+        """
+        raise NotImplementedError
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """Sends a request, and reads the whole body of the response
+
+        The parameters are the same as :meth:`open`.
+
+        :rtype: Response
+        """
+        with self.open(method, url, headers) as response:
+            body = response.read()
+            return Response(
+                response.status, response.reason, response.headers, body
+            )
+
+    @property
+    def closed(self) -> bool:
+        """:data:`True` if the transport has been closed
+
+        :type: bool
+        """
+        return False
+
+    def close(self):
+        """Closes the transport, and any connections it holds"""
+
+
+class AsyncTransport:
+    """
+    Base class for the transports used by :class:`AsyncClient`
+    to send requests to the API
+
+    Subclasses must implement :meth:`open`, and may implement
+    :meth:`aclose`. The response returned by :meth:`open` must have
+    ``status``, ``reason``, ``headers``, ``connect_time`` and ``wait_time``
+    attributes, like :class:`AsyncBufferedResponse`, a coroutine method
+    ``read(amt=None)``, and ``raise_for_status()`` and ``release()``
+    methods.
+
+    .. attribute:: errors
+
+        The exceptions raised by the transport for failed connections
+        and timeouts, which are retried by the client
+
+        :type: Tuple[Type[Exception], ...]
+    """
+
+    @property
+    def errors(self) -> Tuple[Type[Exception], ...]:
+        # Imported here so that asyncio is only imported
+        # by programs that use the asynchronous client
+        import asyncio
+
+        return (OSError, asyncio.TimeoutError)
+
+    async def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Any:
+        """Sends a request, without reading the body of the response
+
+        :param method: The HTTP method
+        :type method: str
+        :param url: The absolute URL to request
+        :type url: str
+        :param headers: Additional headers to send
+        :type headers: Optional[Mapping[str, str]]
+        :return: The response, whose body can be read incrementally
+        """
+        raise NotImplementedError
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """Sends a request, and reads the whole body of the response
+
+        The parameters are the same as :meth:`open`.
+
+        :rtype: Response
+        """
+        response = await self.open(method, url, headers)
+        try:
+            body = await response.read()
+        finally:
+            response.release()
+        return Response(
+            response.status, response.reason, response.headers, body
+        )
+
+    @property
+    def closed(self) -> bool:
+        """:data:`True` if the transport has been closed
+
+        :type: bool
+        """
+        return False
+
+    async def aclose(self):
+        """Closes the transport, and any connections it holds"""
+
+
+class BufferedResponse:
+    """
+    A response whose body is held in memory,
+    returned by :class:`ReplayTransport` and :class:`RecordingTransport`
+
+    .. attribute:: status
+
+        The status code of the response
+
+        :type: int
+
+    .. attribute:: reason
+
+        The reason phrase of the response
+
+        :type: str
+
+    .. attribute:: headers
+
+        The headers of the response
+
+        :type: Mapping[str, str]
+
+    .. attribute:: connect_time
+
+        The number of seconds taken to open a new connection
+
+        :type: float
+
+    .. attribute:: wait_time
+
+        The number of seconds between sending the request
+        and receiving the headers of the response
+
+        :type: float
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        connect_time: float = 0.0,
+        wait_time: float = 0.0,
+    ):
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.connect_time = connect_time
+        self.wait_time = wait_time
+        self._body = response.body
+        self._pos = 0
+
+    def _read(self, amt: Optional[int] = None) -> bytes:
+        end = len(self._body) if amt is None or amt < 0 else self._pos + amt
+        chunk = self._body[self._pos : end]
+        self._pos += len(chunk)
+        return chunk
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        """Reads the body of the response
+
+        :param amt: The maximum number of bytes to read,
+            defaults to :data:`None` (read the rest of the body)
+        :type amt: Optional[int]
+        :rtype: bytes
+        """
+        return self._read(amt)
+
+    def raise_for_status(self):
+        """Raises an error if the status code is not 200
+
+        :raises urllib.error.HTTPError: The status code is not 200
+        """
+        if self.status != 200:
+            raise error.HTTPError(
+                None, self.status, self.reason, self.headers, None
+            )
+
+    def close(self):
+        """Closes the response"""
+
+    release = close
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class AsyncBufferedResponse(BufferedResponse):
+    """
+    A response whose body is held in memory,
+    returned by :class:`AsyncReplayTransport`
+    and :class:`AsyncRecordingTransport`
+    """
+
+    async def read(self, amt: Optional[int] = None) -> bytes:
+        """Reads the body of the response
+
+        :param amt: The maximum number of bytes to read,
+            defaults to :data:`None` (read the rest of the body)
+        :type amt: Optional[int]
+        :rtype: bytes
+        """
+        return self._read(amt)
+
+
+class Cassette:
+    """
+    Responses recorded by :class:`RecordingTransport`
+    or :class:`AsyncRecordingTransport`, which can be saved to a file
+    and replayed by :class:`ReplayTransport` or :class:`AsyncReplayTransport`
+
+    Several responses can be recorded for the same request, such as for
+    random definitions, and they are replayed in the order they were
+    recorded, starting again from the first once every response
+    has been replayed.
+    """
+
+    def __init__(self):
+        self._responses = {}  # type: Dict[Tuple[str, str], List[Response]]
+        self._positions = {}  # type: Dict[Tuple[str, str], int]
+        self._lock = threading.Lock()
+
+    def add(self, method: str, url: str, response: Response):
+        """Records a response to a request
+
+        :param method: The HTTP method of the request
+        :type method: str
+        :param url: The URL of the request
+        :type url: str
+        :param response: The response
+        :type response: Response
+        """
+        with self._lock:
+            self._responses.setdefault((method, url), []).append(response)
+
+    def get(self, method: str, url: str) -> Response:
+        """Returns the next response recorded for a request
+
+        :param method: The HTTP method of the request
+        :type method: str
+        :param url: The URL of the request
+        :type url: str
+        :rtype: Response
+        :raises LookupError: No response was recorded for the request
+        """
+        key = (method, url)
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                raise LookupError(
+                    "No response recorded for {} {}".format(method, url)
+                )
+            position = self._positions.get(key, 0)
+            self._positions[key] = (position + 1) % len(responses)
+            return responses[position]
+
+    def save(self, path: str):
+        """Writes the recorded responses to a JSON file
+
+        :param path: The path of the file
+        :type path: str
+        """
+        with self._lock:
+            entries = [
+                {
+                    'method': method,
+                    'url': url,
+                    'status': response.status,
+                    'reason': response.reason,
+                    'headers': dict(response.headers),
+                    'body': base64.b64encode(response.body).decode('ascii'),
+                }
+                for (method, url), responses in self._responses.items()
+                for response in responses
+            ]
+        with open(path, 'w') as file:
+            json.dump(entries, file)
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        """Reads responses from a JSON file written by :meth:`save`
+
+        :param path: The path of the file
+        :type path: str
+        :rtype: Cassette
+        """
+        cassette = cls()
+        with open(path) as file:
+            entries = json.load(file)
+        for entry in entries:
+            cassette.add(
+                entry['method'],
+                entry['url'],
+                Response(
+                    entry['status'],
+                    entry['reason'],
+                    entry['headers'],
+                    base64.b64decode(entry['body']),
+                ),
+            )
+        return cassette
+
+    def __len__(self):
+        return sum(map(len, self._responses.values()))
+
+
+class RecordingTransport(Transport):
+    """
+    A transport that sends requests using another transport,
+    and records each response in a :class:`Cassette`
+
+    .. code-block:: py
+
+        cassette = pyud.Cassette()
+        pool = pyud.pool.ConnectionPool()
+        with pyud.Client(
+            transport=pyud.RecordingTransport(pool, cassette)
+        ) as ud:
+            ud.define("hello")
+        pool.close()
+        cassette.save("hello.json")
+
+    :param transport: The transport used to send requests
+    :type transport: Transport
+    :param cassette: The cassette responses are recorded in
+    :type cassette: Cassette
+    """
+
+    def __init__(self, transport: Transport, cassette: Cassette):
+        self.transport = transport
+        self.cassette = cassette
+        self.errors = transport.errors
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> BufferedResponse:
+        with self.transport.open(method, url, headers) as response:
+            recorded = Response(
+                response.status,
+                response.reason,
+                dict(response.headers),
+                response.read(),
+            )
+        self.cassette.add(method, url, recorded)
+        return BufferedResponse(
+            recorded, response.connect_time, response.wait_time
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self.transport.closed
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRecordingTransport(AsyncTransport):
+    """
+    An asynchronous transport that sends requests using another
+    transport, and records each response in a :class:`Cassette`
+
+    :param transport: The transport used to send requests
+    :type transport: AsyncTransport
+    :param cassette: The cassette responses are recorded in
+    :type cassette: Cassette
+    """
+
+    def __init__(self, transport: AsyncTransport, cassette: Cassette):
+        self.transport = transport
+        self.cassette = cassette
+
+    @property
+    def errors(self) -> Tuple[Type[Exception], ...]:
+        return self.transport.errors
+
+    async def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> AsyncBufferedResponse:
+        response = await self.transport.open(method, url, headers)
+        try:
+            body = await response.read()
+        finally:
+            response.release()
+        recorded = Response(
+            response.status, response.reason, dict(response.headers), body
+        )
+        self.cassette.add(method, url, recorded)
+        return AsyncBufferedResponse(
+            recorded, response.connect_time, response.wait_time
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self.transport.closed
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ReplayTransport(Transport):
+    """
+    A transport that replays the responses in a :class:`Cassette`,
+    without sending any requests
+
+    This makes it possible to run deterministic tests and load tests
+    without a network connection:
+
+    .. code-block:: py
+
+        transport = pyud.ReplayTransport(pyud.Cassette.load("hello.json"))
+        with pyud.Client(transport=transport) as ud:
+            ud.define("hello")
+
+    Requests with no recorded response raise :exc:`LookupError`.
+
+    :param cassette: The cassette responses are replayed from
+    :type cassette: Cassette
+    """
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> BufferedResponse:
+        return BufferedResponse(self.cassette.get(method, url))
+
+
+class AsyncReplayTransport(AsyncTransport):
+    """
+    An asynchronous transport that replays the responses
+    in a :class:`Cassette`, without sending any requests
+
+    Requests with no recorded response raise :exc:`LookupError`.
+
+    :param cassette: The cassette responses are replayed from
+    :type cassette: Cassette
+    """
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def open(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> AsyncBufferedResponse:
+        return AsyncBufferedResponse(self.cassette.get(method, url))
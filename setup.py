@@ -58,5 +58,11 @@ setup(
     },
     packages=['pyud'],
     install_requires=requirements,
+    extras_require={
+        "arrow": ["pyarrow"],
+        "numpy": ["numpy"],
+        "orjson": ["orjson"],
+        "ujson": ["ujson"],
+    },
     python_requires="~=3.5.3",
 )
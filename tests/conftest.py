@@ -5,8 +5,24 @@ Source:
 https://docs.pytest.org/en/stable/example/simple.html?#incremental-testing-test-steps
 """
 
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlsplit
+
 import pytest
 
+import pyud
+from helpers import make_definition
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    pass
+
+
 # store history of failures per test class name
 # and per index in parametrize (if parametrize used)
 _test_failed_incremental = {}
@@ -57,3 +73,81 @@ def pytest_runtest_setup(item):
             # for the combination of class name & test name
             if test_name is not None:
                 pytest.xfail("previous test failed ({})".format(test_name))
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        self.server.requests.append(self.path)
+
+        if self.server.delays:
+            time.sleep(self.server.delays.pop(0))
+
+        if self.server.failures:
+            status = self.server.failures.pop(0)
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if url.path.endswith("/random"):
+            definitions = [
+                make_definition(next(self.server.defids), "random")
+                for _ in range(10)
+            ]
+        elif "term" in query:
+            definitions = self.server.terms.get(query["term"][0], [])
+        else:
+            defid = int(query["defid"][0])
+            definitions = [
+                definition
+                for definitions in self.server.terms.values()
+                for definition in definitions
+                if definition["defid"] == defid
+            ]
+
+        body = json.dumps({"list": definitions}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_server(monkeypatch):
+    """
+    Runs a local stand-in for the API, which the clients are pointed at
+
+    Definitions for terms are set using the ``terms`` attribute,
+    and the paths of requests received are in the ``requests`` attribute.
+    Status codes added to the ``failures`` attribute are responded with,
+    in order, before any definitions, and requests are delayed
+    by the number of seconds added to the ``delays`` attribute, in order.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), APIHandler)
+    server.daemon_threads = True
+    server.terms = {"hello": [make_definition(i) for i in range(1, 31)]}
+    server.requests = []
+    server.failures = []
+    server.delays = []
+    server.defids = itertools.count(1000)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    server.base_url = "http://127.0.0.1:{}/v0/".format(
+        server.server_address[1]
+    )
+    # Clients created during the test use the server by default
+    monkeypatch.setattr(pyud.client, "BASE_URL", server.base_url)
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
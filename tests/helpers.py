@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers shared between the tests
+"""
+
+
+def make_definition(defid, word="hello", **attrs):
+    """
+    Returns a definition object in the format given by the API
+    """
+    return dict(
+        {
+            "defid": defid,
+            "word": word,
+            "definition": "a [greeting]",
+            "author": "me",
+            "thumbs_up": 1,
+            "thumbs_down": 0,
+            "example": "{} there".format(word),
+            "permalink": "http://{}.urbanup.com/{}".format(word, defid),
+            "sound_urls": [],
+            "written_on": "2020-06-29T00:00:00.000Z",
+        },
+        **attrs
+    )
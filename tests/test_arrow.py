@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from helpers import make_definition
+
+pytest.importorskip("pyarrow")
+
+from pyud import arrow  # noqa: E402
+
+
+@pytest.fixture
+def definitions():
+    client = pyud.Client()
+    yield [
+        pyud.Definition(
+            client,
+            **make_definition(
+                i,
+                definition="[a] and [b {}]".format(i),
+                written_on="2020-06-29T01:02:03.456Z",
+                **({"current_vote": ""} if i % 2 else {})
+            )
+        )
+        for i in range(25)
+    ]
+    client.close()
+
+
+def test_record_batches(definitions):
+    batches = list(arrow.to_record_batches(iter(definitions), chunk_size=10))
+    assert [batch.num_rows for batch in batches] == [10, 10, 5]
+    assert batches[0].column(10).to_pylist()[3] == ["a", "b 3"]
+
+    restored = [d for batch in batches for d in arrow.from_record_batch(batch)]
+    assert restored == definitions
+
+
+def test_parquet(definitions, tmp_path):
+    path = str(tmp_path / "definitions.parquet")
+    assert arrow.write_parquet(definitions, path, chunk_size=7) == 25
+
+    client = pyud.Client()
+    restored = list(arrow.read_parquet(path, client, batch_size=4))
+    client.close()
+    assert restored == definitions
+    for original, definition in zip(definitions, restored):
+        assert definition.client is client
+        assert definition.raw_written_on == original.raw_written_on
+        assert definition.definition == original.definition
+        assert definition.extra == original.extra
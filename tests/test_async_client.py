@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import subprocess  # nosec
+import sys
+
 import pytest
 
 import pyud
+from helpers import make_definition
 
 
 @pytest.fixture
@@ -40,3 +45,93 @@ class TestAsyncClient:
     @pytest.mark.asyncio
     async def test_client_random_limit_gt_10(self, client):
         assert len(await client.random(limit=43)) == 43
+
+
+@pytest.mark.asyncio
+async def test_client_context_manager():
+    async with pyud.AsyncClient(limit_per_host=4) as client:
+        assert not client.closed
+    assert client.closed
+
+    with pytest.raises(RuntimeError):
+        await client.define('hello')
+
+    # Closing more than once has no effect
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_define_many(monkeypatch):
+    client = pyud.AsyncClient()
+    calls = []
+
+    async def define(term):
+        calls.append(term)
+        if term == "error":
+            raise ValueError(term)
+        return [term] if term != "missing" else None
+
+    monkeypatch.setattr(client, "define", define)
+    results = await client.define_many(
+        ["hello", "missing", "hello", "error"], concurrency=2
+    )
+    assert sorted(calls) == ["error", "hello", "missing"]
+    assert results["hello"] == ["hello"]
+    assert results["missing"] is None
+    assert isinstance(results["error"], ValueError)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_define_many_as_completed_cancels(monkeypatch):
+    client = pyud.AsyncClient()
+    cancelled = []
+
+    async def define(term):
+        try:
+            await asyncio.sleep(0 if term == "fast" else 1)
+        except asyncio.CancelledError:
+            cancelled.append(term)
+            raise
+        return [term]
+
+    monkeypatch.setattr(client, "define", define)
+    for future in client.define_many_as_completed(["fast", "slow", "slower"]):
+        assert await future == ("fast", ["fast"])
+        break
+    await asyncio.sleep(0.01)
+    assert sorted(cancelled) == ["slow", "slower"]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_requests(monkeypatch):
+    client = pyud.AsyncClient()
+    calls = []
+
+    async def fetch_json(url):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return [make_definition(1)]
+
+    monkeypatch.setattr(client, "_fetch_json", fetch_json)
+    results = await asyncio.gather(*(client.define("hello") for _ in range(5)))
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert results[0][0] is not results[1][0]
+
+    await client.define("hello")
+    assert len(calls) == 2
+    await client.aclose()
+
+
+def test_aiohttp_imported_lazily():
+    check = (
+        "import sys, pyud\n"
+        "pyud.Client().close()\n"
+        "assert 'asyncio' not in sys.modules\n"
+        "assert 'aiohttp' not in sys.modules\n"
+        "pyud.AsyncClient()\n"
+        "assert 'aiohttp' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', check], check=True)  # nosec
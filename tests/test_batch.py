@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from helpers import make_definition
+
+np = pytest.importorskip("numpy")
+
+VOTES = [(10, 0), (100, 10), (0, 0), (1, 5), (50, 50)]
+
+
+@pytest.fixture
+def client():
+    with pyud.Client() as client:
+        yield client
+
+
+@pytest.fixture
+def definitions(client):
+    return [
+        pyud.Definition(
+            client,
+            **make_definition(
+                i,
+                thumbs_up=up,
+                thumbs_down=down,
+                written_on="2020-06-{:02}T01:02:03.456Z".format(i + 1),
+                current_vote="",
+            )
+        )
+        for i, (up, down) in enumerate(VOTES)
+    ]
+
+
+@pytest.fixture
+def batch(definitions):
+    return pyud.DefinitionBatch.from_definitions(definitions)
+
+
+def test_scores(batch):
+    assert list(batch.score()) == [10, 90, 0, -4, 0]
+    assert list(batch.ratio()) == pytest.approx([1, 100 / 110, 0, 1 / 6, 0.5])
+    wilson = batch.wilson()
+    assert wilson[2] == 0
+    assert wilson[1] > wilson[0] > wilson[4] > wilson[3]
+
+
+def test_sort_and_top_k(batch):
+    assert list(batch.sort().column("defid")) == [1, 0, 4, 2, 3]
+    assert list(batch.sort("defid", descending=False).column("defid")) == [
+        0,
+        1,
+        2,
+        3,
+        4,
+    ]
+    assert list(batch.top_k(2, "wilson").column("defid")) == [1, 0]
+    assert len(batch.top_k(10)) == 5
+
+
+def test_filter(batch):
+    popular = batch.filter(batch.column("thumbs_up") >= 50)
+    assert list(popular.column("defid")) == [1, 4]
+    assert len(batch[batch.length() > 100]) == 0
+
+
+def test_round_trip(batch, definitions):
+    array = batch.to_structured()
+    assert pyud.DefinitionBatch.from_structured(array).to_structured() is array
+
+    for original, restored in zip(definitions, batch):
+        assert restored == original
+        assert restored.written_on == original.written_on
+        assert restored.definition == original.definition
+        assert restored.extra == original.extra
+    assert batch[0].references[0].word == "greeting"
+
+
+def test_empty():
+    batch = pyud.DefinitionBatch.from_definitions(None)
+    assert len(batch) == 0
+    assert len(batch.top_k(3)) == 0
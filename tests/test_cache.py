@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from helpers import make_definition
+
+DATA = [make_definition(1)]
+
+
+def test_normalise_term():
+    assert pyud.normalise_term("  Hello   World ") == "hello world"
+
+
+def test_cache_lru():
+    cache = pyud.Cache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses, cache.evictions) == (3, 1, 1)
+
+
+def test_cache_ttl():
+    cache = pyud.Cache(ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+    cache.set("a", 1, ttl=60)
+    assert cache.get("a") == 1
+
+
+def test_client_cache(monkeypatch):
+    client = pyud.Client(cache=pyud.Cache())
+    calls = []
+
+    def fetch_json(url):
+        calls.append(url)
+        return DATA
+
+    monkeypatch.setattr(client, "_fetch_json", fetch_json)
+    first = client.define("Hello")
+    second = client.define(" hello ")
+    assert len(calls) == 1
+    assert first == second
+    assert first[0] is not second[0]
+    assert client.cache.hits == 1
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_client_cache(monkeypatch):
+    client = pyud.AsyncClient(cache=pyud.Cache())
+    calls = []
+
+    async def fetch_json(url):
+        calls.append(url)
+        return DATA
+
+    monkeypatch.setattr(client, "_fetch_json", fetch_json)
+    assert (await client.from_id(1)).word == "hello"
+    assert (await client.from_id(1)).word == "hello"
+    assert len(calls) == 1
+    await client.aclose()
+
+
+def test_cache_negative():
+    cache = pyud.Cache(negative_maxsize=2)
+    cache.set_negative("a")
+    assert cache.is_negative("a")
+    assert "a" not in cache
+    assert not cache.is_negative("b")
+
+    # A lookup that finds definitions replaces the negative entry
+    cache.set("a", 1)
+    assert not cache.is_negative("a")
+    cache.set_negative("a")
+    assert "a" not in cache
+
+    for key in "bcd":
+        cache.set_negative(key)
+    assert not cache.is_negative("b")
+    assert cache.is_negative("c") and cache.is_negative("d")
+
+    # Keys are forgotten when the filter is rebuilt
+    for i in range(10):
+        cache.set_negative(i)
+    assert cache.is_negative(8) and cache.is_negative(9)
+    assert not any(cache.is_negative(i) for i in range(8))
+
+    cache.clear()
+    assert not cache.is_negative(9)
+
+
+def test_cache_negative_ttl():
+    cache = pyud.Cache(negative_ttl=0)
+    cache.set_negative("a")
+    assert not cache.is_negative("a")
+
+    disabled = pyud.Cache(negative_maxsize=0)
+    disabled.set_negative("a")
+    assert not disabled.is_negative("a")
+
+    with pytest.raises(ValueError):
+        pyud.Cache(negative_maxsize=-1)
+
+
+def test_client_negative_cache(api_server):
+    metrics = pyud.Metrics()
+    with pyud.Client(cache=pyud.Cache(), metrics=metrics) as client:
+        assert client.define("nothing") is None
+        assert client.define(" Nothing ") is None
+        assert list(client.iter_define("nothing")) == []
+        assert client.define("hello")
+    assert len(api_server.requests) == 2
+    assert metrics.counter('negative_cache_hits_total') == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_negative_cache(api_server):
+    async with pyud.AsyncClient(cache=pyud.Cache()) as client:
+        assert await client.from_id(1234) is None
+        assert await client.from_id(1234) is None
+        assert await client.define("nothing") is None
+        assert await client.define("nothing") is None
+    assert len(api_server.requests) == 2
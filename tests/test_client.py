@@ -2,6 +2,7 @@
 import pytest
 
 import pyud
+from helpers import make_definition
 
 
 @pytest.fixture
@@ -34,3 +35,59 @@ class TestClient:
 
     def test_client_random_limit_gt_10(self, client):
         assert len(client.random(limit=43)) == 43
+
+
+def test_client_context_manager():
+    with pyud.Client(pool_size=4) as client:
+        assert not client.closed
+    assert client.closed
+
+    with pytest.raises(RuntimeError):
+        client.define('hello')
+
+    # Closing more than once has no effect
+    client.close()
+
+
+def test_client_random_pages(monkeypatch):
+    client = pyud.Client()
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        return [
+            pyud.Definition(
+                client, **make_definition((len(calls) * 10 + i) % 15, "word")
+            )
+            for i in range(10)
+        ]
+
+    monkeypatch.setattr(client, "_fetch_definitions", fetch)
+    assert len(client.random(limit=20)) == 20
+    assert len(calls) == 2
+
+    calls.clear()
+    definitions = client.random(limit=15, unique=True)
+    assert len({definition.defid for definition in definitions}) == 15
+    client.close()
+
+
+def test_client_define_many(monkeypatch):
+    client = pyud.Client()
+    calls = []
+
+    def define(term):
+        calls.append(term)
+        if term == "error":
+            raise ValueError(term)
+        return [term] if term != "missing" else None
+
+    monkeypatch.setattr(client, "define", define)
+    results = client.define_many(
+        ["hello", "missing", "hello", "error"], concurrency=2
+    )
+    assert sorted(calls) == ["error", "hello", "missing"]
+    assert results["hello"] == ["hello"]
+    assert results["missing"] is None
+    assert isinstance(results["error"], ValueError)
+    client.close()
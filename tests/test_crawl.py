@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from helpers import make_definition
+
+
+@pytest.fixture
+def graph(api_server):
+    api_server.terms = {
+        "a": [make_definition(1, "a", definition="[b] and [c]")],
+        "b": [make_definition(2, "b", definition="[A] and [d]")],
+        "c": [make_definition(3, "c", definition="[d]")],
+        "d": [make_definition(4, "d", definition="[e]")],
+    }
+    return api_server
+
+
+def test_crawl(graph):
+    with pyud.Client() as client:
+        results = list(client.crawl(["a"], max_depth=2))
+
+    assert sorted((depth, term) for depth, term, _ in results) == [
+        (0, "a"),
+        (1, "b"),
+        (1, "c"),
+        (2, "d"),
+    ]
+    assert len(graph.requests) == 4
+
+
+def test_crawl_max_terms(graph):
+    with pyud.Client() as client:
+        results = list(client.crawl(["a"], max_depth=5, max_terms=2))
+
+    assert [term for _, term, _ in results] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_async_crawl(graph):
+    async with pyud.AsyncClient() as client:
+        results = []
+        async for depth, term, definitions in client.crawl(
+            ["a"], max_depth=3, concurrency=2
+        ):
+            results.append((depth, term, definitions))
+
+    assert [(depth, term) for depth, term, _ in results][:1] == [(0, "a")]
+    assert sorted(term for _, term, _ in results) == ["a", "b", "c", "d", "e"]
+    assert [r[2] for r in results if r[1] == "e"] == [None]
+    assert [depth for depth, _, _ in results] == sorted(
+        depth for depth, _, _ in results
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_crawl_aclose(graph):
+    async with pyud.AsyncClient() as client:
+        crawl = client.crawl(["a"], max_depth=3)
+        async for depth, term, definitions in crawl:
+            break
+        await crawl.aclose()
+        with pytest.raises(StopAsyncIteration):
+            await crawl.__anext__()
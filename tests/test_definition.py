@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from datetime import datetime
+
 import pytest
 
 import pyud
@@ -68,3 +70,55 @@ def test_excess_attributes(client):
 
     for key, value in EXTRA_ATTRIBUTES.items():
         assert getattr(definition, key) == value
+
+
+def test_excess_attributes_extra(client):
+    definition = pyud.Definition(client, **dict(DATA, **EXTRA_ATTRIBUTES))
+
+    assert definition.extra == EXTRA_ATTRIBUTES
+    with pytest.raises(AttributeError):
+        definition.attribute5
+
+
+def test_definition_slots(client):
+    definition = pyud.Definition(client, **DATA)
+
+    assert not hasattr(definition, "__dict__")
+    assert not hasattr(definition.references[0], "__dict__")
+
+
+def test_references(client):
+    data = dict(DATA, definition="[a] b [c d]", example="[e]")
+    definition = pyud.Definition(client, **data)
+
+    assert [ref.word for ref in definition.references] == ["a", "c d", "e"]
+    assert definition.definition == "a b c d"
+    assert definition.example == "e"
+    assert definition.raw_definition == "[a] b [c d]"
+    assert definition.raw_example == "[e]"
+
+
+def test_written_on(client):
+    data = dict(DATA, written_on="2020-06-29T01:02:03.45Z")
+    definition = pyud.Definition(client, **data)
+
+    assert definition.written_on == datetime(2020, 6, 29, 1, 2, 3, 450000)
+    assert definition.raw_written_on == "2020-06-29T01:02:03.45Z"
+    # The normalised timestamp is shown, as before written_on was lazy
+    assert repr(definition).endswith(
+        "written_on=2020-06-29T01:02:03.450000Z)"
+    )
+
+
+def test_written_on_out_of_range(client):
+    data = dict(DATA, written_on="2020-13-29T01:02:03.45Z")
+    with pytest.raises(ValueError, match="correct format"):
+        pyud.Definition(client, **data)
+
+
+def test_lazy_written_on():
+    client = pyud.Client(lazy_timestamps=True)
+    definition = pyud.Definition(client, **dict(DATA, written_on="bad"))
+
+    with pytest.raises(ValueError):
+        definition.written_on
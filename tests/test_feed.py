@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import itertools
+import time
+
+import pytest
+
+import pyud
+from pyud.feed import SeenWindow
+
+
+def test_seen_window():
+    seen = SeenWindow(2)
+    assert seen.add(1)
+    assert not seen.add(1)
+    assert seen.add(2)
+    assert seen.add(3)
+    # The oldest ID is forgotten
+    assert 1 not in seen
+    assert len(seen) == 2
+    assert seen.add(1)
+
+    unbounded = SeenWindow(None)
+    assert all(unbounded.add(defid) for defid in range(100))
+    assert not unbounded.add(0)
+
+    disabled = SeenWindow(0)
+    assert disabled.add(1)
+    assert disabled.add(1)
+
+
+def test_random_stream(api_server):
+    api_server.defids = itertools.cycle(range(15))
+    metrics = pyud.Metrics()
+    with pyud.Client(metrics=metrics) as ud:
+        stream = ud.random_stream(prefetch=2)
+        definitions = list(itertools.islice(stream, 15))
+        stream.close()
+
+    assert sorted(d.defid for d in definitions) == list(range(15))
+    assert metrics.counter('random_duplicates_total') >= 5
+
+
+def test_random_stream_backpressure(api_server):
+    with pyud.Client() as ud:
+        stream = ud.random_stream(prefetch=2)
+        next(stream)
+        time.sleep(0.2)
+        # The page taken, and the pages fetched ahead
+        assert len(api_server.requests) == 3
+
+        for _ in range(9):
+            next(stream)
+        time.sleep(0.2)
+        assert len(api_server.requests) == 3
+
+        next(stream)
+        time.sleep(0.2)
+        assert len(api_server.requests) == 4
+        stream.close()
+
+
+def test_random_stream_error(api_server):
+    api_server.failures = [404, 404]
+    with pyud.Client() as ud:
+        with pytest.raises(Exception):
+            next(ud.random_stream())
+
+
+def test_random_stream_arguments():
+    with pyud.Client() as ud:
+        with pytest.raises(ValueError):
+            ud.random_stream(prefetch=0)
+    with pytest.raises(RuntimeError):
+        ud.random_stream()
+
+
+@pytest.mark.asyncio
+async def test_arandom_stream(api_server):
+    api_server.defids = itertools.cycle(range(15))
+    async with pyud.AsyncClient() as ud:
+        stream = ud.arandom_stream(prefetch=3)
+        definitions = []
+        async for definition in stream:
+            definitions.append(definition)
+            if len(definitions) == 15:
+                break
+
+        assert sorted(d.defid for d in definitions) == list(range(15))
+        await stream.aclose()
+        await stream.aclose()
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_arandom_stream_backpressure(api_server):
+    async with pyud.AsyncClient() as ud:
+        stream = ud.arandom_stream(prefetch=2)
+        await stream.__anext__()
+        await asyncio.sleep(0.2)
+        assert len(api_server.requests) == 3
+
+        for _ in range(9):
+            await stream.__anext__()
+        await asyncio.sleep(0.2)
+        assert len(api_server.requests) == 3
+
+        await stream.__anext__()
+        await asyncio.sleep(0.2)
+        assert len(api_server.requests) == 4
+        await stream.aclose()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from helpers import make_definition
+from pyud.index import tokenize
+
+
+@pytest.fixture
+def index():
+    index = pyud.DefinitionIndex()
+    index.add_objects(
+        [
+            make_definition(
+                1,
+                "hello",
+                definition="A [greeting] used by friends",
+                author="alice",
+                thumbs_up=5,
+            ),
+            make_definition(
+                2,
+                "hello world",
+                definition="The first program, a [greeting]",
+                example="print('Hello World')",
+                author="bob",
+                thumbs_up=50,
+            ),
+            make_definition(
+                3,
+                "goodbye",
+                definition="What you say to [friends] when leaving",
+                author="Alice",
+                thumbs_up=20,
+                thumbs_down=30,
+            ),
+        ]
+    )
+    return index
+
+
+def test_tokenize():
+    assert tokenize("Don't [PANIC], it's 42!") == [
+        "don",
+        "t",
+        "panic",
+        "it",
+        "s",
+        "42",
+    ]
+
+
+def test_index_search(index):
+    assert index.search_ids("hello") == [2, 1]
+    assert index.search_ids("word:world") == [2]
+    assert index.search_ids("author:alice") == [1, 3]
+    assert index.search_ids("references:greeting") == [2, 1]
+    assert index.search_ids("references:friends") == [3]
+    assert index.search_ids("friends") == [1, 3]
+    assert index.search_ids("definition:greet*") == [2, 1]
+    assert index.search_ids("fri*") == [1, 3]
+    assert index.search_ids("nothing") == []
+    assert index.search_ids("hello", limit=1) == [2]
+
+
+def test_index_boolean_queries(index):
+    assert index.search_ids("greeting friends") == [1]
+    assert index.search_ids("greeting -friends") == [2]
+    assert index.search_ids("greeting NOT author:bob") == [1]
+    assert index.search_ids("goodbye OR program") == [2, 3]
+    assert index.search_ids("-hello") == [3]
+    assert index.match("word:hello word:world OR author:alice") == {1, 2, 3}
+
+    with pytest.raises(ValueError):
+        index.search("colour:red")
+
+
+def test_index_updates(index):
+    assert len(index) == 3
+    assert index.get(4) is None
+    assert index.get(1).author == "alice"
+
+    index.add_objects(
+        [make_definition(1, "hello", definition="replaced", author="carol")]
+    )
+    assert len(index) == 3
+    assert index.search_ids("author:alice") == [3]
+    assert index.search_ids("replaced") == [1]
+
+    index.remove(2)
+    assert 2 not in index
+    assert index.search_ids("program") == []
+    assert index.search_ids("hello*") == [1]
+    with pytest.raises(KeyError):
+        index.remove(2)
+
+    index.clear()
+    assert len(index) == 0
+    assert index.search_ids("hello") == []
+
+
+def test_index_add_definitions(index):
+    other = pyud.DefinitionIndex()
+    other.add(index.search("hello"))
+    assert other.search_ids("references:greeting") == [2, 1]
+    assert other.get(2).raw_definition == "The first program, a [greeting]"
+
+
+def test_index_save_load(index, tmp_path):
+    path = str(tmp_path / "index.json")
+    index.save(path)
+    loaded = pyud.DefinitionIndex.load(path)
+    assert len(loaded) == 3
+    for query in ("hello", "fri*", "greeting -friends", "author:alice"):
+        assert loaded.search_ids(query) == index.search_ids(query)
+
+    loaded.add_objects([make_definition(4, "hi", definition="a [greeting]")])
+    assert loaded.search_ids("greeting") == [2, 1, 4]
+
+    with open(path, "w") as file:
+        file.write('{"version": 0}')
+    with pytest.raises(ValueError):
+        pyud.DefinitionIndex.load(path)
+
+
+def test_client_index(api_server):
+    index = pyud.DefinitionIndex()
+    with pyud.Client(index=index, cache=pyud.Cache()) as client:
+        client.define("hello")
+        client.define("hello")
+        client.random(limit=10)
+        assert index.client is client
+    assert len(index) == 40
+    assert len(index.search_ids("word:random")) == 10
+    assert index.search("word:hello", limit=1)[0].client is client
+
+
+@pytest.mark.asyncio
+async def test_async_client_index(api_server):
+    index = pyud.DefinitionIndex()
+    async with pyud.AsyncClient(index=index) as client:
+        async for _ in client.aiter_define("hello"):
+            pass
+    assert len(index) == 30
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from pyud import json_backend
+
+PAYLOAD = (
+    b'{"list": [{"defid": 1, "word": "hello", "definition": "line\r\nbreak",'
+    b' "author": "me", "thumbs_up": 1, "thumbs_down": 0, "example": "",'
+    b' "permalink": "", "sound_urls": [],'
+    b' "written_on": "2020-06-29T00:00:00.000Z"}]}'
+)
+
+
+@pytest.mark.parametrize("backend", ("auto",) + json_backend.BACKENDS)
+def test_backend_control_characters(backend):
+    try:
+        loads = json_backend.get_loads(backend)
+    except ImportError:
+        pytest.skip("{} is not installed".format(backend))
+
+    assert loads(PAYLOAD)["list"][0]["definition"] == "line\r\nbreak"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        json_backend.get_loads("simplejson")
+
+
+def test_client_parses_bytes():
+    client = pyud.Client()
+    definitions = client._parse_definitions_from_json(PAYLOAD)
+    assert definitions[0].definition == "line\r\nbreak"
+    assert client._parse_definitions_from_json(b'{"list": []}') is None
+
+    with pytest.raises(Exception):
+        client._parse_definitions_from_json(b"not json")
+    client.close()
+
+
+def test_stdlib_loads_bytes():
+    for data in (PAYLOAD, bytearray(PAYLOAD), PAYLOAD.decode()):
+        loaded = json_backend.stdlib_loads(data)
+        assert loaded["list"][0]["definition"] == "line\r\nbreak"
+
+    with pytest.raises(ValueError):
+        json_backend.stdlib_loads(b"\xff")
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from pyud.metrics import Histogram
+
+
+def test_histogram_buckets():
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+
+
+def test_metrics_hooks():
+    metrics = pyud.Metrics()
+    events = []
+    metrics.add_hook(events.append)
+    metrics.observe('decode', 0.5, 'http://example.com')
+    metrics.remove_hook(events.append)
+    metrics.observe('decode', 0.5)
+
+    assert events == [('decode', 0.5, 'http://example.com')]
+    assert metrics.histogram('decode').count == 2
+    with pytest.raises(ValueError):
+        metrics.remove_hook(events.append)
+
+
+def test_metrics_prometheus():
+    metrics = pyud.Metrics(buckets=(0.1, 1))
+    metrics.inc('requests_total', '200', 3)
+    metrics.inc('errors_total', 'HTTPError')
+    metrics.inc('cache_hits_total')
+    metrics.observe('ttfb', 0.5)
+
+    text = metrics.to_prometheus()
+    assert '# TYPE pyud_requests_total counter' in text
+    assert 'pyud_requests_total{status="200"} 3\n' in text
+    assert 'pyud_errors_total{type="HTTPError"} 1\n' in text
+    assert 'pyud_cache_hits_total 1\n' in text
+    assert 'pyud_cache_misses_total 0\n' in text
+    assert '# TYPE pyud_stage_seconds histogram' in text
+    assert 'pyud_stage_seconds_bucket{stage="ttfb",le="0.1"} 0\n' in text
+    assert 'pyud_stage_seconds_bucket{stage="ttfb",le="1.0"} 1\n' in text
+    assert 'pyud_stage_seconds_bucket{stage="ttfb",le="+Inf"} 1\n' in text
+    assert 'pyud_stage_seconds_count{stage="ttfb"} 1\n' in text
+
+    metrics.reset()
+    assert metrics.counter('requests_total', '200') == 0
+    assert metrics.histogram('ttfb') is None
+
+
+def test_client_metrics(api_server):
+    metrics = pyud.Metrics()
+    stages = []
+    metrics.add_hook(lambda event: stages.append(event.stage))
+    api_server.failures = [500]
+    with pyud.Client(metrics=metrics, cache=pyud.Cache()) as ud:
+        with pytest.raises(Exception):
+            ud.define("hello")
+        definitions = ud.define("hello")
+        ud.define("hello")
+        assert definitions[0].definition
+
+    assert metrics.counter('requests_total', '200') == 1
+    assert metrics.counter('requests_total', '500') == 1
+    assert metrics.counter('errors_total', 'HTTPError') == 1
+    assert metrics.counter('response_bytes_total') > 0
+    assert metrics.counter('cache_hits_total') == 1
+    assert metrics.counter('cache_misses_total') == 2
+    for stage in pyud.metrics.STAGES:
+        assert stage in stages
+
+
+@pytest.mark.asyncio
+async def test_async_client_metrics(api_server):
+    metrics = pyud.Metrics()
+    async with pyud.AsyncClient(metrics=metrics) as ud:
+        definitions = await ud.define("hello")
+        assert len(definitions) == 30
+
+    assert metrics.counter('requests_total', '200') == 1
+    assert metrics.histogram('connect').count == 1
+    assert metrics.histogram('ttfb').count == 1
+    assert metrics.histogram('build').count == 1
+
+
+def test_client_without_metrics_records_nothing(api_server):
+    with pyud.Client() as ud:
+        assert ud.metrics is None
+        assert ud.define("hello")[0].definition
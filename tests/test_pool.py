@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from pyud.pool import ConnectionPool
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    paths = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        if self.path == "/slow":
+            time.sleep(0.5)
+        body = str(self.client_address[1]).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path == "/close":
+            # Closes the connection without telling the client
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    Handler.paths = []
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_reuses_connection(url):
+    pool = ConnectionPool(maxsize=2)
+    first = pool.request("GET", url)
+    second = pool.request("GET", url + "?a=b")
+    assert first.status == second.status == 200
+    # The body is the client port, which is the same for a reused connection
+    assert first.body == second.body
+    pool.close()
+
+
+def test_pool_evicts_idle_connections(url):
+    pool = ConnectionPool(idle_timeout=0)
+    first = pool.request("GET", url)
+    second = pool.request("GET", url)
+    assert first.body != second.body
+    pool.close()
+
+
+def test_pool_close(url):
+    pool = ConnectionPool()
+    pool.request("GET", url)
+    pool.close()
+    assert pool.closed
+
+    with pytest.raises(RuntimeError):
+        pool.request("GET", url)
+
+
+def test_pool_resends_on_closed_connection(url):
+    pool = ConnectionPool()
+    first = pool.request("GET", url + "close")
+    second = pool.request("GET", url)
+    assert second.status == 200
+    assert first.body != second.body
+    pool.close()
+
+
+def test_pool_does_not_resend_on_timeout(url):
+    pool = ConnectionPool(timeout=0.2)
+    pool.request("GET", url)
+    with pytest.raises(socket.timeout):
+        pool.request("GET", url + "slow")
+    # A request sent again would only be handled after the slow one
+    time.sleep(1.0)
+    assert Handler.paths.count("/slow") == 1
+    pool.close()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+import pytest
+
+import pyud
+from helpers import make_definition
+
+
+def add_terms(api_server):
+    api_server.terms.update(
+        {
+            "start": [
+                make_definition(1, "start", definition="[one] and [two]"),
+                make_definition(2, "start", definition="[two] or [three]"),
+            ],
+            "one": [make_definition(11, "one")],
+            "two": [make_definition(12, "two")],
+            "three": [make_definition(13, "three")],
+            "other": [make_definition(21, "other", definition="[four]")],
+            "four": [make_definition(14, "four")],
+        }
+    )
+
+
+def requests_for(api_server, term):
+    return api_server.requests.count("/v0/define?term={}".format(term))
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+async def wait_until_async(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_prefetch_policy():
+    with pytest.raises(ValueError):
+        pyud.PrefetchPolicy(top=0)
+    with pytest.raises(ValueError):
+        pyud.PrefetchPolicy(concurrency=0)
+    with pytest.raises(ValueError):
+        pyud.Client(prefetch=pyud.PrefetchPolicy())
+
+
+def test_client_prefetch(api_server):
+    add_terms(api_server)
+    metrics = pyud.Metrics()
+    with pyud.Client(
+        cache=pyud.Cache(),
+        prefetch=pyud.PrefetchPolicy(top=2),
+        metrics=metrics,
+    ) as ud:
+        ud.define("start")
+        wait_until(lambda: ud.prefetches == 2)
+        # The terms referenced most often are prefetched first
+        assert requests_for(api_server, "two") == 1
+        assert requests_for(api_server, "one") == 1
+        assert requests_for(api_server, "three") == 0
+
+        assert ud.define("two")[0].defid == 12
+        assert requests_for(api_server, "two") == 1
+        assert ud.prefetch_hits == 1
+        # Only the first use of a prefetched entry is counted
+        ud.define("two")
+        assert ud.prefetch_hits == 1
+
+    assert metrics.counter('prefetches_total') == 2
+    assert metrics.counter('prefetch_hits_total') == 1
+
+
+def test_client_prefetch_budget(api_server):
+    add_terms(api_server)
+    with pyud.Client(
+        cache=pyud.Cache(),
+        prefetch=pyud.PrefetchPolicy(top=3, concurrency=1, max_bytes=1),
+    ) as ud:
+        ud.define("start")
+        wait_until(lambda: ud.prefetches == 1)
+        time.sleep(0.1)
+        assert ud.prefetches == 1
+        assert requests_for(api_server, "one") == 0
+
+        # Using the prefetched entry frees the budget
+        ud.define("two")
+        ud.define("start")
+        wait_until(lambda: ud.prefetches == 2)
+        assert requests_for(api_server, "one") == 1
+
+
+def test_client_prefetch_waits_for_prefetch(api_server):
+    add_terms(api_server)
+    api_server.delays = [0, 0.2]
+    with pyud.Client(
+        cache=pyud.Cache(), prefetch=pyud.PrefetchPolicy(top=1)
+    ) as ud:
+        ud.define("start")
+        assert ud.define("two")
+        assert requests_for(api_server, "two") == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_prefetch(api_server):
+    add_terms(api_server)
+    async with pyud.AsyncClient(
+        cache=pyud.Cache(), prefetch=pyud.PrefetchPolicy(top=3)
+    ) as ud:
+        await ud.define("start")
+        await wait_until_async(lambda: ud.prefetches == 3)
+        assert await ud.define("three")
+        assert requests_for(api_server, "three") == 1
+        assert ud.prefetch_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_prefetch_waits_for_prefetch(api_server):
+    add_terms(api_server)
+    api_server.delays = [0, 0.2]
+    async with pyud.AsyncClient(
+        cache=pyud.Cache(), prefetch=pyud.PrefetchPolicy(top=1)
+    ) as ud:
+        await ud.define("start")
+        assert (await ud.define("two"))[0].defid == 12
+        assert requests_for(api_server, "two") == 1
+        assert ud.prefetch_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_prefetch_cancels_stale(api_server):
+    add_terms(api_server)
+    api_server.delays = [0, 1.0]
+    async with pyud.AsyncClient(
+        cache=pyud.Cache(),
+        prefetch=pyud.PrefetchPolicy(top=2, concurrency=1),
+    ) as ud:
+        await ud.define("start")
+        await asyncio.sleep(0.1)
+        # "two" is being prefetched and "one" is queued,
+        # and neither is referenced by the newer lookup
+        await ud.define("other")
+        assert ud.prefetch_cancels == 2
+
+        await wait_until_async(lambda: ud.prefetches == 1)
+        assert requests_for(api_server, "four") == 1
+        assert requests_for(api_server, "one") == 0
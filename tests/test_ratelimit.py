@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+from urllib import error
+
+import aiohttp
+import pytest
+
+import pyud
+from pyud.transport import BufferedResponse, Response
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = pyud.TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(5):
+        bucket.acquire()
+    # Five more tokens at 50 per second take around 0.1 seconds
+    assert time.monotonic() - start >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_async():
+    bucket = pyud.TokenBucket(rate=100, capacity=1)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire_async() for _ in range(6)))
+    assert time.monotonic() - start >= 0.04
+
+
+def test_token_bucket_invalid_rate():
+    with pytest.raises(ValueError):
+        pyud.TokenBucket(rate=0)
+
+
+def test_aimd_increase_and_decrease():
+    controller = pyud.AIMDController(initial=2, maximum=4, cooldown=0)
+    for _ in range(20):
+        controller.acquire()
+        controller.release(latency=0.01, status=200)
+    assert controller.limit == 4
+
+    controller.acquire()
+    controller.release(status=429)
+    assert controller.limit == 2
+    controller.acquire()
+    controller.release(error=True)
+    assert controller.limit == 1
+    controller.acquire()
+    controller.release(status=503)
+    assert controller.limit == 1
+
+
+def test_aimd_latency_target_and_cooldown():
+    controller = pyud.AIMDController(
+        initial=8, latency_target=0.5, cooldown=60
+    )
+    controller.acquire()
+    controller.release(latency=1.0, status=200)
+    assert controller.limit == 4
+    # Further decreases wait for the cooldown
+    controller.acquire()
+    controller.release(status=500)
+    assert controller.limit == 4
+
+
+def test_aimd_limits_threads():
+    controller = pyud.AIMDController(initial=2, maximum=2)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        controller.acquire()
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+        controller.release(status=200)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 2
+    assert controller.in_progress == 0
+
+
+@pytest.mark.asyncio
+async def test_aimd_limits_tasks():
+    controller = pyud.AIMDController(initial=1, maximum=1)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        await controller.acquire_async()
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        controller.release(status=200)
+
+    await asyncio.gather(*(work() for _ in range(5)))
+    assert peak == 1
+    assert controller.in_progress == 0
+
+
+@pytest.mark.asyncio
+async def test_aimd_cancelled_waiter():
+    controller = pyud.AIMDController(initial=1, maximum=1)
+    await controller.acquire_async()
+    task = asyncio.ensure_future(controller.acquire_async())
+    await asyncio.sleep(0.01)
+    assert len(controller._async_waiters) == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert not controller._async_waiters
+    controller.release(status=200)
+    assert controller.in_progress == 0
+
+
+def test_aimd_release_skips_closed_loop():
+    controller = pyud.AIMDController(initial=1, maximum=1)
+    controller.acquire()
+    loop = asyncio.new_event_loop()
+    waiter = loop.create_future()
+    controller._async_waiters.append((loop, waiter))
+    loop.close()
+    controller.release(status=200)
+    assert controller.in_progress == 0
+    assert not controller._async_waiters
+
+
+def test_client_holds_place_until_body_read():
+    controller = pyud.AIMDController(initial=4)
+    in_progress = []
+
+    class SpyResponse(BufferedResponse):
+        def read(self, amt=None):
+            in_progress.append(controller.in_progress)
+            return super().read(amt)
+
+    class SpyTransport(pyud.Transport):
+        def open(self, method, url, headers=None):
+            return SpyResponse(Response(200, "OK", {}, b'{"list": []}'))
+
+    with pyud.Client(
+        transport=SpyTransport(), concurrency_controller=controller
+    ) as ud:
+        ud.define("hello")
+    assert in_progress == [1]
+    assert controller.in_progress == 0
+
+
+def test_client_backs_off_on_429(api_server):
+    controller = pyud.AIMDController(initial=4, cooldown=0)
+    limiter = pyud.TokenBucket(rate=1000)
+    api_server.failures = [429]
+    with pyud.Client(
+        rate_limiter=limiter, concurrency_controller=controller
+    ) as ud:
+        with pytest.raises(error.HTTPError):
+            ud.define("hello")
+        assert controller.limit == 2
+        assert len(ud.define("hello")) == 30
+    assert controller.in_progress == 0
+
+
+@pytest.mark.asyncio
+async def test_async_client_backs_off_on_server_error(api_server):
+    controller = pyud.AIMDController(initial=4, cooldown=0)
+    api_server.failures = [503]
+    async with pyud.AsyncClient(concurrency_controller=controller) as ud:
+        with pytest.raises(aiohttp.ClientResponseError):
+            await ud.define("hello")
+        assert controller.limit == 2
+        assert len(await ud.define("hello")) == 30
+    assert controller.in_progress == 0
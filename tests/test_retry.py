@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from urllib import error
+
+import pytest
+
+import pyud
+from pyud.retry import LatencyTracker
+
+
+def test_retry_policy_delay():
+    policy = pyud.RetryPolicy(backoff=0.5, max_backoff=3, jitter=False)
+    assert [policy.delay(retry) for retry in range(4)] == [0.5, 1, 2, 3]
+
+    policy = pyud.RetryPolicy(backoff=0.5)
+    assert all(0 <= policy.delay(2) <= 2 for _ in range(50))
+
+
+def test_retry_policy_statuses():
+    policy = pyud.RetryPolicy()
+    assert policy.retries_status(503)
+    assert not policy.retries_status(404)
+    with pytest.raises(ValueError):
+        pyud.RetryPolicy(attempts=0)
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.95) is None
+    for i in range(1, 101):
+        tracker.add(i / 100)
+    assert tracker.percentile(0.95) == 0.96
+    assert tracker.percentile(1) == 1
+
+
+def test_client_retries(api_server):
+    api_server.failures = [503, 429]
+    retry = pyud.RetryPolicy(backoff=0.01)
+    with pyud.Client(retry=retry) as ud:
+        assert len(ud.define("hello")) == 30
+        assert ud.retries == 2
+        assert len(api_server.requests) == 3
+
+
+def test_client_gives_up_retrying(api_server):
+    api_server.failures = [500, 500, 500]
+    retry = pyud.RetryPolicy(attempts=2, backoff=0.01)
+    with pyud.Client(retry=retry) as ud:
+        with pytest.raises(error.HTTPError):
+            ud.define("hello")
+        assert ud.retries == 1
+
+
+def test_client_does_not_retry_client_errors(api_server):
+    api_server.failures = [404]
+    with pyud.Client(retry=pyud.RetryPolicy(backoff=0.01)) as ud:
+        with pytest.raises(error.HTTPError):
+            ud.define("hello")
+        assert ud.retries == 0
+
+
+def test_client_timeout(api_server):
+    api_server.delays = [1]
+    with pyud.Client(timeout=0.1) as ud:
+        with pytest.raises(OSError):
+            ud.define("hello")
+
+
+def test_client_hedges(api_server):
+    api_server.delays = [0.5]
+    with pyud.Client(hedge=True, hedge_delay=0.05) as ud:
+        assert len(ud.define("hello")) == 30
+        assert ud.hedges == 1
+        assert len(api_server.requests) == 2
+
+
+def test_client_hedge_timeout_uses_other(api_server):
+    api_server.delays = [1]
+    with pyud.Client(hedge=True, hedge_delay=0.05, timeout=0.3) as ud:
+        assert len(ud.define("hello")) == 30
+        assert ud.hedges == 1
+        assert len(api_server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_retries(api_server):
+    api_server.failures = [502]
+    retry = pyud.RetryPolicy(backoff=0.01)
+    async with pyud.AsyncClient(retry=retry) as ud:
+        assert len(await ud.define("hello")) == 30
+        assert ud.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_timeout(api_server):
+    api_server.delays = [1]
+    async with pyud.AsyncClient(timeout=0.1) as ud:
+        with pytest.raises(asyncio.TimeoutError):
+            await ud.define("hello")
+
+
+@pytest.mark.asyncio
+async def test_async_client_hedges(api_server):
+    api_server.delays = [0.5]
+    async with pyud.AsyncClient(hedge=True, hedge_delay=0.05) as ud:
+        assert len(await ud.define("hello")) == 30
+        assert ud.hedges == 1
+        assert len(api_server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_hedge_error_uses_other(api_server):
+    api_server.delays = [0.2]
+    api_server.failures = [500]
+    async with pyud.AsyncClient(hedge=True, hedge_delay=0.05) as ud:
+        assert len(await ud.define("hello")) == 30
+        assert ud.hedges == 1
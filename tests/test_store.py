@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import pyud
+from helpers import make_definition
+from pyud.cache import MISSING
+
+DATA = [make_definition(defid, "Hello") for defid in (2, 1)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with pyud.DefinitionStore(str(tmp_path / "definitions.db")) as store:
+        yield store
+
+
+def test_store_term(store):
+    assert store.get_term("hello") is MISSING
+    store.put("hello", DATA)
+    assert store.get_term(" HELLO ") == DATA
+    assert store.get_defid(1) == [DATA[1]]
+    assert store.get_defid(3) is MISSING
+    assert store.find_word("hello") == [DATA[1], DATA[0]]
+
+
+def test_store_ttl(tmp_path):
+    with pyud.DefinitionStore(str(tmp_path / "db"), ttl=-1) as store:
+        store.put("hello", DATA)
+        assert store.get_term("hello") is MISSING
+        store.purge()
+        assert store.find_word("hello") == []
+
+
+def test_client_store(store, monkeypatch):
+    client = pyud.Client(store=store)
+    calls = []
+
+    def fetch_json(url):
+        calls.append(url)
+        return DATA
+
+    monkeypatch.setattr(client, "_fetch_json", fetch_json)
+    assert len(client.define("hello")) == 2
+    assert len(client.define("hello")) == 2
+    assert client.from_id(1).defid == 1
+    assert len(calls) == 1
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_client_store(store, monkeypatch):
+    client = pyud.AsyncClient(store=store)
+    calls = []
+
+    async def fetch_json(url):
+        calls.append(url)
+        return DATA
+
+    monkeypatch.setattr(client, "_fetch_json", fetch_json)
+    assert len(await client.define("hello")) == 2
+    await client.aclose()
+    assert store.get_term("hello") == DATA
+
+    client = pyud.AsyncClient(store=store)
+    monkeypatch.setattr(client, "_fetch_json", fetch_json)
+    assert (await client.from_id(2)).defid == 2
+    assert len(calls) == 1
+    await client.aclose()
+
+
+def test_store_skips_malformed(store):
+    store.put("hello", DATA + [{"defid": 3}, {"word": "hello"}])
+    assert store.get_term("hello") == DATA
+
+    client = pyud.Client(store=store)
+    client._fetch_json = lambda url: DATA + [{"defid": 3}]
+    assert len(client.define("other")) == 2
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_client_logs_store_errors(store, monkeypatch, caplog):
+    client = pyud.AsyncClient(store=store)
+
+    async def fetch_json(url):
+        return DATA
+
+    def put_many(entries):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(client, "_fetch_json", fetch_json)
+    monkeypatch.setattr(store, "put_many", put_many)
+    assert len(await client.define("hello")) == 2
+    await client.aclose()
+    assert "Failed to write 1 entries to the store" in caplog.text
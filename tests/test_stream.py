@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+
+import pytest
+
+import pyud
+from pyud.stream import DefinitionStreamParser
+
+DOCUMENT = json.dumps(
+    {
+        "tags": ["list"],
+        "list": [
+            {"defid": i, "text": 'a \\"]}[{ b', "nested": {"x": [1, {}]}}
+            for i in range(20)
+        ],
+        "after": {},
+    }
+).encode()
+
+
+def test_parser_chunks():
+    expected = json.loads(DOCUMENT)["list"]
+    for _ in range(50):
+        parser = DefinitionStreamParser()
+        parsed = []
+        pos = 0
+        while pos < len(DOCUMENT):
+            size = random.randint(1, 16)
+            parsed += parser.feed(DOCUMENT[pos : pos + size])
+            pos += size
+        parser.close()
+        assert parsed == expected
+
+
+def test_parser_incomplete():
+    parser = DefinitionStreamParser()
+    assert parser.feed(DOCUMENT[:-100])
+    with pytest.raises(Exception):
+        parser.close()
+
+
+def test_iter_define(api_server):
+    with pyud.Client(cache=pyud.Cache()) as client:
+        definitions = client.iter_define("hello", chunk_size=64)
+        assert next(definitions).defid == 1
+        definitions.close()
+
+        assert [d.defid for d in client.iter_define("hello")] == list(
+            range(1, 31)
+        )
+        assert len(client.iter_define("hello").__next__().references) == 1
+        assert list(client.iter_define("missing")) == []
+    assert len(api_server.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_aiter_define(api_server):
+    async with pyud.AsyncClient() as client:
+        defids = []
+        async for definition in client.aiter_define("hello", chunk_size=64):
+            defids.append(definition.defid)
+        assert defids == list(range(1, 31))
+
+        stream = client.aiter_define("hello")
+        async for definition in stream:
+            break
+        await stream.aclose()
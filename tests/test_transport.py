@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+from urllib import error
+
+import pytest
+
+import pyud
+from helpers import make_definition
+from pyud.aio import AiohttpTransport
+from pyud.pool import ConnectionPool
+from pyud.transport import Response
+
+BASE_URL = "http://ud.test/v0/"
+
+
+@pytest.fixture
+def cassette():
+    cassette = pyud.Cassette()
+    body = json.dumps({"list": [make_definition(1)]}).encode()
+    cassette.add(
+        "GET", BASE_URL + "define?term=hello", Response(200, "OK", {}, body)
+    )
+    for defid in (2, 3):
+        body = json.dumps({"list": [make_definition(defid, "r")]}).encode()
+        cassette.add("GET", BASE_URL + "random", Response(200, "OK", {}, body))
+    cassette.add(
+        "GET", BASE_URL + "define?term=busy", Response(503, "Busy", {}, b"")
+    )
+    return cassette
+
+
+def test_cassette_cycles_responses(cassette):
+    first = cassette.get("GET", BASE_URL + "random")
+    second = cassette.get("GET", BASE_URL + "random")
+    assert first != second
+    assert cassette.get("GET", BASE_URL + "random") == first
+    with pytest.raises(LookupError):
+        cassette.get("GET", BASE_URL + "define?term=unknown")
+
+
+def test_cassette_save_and_load(cassette, tmp_path):
+    path = str(tmp_path / "cassette.json")
+    cassette.save(path)
+    loaded = pyud.Cassette.load(path)
+    assert len(loaded) == len(cassette) == 4
+    assert loaded.get("GET", BASE_URL + "define?term=hello") == cassette.get(
+        "GET", BASE_URL + "define?term=hello"
+    )
+
+
+def test_client_replay(cassette):
+    transport = pyud.ReplayTransport(cassette)
+    with pyud.Client(transport=transport, base_url=BASE_URL) as ud:
+        assert ud.define("hello")[0].defid == 1
+        assert [d.defid for d in ud.iter_define("hello")] == [1]
+        assert [d.defid for d in ud.random(limit=2)] == [2, 3]
+        with pytest.raises(error.HTTPError):
+            ud.define("busy")
+        with pytest.raises(LookupError):
+            ud.define("unknown")
+
+
+@pytest.mark.asyncio
+async def test_async_client_replay(cassette):
+    transport = pyud.AsyncReplayTransport(cassette)
+    async with pyud.AsyncClient(transport=transport, base_url=BASE_URL) as ud:
+        assert (await ud.define("hello"))[0].defid == 1
+        defids = []
+        async for definition in ud.aiter_define("hello"):
+            defids.append(definition.defid)
+        assert defids == [1]
+        random = await ud.random(limit=2)
+        assert [d.defid for d in random] == [2, 3]
+        with pytest.raises(error.HTTPError):
+            await ud.define("busy")
+    assert not transport.closed
+
+
+def test_replay_retries_status(cassette):
+    cassette.add(
+        "GET",
+        BASE_URL + "define?term=busy",
+        Response(200, "OK", {}, json.dumps({"list": []}).encode()),
+    )
+    with pyud.Client(
+        transport=pyud.ReplayTransport(cassette),
+        base_url=BASE_URL,
+        retry=pyud.RetryPolicy(backoff=0),
+    ) as ud:
+        assert ud.define("busy") is None
+        assert ud.retries == 1
+
+
+def test_client_records(api_server, tmp_path):
+    cassette = pyud.Cassette()
+    pool = ConnectionPool()
+    transport = pyud.RecordingTransport(pool, cassette)
+    with pyud.Client(transport=transport) as ud:
+        assert len(ud.define("hello")) == 30
+    pool.close()
+
+    path = str(tmp_path / "cassette.json")
+    cassette.save(path)
+    replay = pyud.ReplayTransport(pyud.Cassette.load(path))
+    with pyud.Client(transport=replay) as ud:
+        assert len(ud.define("hello")) == 30
+    assert len(api_server.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_records(api_server):
+    cassette = pyud.Cassette()
+    inner = AiohttpTransport()
+    transport = pyud.AsyncRecordingTransport(inner, cassette)
+    async with pyud.AsyncClient(transport=transport) as ud:
+        assert len(await ud.define("hello")) == 30
+    await inner.aclose()
+    assert len(cassette) == 1
+
+
+def test_aiohttp_transport_new_event_loop(api_server):
+    transport = AiohttpTransport()
+    url = pyud.client.BASE_URL + "define?term=hello"
+
+    async def fetch():
+        response = await transport.open("GET", url)
+        response.release()
+        return response.status
+
+    # Each call to asyncio.run uses a new event loop
+    for _ in range(2):
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(fetch()) == 200
+        finally:
+            loop.close()
+
+    # The session of an event loop that is open but not running is closed
+    idle_loop = asyncio.new_event_loop()
+    idle_loop.run_until_complete(fetch())
+    session = transport._session
+    connector = session.connector
+
+    loop = asyncio.new_event_loop()
+    assert loop.run_until_complete(fetch()) == 200
+    assert session.closed and connector.closed
+    loop.run_until_complete(transport.aclose())
+    loop.close()
+    idle_loop.close()
+    assert len(api_server.requests) == 4
+
+
+def test_base_url(api_server):
+    base_url = pyud.client.BASE_URL
+    with pyud.Client(base_url=base_url) as ud:
+        assert ud.base_url == base_url
+        assert ud.define("hello")